@@ -0,0 +1,142 @@
+import os
+import re
+import hashlib
+import logging
+import threading
+import unicodedata
+from collections import OrderedDict
+
+from psycopg2.extras import execute_values
+
+# 메모리 캐시 설정
+ANALYSIS_CACHE_SIZE = int(os.getenv("ANALYSIS_CACHE_SIZE", 100000))  # 종류별로 메모리에 보관할 최대 결과 수
+
+_WHITESPACE = re.compile(r"\s+")
+
+# 결과 종류별 Analysis_Text_Cache 컬럼
+RESULT_COLUMNS = {
+    "morphology": ("nouns", "adjectives", "verbs", "interjections"),
+    "sentiment": ("sentiment",),
+}
+
+
+def normalize_text(text):
+    """
+    유니코드 정규화(NFC), 앞뒤 공백 제거, 연속 공백 축약한 텍스트를 반환합니다.
+    형태소 분석은 대소문자에 따라 결과가 달라지므로(영문 품사, 고유명사) 대소문자는 그대로 둡니다.
+    """
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+def text_hash(text):
+    """정규화한 텍스트의 md5 해시(32자리 16진수)를 반환합니다."""
+    return hashlib.md5(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+class AnalysisResultCache:
+    """
+    정규화한 텍스트 해시를 키로 형태소/감정 분석 결과를 재사용하는 캐시.
+    메모리 LRU를 먼저 보고, 없으면 Analysis_Text_Cache 테이블에서 한 번에 조회합니다.
+    """
+
+    def __init__(self, kind, max_size=ANALYSIS_CACHE_SIZE):
+        if kind not in RESULT_COLUMNS:
+            raise ValueError(f"Invalid analysis cache kind: {kind}")
+        self.kind = kind
+        self.columns = RESULT_COLUMNS[kind]
+        self.max_size = max_size
+        self._results = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()  # 파이프라인 단계 워커들이 함께 사용
+
+    def _remember(self, key, result):
+        self._results[key] = result
+        self._results.move_to_end(key)
+        while len(self._results) > self.max_size:
+            self._results.popitem(last=False)
+
+    def _to_result(self, row):
+        # 형태소 결과는 (nouns, adjectives, verbs, interjections) 튜플, 감정 결과는 라벨 문자열
+        return tuple(row) if len(self.columns) > 1 else row[0]
+
+    def lookup(self, conn, keys):
+        """
+        해시 목록 중 캐시된 결과를 {해시: 결과}로 반환합니다.
+        반응 단위로 적중/미스를 집계합니다 (같은 해시가 여러 번 나오면 첫 번째만 미스).
+
+        Args:
+            conn: psycopg2 연결
+            keys (list[str]): text_hash 결과 목록
+        """
+        with self._lock:
+            return self._lookup(conn, keys)
+
+    def _lookup(self, conn, keys):
+        found = {}
+        missing = []
+        for key in dict.fromkeys(keys):
+            if key in self._results:
+                self._results.move_to_end(key)
+                found[key] = self._results[key]
+            else:
+                missing.append(key)
+
+        if missing:
+            with conn.cursor() as cur:
+                cur.execute(f"""
+                    SELECT text_hash, {", ".join(self.columns)}
+                    FROM public.Analysis_Text_Cache
+                    WHERE text_hash = ANY(%s) AND {self.columns[0]} IS NOT NULL;
+                """, (missing,))
+                for key, *row in cur.fetchall():
+                    found[key] = self._to_result(row)
+                    self._remember(key, found[key])
+
+        # 캐시에 없던 해시는 처음 등장한 반응만 모델을 거치고 나머지는 그 결과를 재사용
+        new_keys = set()
+        for key in keys:
+            if key in found or key in new_keys:
+                self.hits += 1
+            else:
+                self.misses += 1
+                new_keys.add(key)
+        return found
+
+    def store(self, conn, results):
+        """
+        새로 분석한 {해시: 결과}를 메모리와 테이블에 저장합니다. 커밋은 호출한 쪽에서 합니다.
+        """
+        if not results:
+            return
+        with self._lock:
+            self._store(conn, results)
+
+    def _store(self, conn, results):
+        rows = []
+        for key, result in results.items():
+            self._remember(key, result)
+            rows.append((key, *(result if len(self.columns) > 1 else (result,))))
+
+        assignments = ", ".join(f"{column} = EXCLUDED.{column}" for column in self.columns)
+        with conn.cursor() as cur:
+            execute_values(cur, f"""
+                INSERT INTO public.Analysis_Text_Cache (text_hash, {", ".join(self.columns)})
+                VALUES %s
+                ON CONFLICT (text_hash) DO UPDATE
+                SET {assignments};
+            """, rows)
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def log_stats(self, job_name):
+        logging.info(
+            f"[{job_name}] analysis cache: {self.hits} hits, {self.misses} misses "
+            f"({self.hit_rate():.1%} hit rate, {len(self._results)} cached in memory)"
+        )
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
@@ -0,0 +1,168 @@
+import os
+import time
+import queue
+import logging
+import threading
+
+from db_connector import get_db_connection
+
+# 파이프라인 설정
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", 4))  # 단계 사이에 대기할 수 있는 최대 배치 수
+
+# 단계 스레드에 종료를 알리는 표식
+_STOP = object()
+
+
+class ReactionBatch:
+    """파이프라인을 따라 흐르는 반응 묶음과 단계별 결과"""
+
+    def __init__(self, seq, reactions):
+        self.seq = seq  # 읽은 순서 (기록 단계에서 순서대로 커밋하기 위함)
+        self.reactions = reactions  # [(reaction_id, timestamp, reaction_text, chat_name), ...]
+        self.morphology = None  # 반응별 (nouns, adjectives, verbs, interjections)
+        self.sentiments = None  # 반응별 감정 라벨
+        self.coin_matches = None  # {reaction_id: (timestamp, [coin_id, ...])}
+
+    def texts(self):
+        return [reaction[2] for reaction in self.reactions]
+
+
+class PipelineStage:
+    """
+    입력 큐에서 배치를 꺼내 handler를 적용하고 출력 큐로 넘기는 단계.
+    workers개의 스레드가 각자 DB 연결을 하나씩 가지고 병렬로 처리합니다.
+    """
+
+    def __init__(self, name, handler, workers=1):
+        """
+        Args:
+            name (str): 로그에 표시할 단계 이름
+            handler: (conn, batch) -> None. batch에 결과를 채우며, 단계가 끝나면 conn을 커밋함
+            workers (int): 단계 스레드 수
+        """
+        self.name = name
+        self.handler = handler
+        self.workers = workers
+        self.input = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        self.output = None
+        self.processed = 0
+        self.busy_seconds = 0.0
+        self._threads = []
+        self._lock = threading.Lock()
+
+    def start(self, failed):
+        self._threads = [
+            threading.Thread(target=self._run, args=(failed,), name=f"pipeline-{self.name}-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self):
+        # 남은 배치를 모두 처리한 뒤 종료하도록 스레드 수만큼 표식을 넣고 기다림
+        for _ in self._threads:
+            self.input.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+
+    def _run(self, failed):
+        conn = get_db_connection("data_scheduler")
+        try:
+            while True:
+                batch = self.input.get()
+                if batch is _STOP:
+                    break
+                # 다른 단계가 실패하면 뒤 단계가 막히지 않도록 남은 배치는 버림
+                if failed.is_set():
+                    continue
+
+                start_time = time.perf_counter()
+                try:
+                    self.handler(conn, batch)
+                    conn.commit()
+                except Exception as e:
+                    conn.rollback()
+                    logging.exception(f"Pipeline stage {self.name} failed: {e}")
+                    failed.set()
+                    continue
+
+                with self._lock:
+                    self.busy_seconds += time.perf_counter() - start_time
+                    self.processed += len(batch.reactions)
+                if self.output is not None:
+                    self.output.put(batch)
+        finally:
+            conn.close()
+
+    def log_stats(self, elapsed):
+        busy_rate = self.processed / self.busy_seconds if self.busy_seconds else 0.0
+        utilization = self.busy_seconds / (elapsed * self.workers) if elapsed else 0.0
+        logging.info(
+            f"Pipeline stage {self.name}: {self.processed} reactions, "
+            f"{busy_rate:.1f} messages/sec per worker, {self.workers} workers, "
+            f"{utilization:.0%} busy"
+        )
+
+
+class OrderedWriter:
+    """
+    여러 워커가 처리한 배치를 읽은 순서(seq)대로 다시 정렬해 write를 호출합니다.
+    진행 위치(watermark)가 커밋되지 않은 배치를 건너뛰지 않도록 하기 위함입니다.
+    """
+
+    def __init__(self, write):
+        self.write = write
+        self._pending = {}
+        self._next_seq = 0
+
+    def __call__(self, conn, batch):
+        self._pending[batch.seq] = batch
+        while self._next_seq in self._pending:
+            self.write(conn, self._pending.pop(self._next_seq))
+            self._next_seq += 1
+
+
+class ReactionPipeline:
+    """
+    반응 묶음을 한 번만 읽어 단계들을 차례로 통과시키는 파이프라인.
+    단계 사이는 크기가 제한된 큐로 연결되어, 느린 단계가 있으면 앞 단계와 읽기가 자연히 멈춥니다.
+    마지막 단계는 기록 단계로, 읽은 순서대로 한 스레드에서 실행됩니다.
+    """
+
+    def __init__(self, stages, write):
+        self.stages = list(stages) + [PipelineStage("write", OrderedWriter(write))]
+        for stage, next_stage in zip(self.stages, self.stages[1:]):
+            stage.output = next_stage.input
+
+    def run(self, chunks):
+        """
+        Args:
+            chunks: 반응 목록 묶음을 내주는 이터레이터 (stream_pending_reactions 결과)
+
+        Returns:
+            int: 읽은 반응 수
+        """
+        failed = threading.Event()
+        for stage in self.stages:
+            stage.start(failed)
+
+        start_time = time.perf_counter()
+        read = 0
+        try:
+            for seq, reactions in enumerate(chunks):
+                if failed.is_set():
+                    break
+                self.stages[0].input.put(ReactionBatch(seq, reactions))
+                read += len(reactions)
+        finally:
+            # 앞 단계부터 차례로 비우고 종료
+            for stage in self.stages:
+                stage.stop()
+
+        elapsed = time.perf_counter() - start_time
+        logging.info(f"Pipeline read {read} reactions in {elapsed:.1f}s ({read / elapsed if elapsed else 0.0:.1f} messages/sec).")
+        for stage in self.stages:
+            stage.log_stats(elapsed)
+        if failed.is_set():
+            raise RuntimeError("Analysis pipeline stopped after a stage failure")
+        return read
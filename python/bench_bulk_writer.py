@@ -0,0 +1,113 @@
+import time
+import uuid
+import random
+import argparse
+from datetime import datetime, timedelta
+
+from psycopg2.extras import execute_values
+
+from db_connector import get_db_connection
+from bulk_writer import ANALYSIS_STAGING_COLUMNS, BulkWriter
+
+# 실제 테이블 대신 같은 형태의 임시 테이블에 적재해 비교 (외래 키 없이 순수 쓰기 비용만 측정)
+BENCH_TABLE_SQL = """
+    CREATE TEMP TABLE bench_analysis (
+        analysis_id SERIAL,
+        timestamp TIMESTAMP NOT NULL,
+        reaction_id UUID NOT NULL,
+        nouns TEXT[],
+        adjectives TEXT[],
+        verbs TEXT[],
+        interjections TEXT[],
+        sentiment VARCHAR(10),
+        UNIQUE (reaction_id, timestamp)
+    );
+"""
+
+BENCH_MERGE_SQL = """
+    INSERT INTO bench_analysis (timestamp, reaction_id, nouns, adjectives, verbs, interjections, sentiment)
+    SELECT timestamp, reaction_id, nouns, adjectives, verbs, interjections, sentiment
+    FROM {staging}
+    ON CONFLICT (reaction_id, timestamp) DO UPDATE
+    SET
+        nouns = COALESCE(EXCLUDED.nouns, bench_analysis.nouns),
+        sentiment = COALESCE(EXCLUDED.sentiment, bench_analysis.sentiment);
+"""
+
+WORDS = ["비트코인", "이더리움", "가즈아", "떡상", "손절", "존버", "리플", "펌핑", "하락", "매수"]
+
+
+def generate_rows(count):
+    start = datetime(2024, 11, 1)
+    for i in range(count):
+        yield (
+            start + timedelta(seconds=i),
+            str(uuid.uuid4()),
+            random.sample(WORDS, 3),
+            random.sample(WORDS, 1),
+            random.sample(WORDS, 2),
+            [],
+            random.choice(["positive", "neutral", "negative"]),
+        )
+
+
+# 기존 방식: execute_values + ON CONFLICT, 배치마다 커밋
+def write_with_execute_values(conn, rows, batch_size):
+    batch = []
+    with conn.cursor() as cur:
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                execute_values(cur, """
+                    INSERT INTO bench_analysis (timestamp, reaction_id, nouns, adjectives, verbs, interjections, sentiment)
+                    VALUES %s
+                    ON CONFLICT (reaction_id, timestamp) DO NOTHING;
+                """, batch)
+                conn.commit()
+                batch.clear()
+        if batch:
+            execute_values(cur, """
+                INSERT INTO bench_analysis (timestamp, reaction_id, nouns, adjectives, verbs, interjections, sentiment)
+                VALUES %s
+                ON CONFLICT (reaction_id, timestamp) DO NOTHING;
+            """, batch)
+            conn.commit()
+
+
+def write_with_copy(conn, rows, flush_rows):
+    with BulkWriter(conn, "staging_bench_analysis", ANALYSIS_STAGING_COLUMNS, BENCH_MERGE_SQL, flush_rows) as writer:
+        writer.add_many(rows)
+    conn.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark execute_values against COPY + merge for analysis rows")
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--batch-size", type=int, default=1000, help="execute_values batch size")
+    parser.add_argument("--flush-rows", type=int, default=50000, help="COPY flush size")
+    args = parser.parse_args()
+
+    rows = list(generate_rows(args.rows))
+    conn = get_db_connection("data_scheduler")
+    with conn.cursor() as cur:
+        cur.execute(BENCH_TABLE_SQL)
+    conn.commit()
+
+    for name, write in (
+        ("execute_values", lambda: write_with_execute_values(conn, rows, args.batch_size)),
+        ("copy", lambda: write_with_copy(conn, rows, args.flush_rows)),
+    ):
+        with conn.cursor() as cur:
+            cur.execute("TRUNCATE bench_analysis;")
+        conn.commit()
+
+        start_time = time.perf_counter()
+        write()
+        elapsed = time.perf_counter() - start_time
+        print(f"{name:<15} {args.rows / elapsed:>12.0f} rows/s ({elapsed:.1f}s)")
+
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
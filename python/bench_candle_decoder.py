@@ -0,0 +1,123 @@
+import os
+import json
+import time
+import asyncio
+import argparse
+from datetime import datetime
+
+import candle_decoder
+from candle_decoder import decode_candles
+from mock_upbit_server import MockUpbit, start_mock_server
+from upbit_client import UPBIT_API_URL, UpbitClient
+
+# 생성한 픽스처는 저장소에 넣지 않음 (.gitignore)
+DEFAULT_FIXTURE = os.path.join(os.path.dirname(__file__), "bench_data", "candle_fixtures.jsonl")
+
+
+# 캔들 응답 본문을 그대로 JSON Lines로 기록 (한 줄에 200개짜리 응답 하나)
+async def record_fixtures(path, base_url, markets, pages):
+    async with UpbitClient(base_url) as client:
+        krw_pairs = (await client.get_krw_pairs())[:markets]
+        lines = []
+        for market, _ in krw_pairs:
+            to = None
+            for _ in range(pages):
+                async with client.session.get(
+                    f"{client.base_url}/v1/candles/minutes/60", params={"market": market, "count": 200, **({"to": to} if to else {})}
+                ) as response:
+                    body = await response.read()
+                candles = json.loads(body)
+                if not candles:
+                    break
+                lines.append(body.decode())
+                to = candles[-1]['candle_date_time_kst'] + "+09:00"
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    return len(lines)
+
+
+# 기존 방식: json 모듈 + 캔들마다 strptime, round, 튜플 생성
+def decode_legacy(body, coin_id):
+    rows = []
+    for candle in json.loads(body):
+        try:
+            volume = round(candle['candle_acc_trade_volume'], 8)
+            if volume > 1e12:
+                volume /= 1_000_000
+            rows.append((
+                coin_id,
+                datetime.strptime(candle['candle_date_time_kst'].replace("T", " "), "%Y-%m-%d %H:%M:%S"),
+                round(candle['opening_price'], 8),
+                round(candle['high_price'], 8),
+                round(candle['low_price'], 8),
+                round(candle['trade_price'], 8),
+                volume
+            ))
+        except Exception:
+            pass
+    return rows
+
+
+def decode_columnar(body, coin_id):
+    return decode_candles(body).records(coin_id)
+
+
+def decode_columnar_json(body, coin_id):
+    # orjson 없이 표준 json으로 파싱하는 경우
+    return decode_candles(json.loads(body)).records(coin_id)
+
+
+def measure(decode, bodies, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        candles = sum(len(decode(body, 1)) for body in bodies)
+        best = min(best, time.perf_counter() - start_time)
+    return candles, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark candle response decoding over recorded fixtures")
+    parser.add_argument("--fixture", default=DEFAULT_FIXTURE)
+    parser.add_argument("--record", action="store_true", help="re-record the fixture before measuring")
+    parser.add_argument("--live", action="store_true", help="record from UPBIT_API_URL instead of a local mock")
+    parser.add_argument("--markets", type=int, default=20)
+    parser.add_argument("--pages", type=int, default=9, help="200-candle responses per market (9 is about 70 days)")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.record or not os.path.exists(args.fixture):
+        async def record():
+            if args.live:
+                return await record_fixtures(args.fixture, UPBIT_API_URL, args.markets, args.pages)
+            mock = MockUpbit(args.markets, rate_limit=1000, latency_ms=0, history_days=args.pages * 200 // 24 + 1)
+            runner, base_url = await start_mock_server(mock)
+            try:
+                return await record_fixtures(args.fixture, base_url, args.markets, args.pages)
+            finally:
+                await runner.cleanup()
+        print(f"Recorded {asyncio.run(record())} responses to {args.fixture}")
+
+    with open(args.fixture, "rb") as f:
+        bodies = [line.rstrip(b"\n") for line in f if line.strip()]
+
+    # 두 방식이 같은 행을 만드는지 확인 (가격 반올림은 NUMERIC(20, 8) 컬럼이 처리하므로 비교에서 맞춰 줌)
+    for body in bodies:
+        legacy = decode_legacy(body, 1)
+        columnar = [row[:2] + tuple(round(value, 8) for value in row[2:]) for row in decode_columnar(body, 1)]
+        assert legacy == columnar, "decoders disagree"
+
+    runs = [("legacy", decode_legacy), ("columnar json", decode_columnar_json)]
+    if candle_decoder.orjson is not None:
+        runs.append(("columnar orjson", decode_columnar))
+    print(f"{len(bodies)} responses")
+    baseline = None
+    for name, decode in runs:
+        candles, elapsed = measure(decode, bodies, args.repeat)
+        baseline = baseline or elapsed
+        print(f"{name:<16} {candles / elapsed:>12.0f} candles/s ({elapsed * 1000:.1f}ms, {baseline / elapsed:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
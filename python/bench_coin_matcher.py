@@ -0,0 +1,110 @@
+import os
+import re
+import time
+import argparse
+
+from chat_export import load_chat_messages
+from coin_matcher import COIN_ALIAS_QUERY, CoinMatcher
+
+# DB 없이 실행할 때 사용할 별칭 예시 (coin_id, 별칭, 별칭 종류)
+SAMPLE_ALIASES = [
+    (1, "BTC", "symbol"), (1, "비트코인", "name"), (1, "Bitcoin", "english"), (1, "비코", "slang"),
+    (2, "ETH", "symbol"), (2, "이더리움", "name"), (2, "Ethereum", "english"), (2, "이더", "slang"),
+    (3, "XRP", "symbol"), (3, "엑스알피(리플)", "name"), (3, "리플", "slang"),
+    (4, "DOGE", "symbol"), (4, "도지코인", "name"), (4, "Dogecoin", "english"), (4, "도지", "slang"),
+    (5, "SOL", "symbol"), (5, "솔라나", "name"), (5, "Solana", "english"),
+    (6, "ADA", "symbol"), (6, "에이다", "name"), (6, "Cardano", "english"),
+    (7, "SHIB", "symbol"), (7, "시바이누", "name"), (7, "Shiba Inu", "english"), (7, "시바", "slang"),
+    (8, "TRX", "symbol"), (8, "트론", "name"), (8, "TRON", "english"),
+    (9, "AVAX", "symbol"), (9, "아발란체", "name"), (9, "Avalanche", "english"),
+    (10, "LINK", "symbol"), (10, "체인링크", "name"), (10, "Chainlink", "english"),
+    # 일반 단어와 겹치는 심볼과 영문 이름
+    (11, "SNT", "symbol"), (11, "스테이터스네트워크토큰", "name"), (11, "Status", "english"),
+    (12, "FLOW", "symbol"), (12, "플로우", "name"), (12, "Flow", "english"),
+    (13, "SAND", "symbol"), (13, "샌드박스", "name"), (13, "The Sandbox", "english"),
+    (14, "GAS", "symbol"), (14, "가스", "name"), (14, "Gas", "english"),
+    (15, "CORE", "symbol"), (15, "코어", "name"), (15, "Core", "english"),
+    (16, "ONE", "symbol"), (16, "하모니", "name"), (16, "Harmony", "english"),
+]
+
+# 코인 언급으로 세면 안 되는 문장과 세어야 하는 문장 (메시지, 기대하는 coin_id 집합)
+FALSE_POSITIVE_CASES = [
+    ("status update 올려주세요", set()),
+    ("cash flow가 안 좋네", set()),
+    ("sand 색깔 예쁘다", set()),
+    ("gas fee 너무 비싸", set()),
+    ("core 멤버 모집", set()),
+    ("one more time", set()),
+    ("btc 간다", set()),
+    ("Flow 떡상", {12}),
+    ("FLOW 간다", {12}),
+    ("GAS 매수", {14}),
+    ("$sand 가즈아", {13}),
+    ("Status 공시 떴다", {11}),
+    ("the sandbox 신고가", {13}),
+    ("BTC가 간다", {1}),
+]
+
+
+# 기존 방식: 코인(별칭)마다 정규식을 새로 만들어 검사
+def match_coins_with_regex(reaction_text, coin_aliases):
+    detected_coins = set()
+    for coin_id, alias, _ in coin_aliases:
+        if re.search(rf'\b{re.escape(alias)}', reaction_text, re.IGNORECASE):
+            detected_coins.add(coin_id)
+    return list(detected_coins)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the coin alias automaton against the per-coin regex loop")
+    parser.add_argument("--data-dir", default=os.path.join(os.path.dirname(__file__), "..", "data"))
+    parser.add_argument("--repeat", type=int, default=5, help="number of passes over the messages")
+    parser.add_argument("--db", action="store_true", help="load aliases from the database instead of the sample list")
+    args = parser.parse_args()
+
+    if args.db:
+        from db_connector import get_db_connection
+        conn = get_db_connection("data_scheduler")
+        with conn.cursor() as cur:
+            cur.execute(COIN_ALIAS_QUERY)
+            aliases = cur.fetchall()
+        conn.close()
+    else:
+        aliases = SAMPLE_ALIASES
+
+    messages = load_chat_messages(args.data_dir) * args.repeat
+    print(f"{len(messages)} messages, {len(aliases)} aliases")
+
+    start_time = time.perf_counter()
+    matcher = CoinMatcher(aliases)
+    print(f"automaton build: {(time.perf_counter() - start_time) * 1000:.1f} ms")
+
+    results = {}
+    for name, match in (
+        ("regex", lambda text: match_coins_with_regex(text, aliases)),
+        ("automaton", matcher.find),
+    ):
+        start_time = time.perf_counter()
+        results[name] = [set(match(text)) for text in messages]
+        elapsed = time.perf_counter() - start_time
+        mentions = sum(len(coins) for coins in results[name])
+        print(f"{name:<10} {len(messages) / elapsed:>12.1f} msg/s  {mentions} mentions")
+
+    # 일반 단어와 겹치는 별칭의 오탐 확인 (샘플 별칭 기준)
+    if not args.db:
+        for name, match in (
+            ("regex", lambda text: match_coins_with_regex(text, aliases)),
+            ("automaton", matcher.find),
+        ):
+            wrong = [(text, sorted(match(text))) for text, expected in FALSE_POSITIVE_CASES if set(match(text)) != expected]
+            print(f"{name:<10} {len(FALSE_POSITIVE_CASES) - len(wrong)}/{len(FALSE_POSITIVE_CASES)} false-positive cases correct")
+            for text, found in wrong:
+                print(f"    {text!r} -> {found}")
+
+    # 경계 규칙이 달라 결과가 다른 메시지 수 (예: 트리플 안의 리플은 오토마톤만 제외)
+    differing = sum(a != b for a, b in zip(results["regex"], results["automaton"]))
+    print(f"messages with different matches: {differing}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+import time
+import random
+import asyncio
+import argparse
+from datetime import datetime, timedelta
+
+from db_connector import close_db_pools, get_db_pool
+
+# Coin_OHLCV와 같은 열과 기본 키를 가진 공유 테이블에 적재해 비교 (롤업과 알림 없이 순수 쓰기 비용만 측정)
+# 모든 연결이 같은 테이블과 인덱스에 쓰므로 병렬 적재의 경합도 함께 측정됨
+BENCH_TABLE_SQL = """
+    CREATE {unlogged} TABLE IF NOT EXISTS public.bench_coin_ohlcv (
+        coin_id INT,
+        timestamp TIMESTAMP NOT NULL,
+        open NUMERIC(20, 8) NOT NULL,
+        high NUMERIC(20, 8) NOT NULL,
+        low NUMERIC(20, 8) NOT NULL,
+        close NUMERIC(20, 8) NOT NULL,
+        volume NUMERIC(20, 8) NOT NULL,
+        PRIMARY KEY (coin_id, timestamp)
+    );
+"""
+
+# 수집기와 같이 연결마다 한 번 만들고 커밋할 때 비워지는 스테이징 테이블
+BENCH_STAGING_SQL = """
+    CREATE TEMP TABLE bench_staging_coin_ohlcv (
+        coin_id INT,
+        timestamp TIMESTAMP,
+        open NUMERIC(20, 8),
+        high NUMERIC(20, 8),
+        low NUMERIC(20, 8),
+        close NUMERIC(20, 8),
+        volume NUMERIC(20, 8)
+    ) ON COMMIT DELETE ROWS;
+"""
+
+COLUMNS = ["coin_id", "timestamp", "open", "high", "low", "close", "volume"]
+
+
+def generate_rows(coin_id, hours):
+    start = datetime(2024, 10, 1)
+    price = 1000 + random.random() * 1000
+    rows = []
+    for i in range(hours):
+        price *= 1 + random.gauss(0, 0.01)
+        rows.append((coin_id, start + timedelta(hours=i), price, price * 1.01, price * 0.99, price, random.random() * 1000))
+    return rows
+
+
+async def init_bench_connection(conn):
+    await conn.execute(BENCH_STAGING_SQL)
+
+
+# 기존 방식: 캔들마다 INSERT ... ON CONFLICT DO NOTHING (executemany)
+async def write_with_executemany(conn, rows):
+    async with conn.transaction():
+        await conn.executemany("""
+            INSERT INTO public.bench_coin_ohlcv (coin_id, timestamp, open, high, low, close, volume)
+            VALUES ($1, $2, $3, $4, $5, $6, $7)
+            ON CONFLICT (coin_id, timestamp) DO NOTHING;
+        """, rows)
+
+
+# 새 방식: 스테이징 테이블로 COPY 후 한 문장으로 병합
+async def write_with_copy(conn, rows):
+    async with conn.transaction():
+        await conn.copy_records_to_table("bench_staging_coin_ohlcv", records=rows, columns=COLUMNS)
+        await conn.execute("""
+            INSERT INTO public.bench_coin_ohlcv (coin_id, timestamp, open, high, low, close, volume)
+            SELECT coin_id, timestamp, open, high, low, close, volume
+            FROM bench_staging_coin_ohlcv
+            ON CONFLICT (coin_id, timestamp) DO NOTHING;
+        """)
+
+
+async def run(pool, write, markets, parallel):
+    async def write_market(rows):
+        async with pool.acquire() as conn:
+            await write(conn, rows)
+
+    start_time = time.perf_counter()
+    if parallel:
+        await asyncio.gather(*(write_market(rows) for rows in markets))
+    else:
+        for rows in markets:
+            await write_market(rows)
+    return time.perf_counter() - start_time
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark executemany against COPY + merge for OHLCV backfills")
+    parser.add_argument("--markets", type=int, default=20)
+    parser.add_argument("--hours", type=int, default=1680, help="candles per market (70 days by default)")
+    parser.add_argument("--rounds", type=int, default=3, help="runs per method (the median is reported)")
+    parser.add_argument("--unlogged", action="store_true", help="write to an UNLOGGED table (no WAL)")
+    args = parser.parse_args()
+
+    markets = [generate_rows(coin_id, args.hours) for coin_id in range(args.markets)]
+    total = args.markets * args.hours
+    pool = await get_db_pool("data_collector", init=init_bench_connection)
+    async with pool.acquire() as conn:
+        await conn.execute(BENCH_TABLE_SQL.format(unlogged="UNLOGGED" if args.unlogged else ""))
+    print(f"{args.markets} markets x {args.hours} candles, {'unlogged' if args.unlogged else 'logged'} table, pool of {pool.get_max_size()}")
+
+    try:
+        for name, write, parallel in (
+            ("executemany", write_with_executemany, False),
+            ("copy", write_with_copy, False),
+            ("copy parallel", write_with_copy, True),
+        ):
+            timings = []
+            for _ in range(args.rounds):
+                # 매번 빈 테이블에 백필하는 상황으로 측정
+                async with pool.acquire() as conn:
+                    await conn.execute("TRUNCATE public.bench_coin_ohlcv;")
+                timings.append(await run(pool, write, markets, parallel))
+            elapsed = sorted(timings)[len(timings) // 2]
+            print(f"{name:<14} {total / elapsed:>10.0f} candles/s ({elapsed:.2f}s)")
+    finally:
+        async with pool.acquire() as conn:
+            await conn.execute("DROP TABLE IF EXISTS public.bench_coin_ohlcv;")
+        await close_db_pools()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,44 @@
+import os
+import random
+import argparse
+
+from chat_export import load_chat_messages
+from sentiment_engine import BACKENDS, SENTIMENT_TOKEN_BUDGET, SentimentEngine
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sentiment inference backends on bundled chat exports")
+    parser.add_argument("--data-dir", default=os.path.join(os.path.dirname(__file__), "..", "data"))
+    parser.add_argument("--limit", type=int, default=2000, help="number of messages to sample")
+    parser.add_argument("--backends", default=",".join(BACKENDS))
+    parser.add_argument("--token-budget", type=int, default=SENTIMENT_TOKEN_BUDGET)
+    parser.add_argument("--threads", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    messages = load_chat_messages(args.data_dir)
+    random.Random(args.seed).shuffle(messages)
+    messages = messages[:args.limit]
+    print(f"Loaded {len(messages)} messages from {args.data_dir}")
+
+    # 다른 백엔드의 결과는 fp32 결과와의 일치율로 비교
+    backends = ["fp32"] + [backend for backend in args.backends.split(",") if backend != "fp32"]
+    reference = None
+    print(f"{'backend':<8} {'msg/s':>10} {'agreement':>10}")
+    for backend in backends:
+        try:
+            engine = SentimentEngine(backend, token_budget=args.token_budget, num_threads=args.threads)
+        except RuntimeError as e:
+            print(f"{backend:<8} skipped: {e}")
+            continue
+
+        engine.predict(messages[:32])  # 워밍업
+        sentiments, rate = engine.throughput(messages)
+        if reference is None:
+            reference = sentiments
+        agreement = sum(a == b for a, b in zip(sentiments, reference)) / max(len(reference), 1)
+        print(f"{backend:<8} {rate:>10.1f} {agreement:>10.2%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import time
+import asyncio
+import argparse
+
+import aiohttp
+
+from mock_upbit_server import MockUpbit, start_mock_server
+from upbit_client import UPBIT_CONCURRENCY, UPBIT_RATE_LIMIT, UpbitClient, gather_bounded
+
+
+# 기존 방식: 요청마다 새 세션을 열고 마켓을 하나씩 0.5초 간격으로 조회
+async def refresh_sequential(base_url, markets):
+    for market, _ in markets:
+        async with aiohttp.ClientSession() as session:
+            async with session.get(f"{base_url}/v1/candles/minutes/60", params={"market": market, "count": 10}) as response:
+                await response.json()
+        await asyncio.sleep(0.5)
+    return len(markets), 0
+
+
+# 새 방식: 공유 세션 + 토큰 버킷 + 제한된 동시성
+async def refresh_concurrent(base_url, markets, rate_limit, concurrency):
+    async with UpbitClient(base_url, rate_limit=rate_limit, concurrency=concurrency) as client:
+        results = await gather_bounded(
+            (client.get_candles(market, count=10) for market, _ in markets), concurrency
+        )
+        failures = [result for result in results if isinstance(result, Exception)]
+        if failures:
+            raise failures[0]
+        return client.requests, client.retries
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark one OHLCV refresh cycle against a local mock Upbit server")
+    parser.add_argument("--markets", type=int, default=150)
+    parser.add_argument("--rate-limit", type=float, default=UPBIT_RATE_LIMIT)
+    parser.add_argument("--concurrency", type=int, default=UPBIT_CONCURRENCY)
+    parser.add_argument("--latency-ms", type=int, default=30)
+    parser.add_argument("--skip-sequential", action="store_true", help="skip the slow legacy loop")
+    args = parser.parse_args()
+
+    mock = MockUpbit(args.markets, int(args.rate_limit), args.latency_ms)
+    runner, base_url = await start_mock_server(mock)
+    markets = mock.markets
+
+    # 한도 내에서 가능한 최소 시간 (첫 요청은 바로 나가므로 n-1 간격)
+    minimum = (len(markets) - 1) / args.rate_limit
+    print(f"{len(markets)} markets, rate limit {args.rate_limit:g}/s, minimum {minimum:.1f}s")
+
+    runs = [("concurrent", lambda: refresh_concurrent(base_url, markets, args.rate_limit, args.concurrency))]
+    if not args.skip_sequential:
+        runs.insert(0, ("sequential", lambda: refresh_sequential(base_url, markets)))
+
+    for name, run in runs:
+        rejected_before = mock.rejected
+        start_time = time.perf_counter()
+        requests, retries = await run()
+        elapsed = time.perf_counter() - start_time
+        print(
+            f"{name:<11} {elapsed:>6.1f}s  {requests} requests, {retries} retries, "
+            f"{mock.rejected - rejected_before} rejected by server ({elapsed / minimum:.2f}x minimum)"
+        )
+
+    await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,156 @@
+import io
+import os
+import logging
+from datetime import datetime
+
+# 대량 적재 설정
+BULK_FLUSH_ROWS = int(os.getenv("BULK_FLUSH_ROWS", 50000))  # 이만큼 쌓이면 COPY 후 병합
+
+
+def _csv_field(value):
+    # None은 따옴표 없는 빈 값(NULL), 나머지는 따옴표로 감싸 빈 문자열과 구분
+    if value is None:
+        return ""
+    if isinstance(value, (list, tuple)):
+        value = _array_literal(value)
+    elif isinstance(value, datetime):
+        value = value.isoformat(sep=" ")
+    elif isinstance(value, (int, float)):
+        return str(value)
+    else:
+        value = str(value)
+    return '"' + value.replace('"', '""') + '"'
+
+
+def _array_literal(values):
+    # PostgreSQL 배열 리터럴: {"a","b"} (원소 안의 역슬래시와 큰따옴표는 역슬래시로 이스케이프)
+    elements = []
+    for value in values:
+        if value is None:
+            elements.append("NULL")
+        else:
+            elements.append('"' + str(value).replace("\\", "\\\\").replace('"', '\\"') + '"')
+    return "{" + ",".join(elements) + "}"
+
+
+class BulkWriter:
+    """
+    행을 임시 스테이징 테이블에 COPY FROM STDIN(CSV)으로 흘려 넣은 뒤,
+    INSERT ... SELECT ... ON CONFLICT 한 문장으로 대상 테이블에 병합합니다.
+    execute_values보다 문장 파싱과 튜플 포맷팅 비용이 적어 대량 백필에 적합합니다.
+    커밋은 호출한 쪽에서 하므로 진행 위치 저장 등과 같은 트랜잭션으로 묶을 수 있습니다.
+    """
+
+    def __init__(self, conn, staging_table, staging_columns, merge_sql, flush_rows=BULK_FLUSH_ROWS):
+        """
+        Args:
+            conn: psycopg2 연결
+            staging_table (str): 세션 동안 재사용할 임시 테이블 이름
+            staging_columns (list[tuple[str, str]]): (컬럼 이름, 타입) 목록
+            merge_sql (str): 스테이징 테이블에서 대상 테이블로 병합하는 문장 ({staging}에 테이블 이름이 들어감)
+            flush_rows (int): 자동으로 flush할 행 수
+        """
+        self.conn = conn
+        self.staging_table = staging_table
+        self.columns = [name for name, _ in staging_columns]
+        self.merge_sql = merge_sql.format(staging=staging_table)
+        self.flush_rows = flush_rows
+        self._buffer = io.StringIO()
+        self._pending = 0
+        self.written = 0
+
+        with conn.cursor() as cur:
+            cur.execute(f"""
+                CREATE TEMP TABLE IF NOT EXISTS {staging_table} (
+                    {", ".join(f"{name} {column_type}" for name, column_type in staging_columns)}
+                );
+            """)
+
+    def add(self, row):
+        self._buffer.write(",".join(_csv_field(value) for value in row))
+        self._buffer.write("\n")
+        self._pending += 1
+        if self._pending >= self.flush_rows:
+            self.flush()
+
+    def add_many(self, rows):
+        for row in rows:
+            self.add(row)
+
+    def flush(self):
+        """버퍼의 행을 COPY로 적재하고 병합합니다. 병합된(영향 받은) 행 수를 반환합니다."""
+        if not self._pending:
+            return 0
+        self._buffer.seek(0)
+        with self.conn.cursor() as cur:
+            cur.copy_expert(
+                f"COPY {self.staging_table} ({', '.join(self.columns)}) FROM STDIN WITH (FORMAT csv)",
+                self._buffer,
+            )
+            cur.execute(self.merge_sql)
+            merged = cur.rowcount
+            cur.execute(f"TRUNCATE {self.staging_table};")
+
+        logging.info(f"Bulk merged {merged} of {self._pending} rows via {self.staging_table}.")
+        self.written += self._pending
+        self._buffer = io.StringIO()
+        self._pending = 0
+        return merged
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.flush()
+
+
+# 분석 결과 스테이징 (형태소나 감정 중 비어 있는 값은 기존 값을 유지)
+ANALYSIS_STAGING_COLUMNS = [
+    ("timestamp", "TIMESTAMP"),
+    ("reaction_id", "UUID"),
+    ("nouns", "TEXT[]"),
+    ("adjectives", "TEXT[]"),
+    ("verbs", "TEXT[]"),
+    ("interjections", "TEXT[]"),
+    ("sentiment", "VARCHAR(10)"),
+]
+
+ANALYSIS_MERGE_SQL = """
+    INSERT INTO public.Community_Analysis (timestamp, reaction_id, nouns, adjectives, verbs, interjections, sentiment)
+    SELECT timestamp, reaction_id, nouns, adjectives, verbs, interjections, sentiment
+    FROM {staging}
+    ON CONFLICT (reaction_id, timestamp) DO UPDATE
+    SET
+        nouns = COALESCE(EXCLUDED.nouns, Community_Analysis.nouns),
+        adjectives = COALESCE(EXCLUDED.adjectives, Community_Analysis.adjectives),
+        verbs = COALESCE(EXCLUDED.verbs, Community_Analysis.verbs),
+        interjections = COALESCE(EXCLUDED.interjections, Community_Analysis.interjections),
+        sentiment = COALESCE(EXCLUDED.sentiment, Community_Analysis.sentiment);
+"""
+
+# 코인 연결 스테이징 (analysis_id는 병합할 때 조인으로 조회)
+COIN_LINK_STAGING_COLUMNS = [
+    ("reaction_id", "UUID"),
+    ("timestamp", "TIMESTAMP"),
+    ("coin_id", "INT"),
+]
+
+COIN_LINK_MERGE_SQL = """
+    INSERT INTO public.Community_Analysis_Coins (analysis_id, timestamp, coin_id)
+    SELECT a.analysis_id, a.timestamp, s.coin_id
+    FROM {staging} s
+    JOIN public.Community_Analysis a
+        ON a.reaction_id = s.reaction_id AND a.timestamp = s.timestamp
+    ON CONFLICT DO NOTHING;
+"""
+
+
+def analysis_writer(conn, flush_rows=BULK_FLUSH_ROWS):
+    """(timestamp, reaction_id, nouns, adjectives, verbs, interjections, sentiment) 행을 Community_Analysis에 병합"""
+    return BulkWriter(conn, "staging_community_analysis", ANALYSIS_STAGING_COLUMNS, ANALYSIS_MERGE_SQL, flush_rows)
+
+
+def coin_link_writer(conn, flush_rows=BULK_FLUSH_ROWS):
+    """(reaction_id, timestamp, coin_id) 행을 Community_Analysis_Coins에 병합"""
+    return BulkWriter(conn, "staging_community_analysis_coins", COIN_LINK_STAGING_COLUMNS, COIN_LINK_MERGE_SQL, flush_rows)
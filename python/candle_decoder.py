@@ -0,0 +1,98 @@
+import json
+import logging
+from datetime import datetime
+from itertools import repeat
+from operator import itemgetter
+
+# orjson은 선택 의존성 (없으면 표준 json으로 처리)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# 응답 본문(bytes)을 그대로 파싱 (orjson은 str로 디코딩하는 단계도 건너뜀)
+json_loads = orjson.loads if orjson is not None else json.loads
+
+CANDLE_FIELDS = (
+    'candle_date_time_kst',
+    'opening_price',
+    'high_price',
+    'low_price',
+    'trade_price',
+    'candle_acc_trade_volume',
+)
+_candle_getter = itemgetter(*CANDLE_FIELDS)
+
+VOLUME_OVERFLOW = 1e12  # NUMERIC(20, 8)에 들어가지 않는 거래량은 10^6으로 나눠 저장
+
+
+class CandleColumns:
+    """캔들 응답을 필드별 리스트로 담은 컬럼 묶음"""
+
+    __slots__ = ("timestamp", "open", "high", "low", "close", "volume")
+
+    def __init__(self, timestamp=(), open_price=(), high=(), low=(), close=(), volume=()):
+        self.timestamp = list(timestamp)
+        self.open = list(open_price)
+        self.high = list(high)
+        self.low = list(low)
+        self.close = list(close)
+        self.volume = list(volume)
+
+    def __len__(self):
+        return len(self.timestamp)
+
+    def records(self, coin_id):
+        """Coin_OHLCV 열 순서의 행 [(coin_id, timestamp, open, high, low, close, volume), ...]"""
+        return list(zip(repeat(coin_id), self.timestamp, self.open, self.high, self.low, self.close, self.volume))
+
+
+def _scale_volume(volume):
+    if max(volume, default=0) > VOLUME_OVERFLOW:
+        return [value / 1_000_000 if value > VOLUME_OVERFLOW else value for value in volume]
+    return volume
+
+
+def decode_candles(candles):
+    """
+    Upbit 분봉 응답을 한 번에 컬럼으로 풉니다.
+    필드 추출(itemgetter)과 전치(zip)는 C 수준에서 처리되고, 시각은 fromisoformat으로 변환합니다.
+    가격 반올림은 NUMERIC(20, 8) 컬럼이 저장할 때 처리하므로 하지 않습니다.
+
+    Args:
+        candles (list[dict] | bytes): 파싱된 캔들 목록 또는 응답 본문
+
+    Returns:
+        CandleColumns
+    """
+    if isinstance(candles, (bytes, str)):
+        candles = json_loads(candles)
+    if not candles:
+        return CandleColumns()
+
+    try:
+        kst, open_price, high, low, close, volume = zip(*map(_candle_getter, candles))
+        timestamp = list(map(datetime.fromisoformat, kst))
+    except (KeyError, TypeError, ValueError):
+        # 형식이 어긋난 캔들이 있으면 한 건씩 확인하며 해당 캔들만 건너뜀
+        return _decode_candles_slow(candles)
+    return CandleColumns(timestamp, open_price, high, low, close, _scale_volume(volume))
+
+
+def _decode_candles_slow(candles):
+    columns = CandleColumns()
+    for candle in candles:
+        try:
+            kst, open_price, high, low, close, volume = _candle_getter(candle)
+            timestamp = datetime.fromisoformat(kst)
+        except (KeyError, TypeError, ValueError) as e:
+            logging.error(f"Error processing candle: {candle}, Error: {e}")
+            continue
+        columns.timestamp.append(timestamp)
+        columns.open.append(open_price)
+        columns.high.append(high)
+        columns.low.append(low)
+        columns.close.append(close)
+        columns.volume.append(volume)
+    columns.volume = _scale_volume(columns.volume)
+    return columns
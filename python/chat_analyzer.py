@@ -1,13 +1,16 @@
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
-import torch
-import pandas as pd
 import psycopg2
-from konlpy.tag import Okt
-from psycopg2.extras import execute_values
+import os
 import time
+import argparse
+from multiprocessing import Pool
+from datetime import timedelta
 from apscheduler.schedulers.background import BackgroundScheduler
 from db_connector import get_db_connection
-import re
+from coin_matcher import COIN_ALIAS_QUERY, get_coin_matcher
+from sentiment_engine import get_sentiment_engine
+from analysis_cache import AnalysisResultCache, text_hash
+from analysis_pipeline import PipelineStage, ReactionPipeline
+from bulk_writer import analysis_writer, coin_link_writer
 
 import logging
 from logging.handlers import RotatingFileHandler
@@ -29,91 +32,239 @@ logging.basicConfig(
     ]
 )
 
-# 모델 로드 및 설정
-device = torch.device('cpu')  # CPU에서 실행
+# 텍스트 해시별 분석 결과 캐시 (스케줄러 프로세스 동안 유지)
+morphology_cache = AnalysisResultCache("morphology")
+sentiment_cache = AnalysisResultCache("sentiment")
 
-# KR-FinBert-SC 모델과 토크나이저 로드
-logging.info("Loading model and tokenizer...")
-tokenizer = AutoTokenizer.from_pretrained('snunlp/KR-FinBert-SC')
-model = AutoModelForSequenceClassification.from_pretrained('snunlp/KR-FinBert-SC').to(device)
+# 형태소 분석 워커 설정
+MORPHOLOGY_WORKERS = int(os.getenv("MORPHOLOGY_WORKERS", os.cpu_count() or 1))  # 워커 프로세스 수
+MORPHOLOGY_CHUNK_SIZE = int(os.getenv("MORPHOLOGY_CHUNK_SIZE", 200))  # 워커에 한 번에 넘길 메시지 수
 
-# 모델을 'half-precision' (float16)으로 변환하여 메모리 최적화
-model = model.half()  # 모델을 float16으로 변환 (가능한 경우)
-logging.info("Model loaded and converted to half-precision.")
+# 프로세스별 Okt 인스턴스 (JVM 기반이라 생성 비용이 커서 프로세스당 한 번만, 처음 사용할 때 생성)
+_okt = None
+
+def get_okt():
+    global _okt
+    if _okt is None:
+        from konlpy.tag import Okt
+        _okt = Okt()
+    return _okt
 
 # 형태소 분석 함수 (Okt 사용)
 def analyze_text(reaction_text):
-    okt = Okt()
-    
-    # 명사 추출
-    nouns = okt.nouns(reaction_text)
-    
-    # 형태소 분석 후 명사, 형용사, 동사 추출
-    pos_tags = okt.pos(reaction_text)
+    # 한 번의 품사 태깅 결과에서 명사, 형용사, 동사, 감탄사를 모두 추출 (okt.nouns도 내부적으로 pos를 다시 수행함)
+    pos_tags = get_okt().pos(reaction_text)
+    nouns = [word for word, tag in pos_tags if tag == 'Noun']
     adjectives = [word for word, tag in pos_tags if tag == 'Adjective']
     verbs = [word for word, tag in pos_tags if tag == 'Verb']
     interjections = [word for word, tag in pos_tags if tag == 'Exclamation']
     
     return nouns, adjectives, verbs, interjections
 
+# 워커 프로세스 초기화: Okt(JVM)는 fork 이후 각 워커에서 만들고 한 번 분석해 준비해 둠
+def init_morphology_worker():
+    get_okt().pos("비트코인 가즈아")
+
+# 워커 프로세스에서 메시지 묶음을 분석
+def analyze_text_chunk(texts):
+    return [analyze_text(text) for text in texts]
+
+# 텍스트 목록을 워커 풀에 묶음 단위로 나누어 보내고, 입력 순서대로 분석 결과를 돌려줌
+def analyze_texts_in_pool(pool, texts, chunk_size=MORPHOLOGY_CHUNK_SIZE):
+    text_chunks = (texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size))
+
+    # imap은 제출 순서대로 결과를 돌려주므로 이어 붙이면 입력 순서와 같음
+    results = []
+    for chunk_results in pool.imap(analyze_text_chunk, text_chunks):
+        results.extend(chunk_results)
+    return results
+
+# 캐시에 없는 텍스트만 analyze로 분석하고, 반응마다 (해시 기준으로 재사용한) 결과를 입력 순서대로 반환
+def analyze_with_cache(conn, cache, texts, analyze):
+    keys = [text_hash(text) for text in texts]
+    results = cache.lookup(conn, keys)
+
+    # 같은 내용의 텍스트는 한 번만 분석
+    pending = {}
+    for key, text in zip(keys, texts):
+        if key not in results:
+            pending.setdefault(key, text)
+    if pending:
+        new_results = dict(zip(pending, analyze(list(pending.values()))))
+        cache.store(conn, new_results)
+        results.update(new_results)
+    return [results[key] for key in keys]
+
 # 감정 분석 함수
 def analyze_sentiment(texts):
-    labels = ['positive', 'neutral', 'negative']
-    inputs = tokenizer(texts, return_tensors='pt', truncation=True, padding=True, max_length=512).to(device)
-    
-    with torch.no_grad():
-        outputs = model(**inputs)
-        
-    logits = outputs.logits
-    predicted_classes = torch.argmax(logits, dim=-1).cpu().numpy()
-    predicted_sentiments = [labels[predicted_class] for predicted_class in predicted_classes]
-    return predicted_sentiments
+    return get_sentiment_engine().predict(texts)
+
+# 모델과 형태소 분석기를 미리 로드하고 한 번 실행해 첫 요청의 지연을 없앰
+# 감정 분석 모델을 미리 로드
+# 형태소 분석기는 여기서 만들지 않음: JPype JVM은 fork를 견디지 못하므로 워커 풀보다 먼저 부모 프로세스에서 Okt를 만들면
+# 워커가 죽은 JVM에 묶인 _okt를 물려받음 (워커마다 init_morphology_worker에서 준비)
+def warm_up():
+    start_time = time.perf_counter()
+    analyze_sentiment(["비트코인 가즈아"])
+    logging.info(f"Warm-up complete in {time.perf_counter() - start_time:.1f}s.")
+
+# 미처리 반응 스트리밍 설정
+ANALYZER_FETCH_SIZE = int(os.getenv("ANALYZER_FETCH_SIZE", 1000))  # 서버 측 커서에서 한 번에 읽을 행 수
+ANALYZER_WATERMARK_LOOKBACK_HOURS = int(os.getenv("ANALYZER_WATERMARK_LOOKBACK_HOURS", 24))  # 늦게 적재된 반응을 위해 진행 위치보다 앞서 다시 볼 시간
+
+NIL_UUID = "00000000-0000-0000-0000-000000000000"
+
+# 작업별 미처리 반응 조회 쿼리 (NOT EXISTS 안티 조인으로 이미 처리된 반응 제외)
+PENDING_REACTION_QUERIES = {
+    "morphology": """
+        SELECT r.reaction_id, r.timestamp, r.reaction_text, r.chat_name
+        FROM public.Community_Reactions r
+        WHERE r.timestamp > NOW() - INTERVAL '1 month'
+        AND NOT EXISTS (
+            SELECT 1 FROM public.Community_Analysis a
+            WHERE a.reaction_id = r.reaction_id AND a.timestamp = r.timestamp
+        )
+    """,
+    "sentiment": """
+        SELECT r.reaction_id, r.timestamp, r.reaction_text
+        FROM public.Community_Reactions r
+        WHERE NOT EXISTS (
+            SELECT 1 FROM public.Community_Analysis a
+            WHERE a.reaction_id = r.reaction_id AND a.timestamp = r.timestamp
+            AND a.sentiment IS NOT NULL
+        )
+    """,
+    # 통합 파이프라인은 분석 행이 아직 없는 반응을 한 번만 읽어 모든 분석을 수행
+    "pipeline": """
+        SELECT r.reaction_id, r.timestamp, r.reaction_text, r.chat_name
+        FROM public.Community_Reactions r
+        WHERE r.timestamp > NOW() - INTERVAL '1 month'
+        AND NOT EXISTS (
+            SELECT 1 FROM public.Community_Analysis a
+            WHERE a.reaction_id = r.reaction_id AND a.timestamp = r.timestamp
+        )
+    """,
+    # 코인 매칭은 형태소 분석 행(analysis_id)이 있는 반응만 대상
+    "coin_matching": """
+        SELECT r.reaction_id, r.timestamp, r.reaction_text
+        FROM public.Community_Reactions r
+        JOIN public.Community_Analysis a
+            ON a.reaction_id = r.reaction_id AND a.timestamp = r.timestamp
+        WHERE NOT EXISTS (
+            SELECT 1 FROM public.Community_Analysis_Coins c
+            WHERE c.analysis_id = a.analysis_id AND c.timestamp = a.timestamp
+        )
+    """,
+}
+
+# 작업의 진행 위치 조회
+def load_watermark(conn, job_name):
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT last_timestamp, last_reaction_id
+            FROM public.Analyzer_Watermarks
+            WHERE job_name = %s;
+        """, (job_name,))
+        return cur.fetchone()  # (last_timestamp, last_reaction_id) 또는 None
+
+# 작업의 진행 위치 저장 (호출한 쪽의 트랜잭션과 함께 커밋됨)
+def save_watermark(conn, job_name, last_timestamp, last_reaction_id):
+    with conn.cursor() as cur:
+        cur.execute("""
+            INSERT INTO public.Analyzer_Watermarks (job_name, last_timestamp, last_reaction_id, updated_at)
+            VALUES (%s, %s, %s, NOW())
+            ON CONFLICT (job_name) DO UPDATE
+            SET
+                last_timestamp = EXCLUDED.last_timestamp,
+                last_reaction_id = EXCLUDED.last_reaction_id,
+                updated_at = EXCLUDED.updated_at;
+        """, (job_name, last_timestamp, str(last_reaction_id)))
+
+# 작업의 미처리 반응을 (timestamp, reaction_id) 순서로 chunk_size씩 읽어 반환
+def stream_pending_reactions(job_name, chunk_size=ANALYZER_FETCH_SIZE, lookback_hours=ANALYZER_WATERMARK_LOOKBACK_HOURS):
+    """
+    진행 위치 이후의 미처리 반응을 서버 측 커서로 나누어 읽습니다.
+    쓰기 연결의 커밋이 커서에 영향을 주지 않도록 읽기 전용 연결을 따로 사용하므로,
+    백로그 크기와 관계없이 메모리에는 chunk_size 행만 올라옵니다.
+
+    Args:
+        job_name (str): PENDING_REACTION_QUERIES의 작업 이름
+        chunk_size (int): 한 번에 읽을 행 수
+        lookback_hours (int): 진행 위치보다 앞서 다시 볼 시간 (0이면 진행 위치 바로 다음부터)
+
+    Returns:
+        Iterator[list[tuple]]: 작업 쿼리의 행 목록 묶음 (마지막 행이 묶음의 최대 (timestamp, reaction_id))
+    """
+    conn = get_db_connection("data_scheduler")
+    conn.set_session(readonly=True)
+    try:
+        watermark = load_watermark(conn, job_name)
+        query = PENDING_REACTION_QUERIES[job_name]
+        params = {}
+        if watermark:
+            last_timestamp, last_reaction_id = watermark
+            if lookback_hours > 0:
+                last_timestamp -= timedelta(hours=lookback_hours)
+                last_reaction_id = NIL_UUID
+            # timestamp 조건은 파티션 프루닝용, 행 비교는 같은 시각의 반응을 이어서 읽기 위함
+            query += """
+                AND r.timestamp >= %(last_timestamp)s
+                AND (r.timestamp, r.reaction_id) > (%(last_timestamp)s, %(last_reaction_id)s::uuid)
+            """
+            params = {"last_timestamp": last_timestamp, "last_reaction_id": str(last_reaction_id)}
+        query += " ORDER BY r.timestamp, r.reaction_id"
+
+        with conn.cursor(name=f"pending_{job_name}") as cur:
+            cur.itersize = chunk_size
+            cur.execute(query, params)
+            while True:
+                rows = cur.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield rows
+    finally:
+        conn.close()
 
 def analyze_and_store_morphological_data():
     logging.info("Starting morphological analysis and data storage...")
     
     # DB 연결
     conn = get_db_connection("data_scheduler")
-    cur = conn.cursor()
     logging.info("Database connection established.")
 
-    # 최근 커뮤니티 반응 조회
-    cur.execute(""" 
-        SELECT reaction_id, timestamp, reaction_text, chat_name 
-        FROM public.Community_Reactions
-        WHERE timestamp > NOW() - INTERVAL '1 month'
-        AND reaction_id NOT IN (
-            SELECT DISTINCT reaction_id FROM public.Community_Analysis
-        );  -- 이미 분석된 데이터를 제외
-    """)
-    reactions = cur.fetchall()
-    logging.info(f"Fetched {len(reactions)} reactions for morphological analysis.")
-
-    # 분석 결과를 저장할 데이터 준비
-    analysis_data = []
-    batch_size = 1000
-
-    for idx, reaction in enumerate(reactions):
-        reaction_id, timestamp, reaction_text, chat_name = reaction
-        nouns, adjectives, verbs, interjections = analyze_text(reaction_text)
-        
-        # 형태소 분석 결과 저장 준비
-        analysis_data.append((timestamp, reaction_id, nouns, adjectives, verbs, interjections))
-
-        # 배치 크기에 도달하면 삽입
-        if (idx + 1) % batch_size == 0 or (idx + 1) == len(reactions):
-            logging.info(f"Inserting morphological data for batch {idx + 1}...")
-            execute_values(cur, """
-                INSERT INTO public.Community_Analysis (timestamp, reaction_id, nouns, adjectives, verbs, interjections)
-                VALUES %s
-                ON CONFLICT (reaction_id, timestamp) DO NOTHING;
-            """, analysis_data)
+    # 분석 결과를 COPY로 적재할 writer 준비
+    writer = analysis_writer(conn)
+    processed = 0
+    start_time = time.perf_counter()
+
+    # 미처리 반응을 묶음 단위로 읽어 분석 후 저장
+    with Pool(MORPHOLOGY_WORKERS, initializer=init_morphology_worker) as pool:
+        for reactions in stream_pending_reactions("morphology"):
+            texts = [reaction_text for _, _, reaction_text, _ in reactions]
+            results = analyze_with_cache(conn, morphology_cache, texts, lambda pending: analyze_texts_in_pool(pool, pending))
 
+            for reaction, result in zip(reactions, results):
+                reaction_id, timestamp, reaction_text, chat_name = reaction
+                nouns, adjectives, verbs, interjections = result
+
+                # 형태소 분석 결과 적재 (감정은 비워 두어 기존 값을 유지)
+                writer.add((timestamp, reaction_id, nouns, adjectives, verbs, interjections, None))
+            processed += len(reactions)
+
+            logging.info(f"Inserting morphological data for batch {processed}...")
+            writer.flush()
+
+            # 결과와 진행 위치를 같은 트랜잭션으로 커밋
+            last_reaction_id, last_timestamp = reactions[-1][0], reactions[-1][1]
+            save_watermark(conn, "morphology", last_timestamp, last_reaction_id)
             conn.commit()
-            analysis_data.clear()
-            logging.info(f"Batch {idx + 1} inserted and committed.")
+            refresh_reaction_stats(conn, reactions)
+            elapsed = time.perf_counter() - start_time
+            logging.info(f"Batch {processed} inserted and committed. ({processed / elapsed:.1f} messages/sec, {MORPHOLOGY_WORKERS} workers)")
 
-    cur.close()
+    logging.info(f"Analyzed {processed} reactions.")
+    morphology_cache.log_stats("morphology")
+    morphology_cache.reset_stats()
     conn.close()
     logging.info("Morphological data storage complete.")
 
@@ -122,113 +273,133 @@ def analyze_and_store_sentiments():
     
     # DB 연결
     conn = get_db_connection("data_scheduler")
-    cur = conn.cursor()
     logging.info("Database connection established.")
 
-    # 아직 감정 분석이 수행되지 않은 데이터를 조회
-    cur.execute("""
-        SELECT reaction_id, timestamp, reaction_text 
-        FROM public.Community_Reactions
-        WHERE reaction_id NOT IN (
-            SELECT DISTINCT reaction_id 
-            FROM public.Community_Analysis
-            WHERE sentiment IS NOT NULL
-        );
-    """)
-    reactions = cur.fetchall()
-    logging.info(f"Fetched {len(reactions)} reactions for sentiment analysis.")
-
-    batch_size = 100
-    texts = []
-    sentiment_data = []
-
-    for idx, reaction in enumerate(reactions):
-        reaction_id, timestamp, reaction_text = reaction
-        texts.append(reaction_text)
-
-        # 배치 크기에 도달하거나 마지막 데이터일 경우 처리
-        if (idx + 1) % batch_size == 0 or (idx + 1) == len(reactions):
-            sentiments = analyze_sentiment(texts)
-            sentiment_data.extend(
-                (timestamp, reaction_id, sentiment) for sentiment, (_, timestamp, reaction_id) in zip(sentiments, reactions[idx - len(texts) + 1: idx + 1])
-            )
-            texts.clear()
-
-            # 감정 분석 결과 저장
-            logging.info(f"Inserting sentiment data for batch {idx + 1}...")
-            execute_values(cur, """
-                INSERT INTO public.Community_Analysis (timestamp, reaction_id, sentiment)
-                VALUES %s
-                ON CONFLICT (reaction_id, timestamp) DO UPDATE
-                SET sentiment = EXCLUDED.sentiment;
-            """, sentiment_data)
-
-            conn.commit()
-            sentiment_data.clear()
-            logging.info(f"Batch {idx + 1} inserted and committed.")
-
-    cur.close()
+    writer = analysis_writer(conn)
+    processed = 0
+
+    # 아직 감정 분석이 수행되지 않은 데이터를 묶음 단위로 읽어 처리 (추론 배치는 엔진이 토큰 길이 기준으로 구성)
+    for reactions in stream_pending_reactions("sentiment"):
+        texts = [reaction_text for _, _, reaction_text in reactions]
+        sentiments = analyze_with_cache(conn, sentiment_cache, texts, analyze_sentiment)
+        # 감정 분석 결과 적재 (형태소 컬럼은 비워 두어 기존 값을 유지)
+        writer.add_many(
+            (timestamp, reaction_id, None, None, None, None, sentiment)
+            for sentiment, (reaction_id, timestamp, _) in zip(sentiments, reactions)
+        )
+        processed += len(reactions)
+
+        logging.info(f"Inserting sentiment data for batch {processed}...")
+        writer.flush()
+
+        # 결과와 진행 위치를 같은 트랜잭션으로 커밋
+        last_reaction_id, last_timestamp = reactions[-1][0], reactions[-1][1]
+        save_watermark(conn, "sentiment", last_timestamp, last_reaction_id)
+        conn.commit()
+        refresh_reaction_stats(conn, reactions)
+        logging.info(f"Batch {processed} inserted and committed.")
+
+    sentiment_cache.log_stats("sentiment")
+    sentiment_cache.reset_stats()
     conn.close()
     logging.info("Sentiment analysis storage complete.")
 
 # 코인 이름과 별칭 가져오기
 def fetch_coin_aliases(conn):
     with conn.cursor() as cur:
-        cur.execute("SELECT coin_id, coin_name FROM Coins;")
-        return cur.fetchall()  # [(coin_id, coin_name), ...]
-
-# 분석할 커뮤니티 반응 가져오기
-def fetch_unprocessed_reactions(conn):
-    with conn.cursor() as cur:
-        cur.execute("""
-            SELECT reaction_id, timestamp, reaction_text
-            FROM Community_Reactions
-            WHERE reaction_id NOT IN (
-                SELECT DISTINCT reaction_id FROM Community_Analysis_Coins
-            );
-        """)
-        return cur.fetchall()  # [(reaction_id, timestamp, reaction_text), ...]
-
-# 코인 이름 매칭 로직
-def match_coins_in_text(reaction_text, coin_aliases):
-    detected_coins = set()  # 중복 제거를 위해 set 사용
-    for coin_id, alias in coin_aliases:
-        if re.search(rf'\b{re.escape(alias)}', reaction_text, re.IGNORECASE):
-            detected_coins.add(coin_id)
-    return list(detected_coins)
+        cur.execute(COIN_ALIAS_QUERY)
+        return cur.fetchall()  # [(coin_id, alias), ...]
+
+# 코인 이름 매칭 로직 (별칭 오토마톤으로 메시지를 한 번만 훑음)
+def match_coins_in_text(reaction_text, coin_matcher):
+    return coin_matcher.find(reaction_text)
+
+# 코인 매칭 결과를 Community_Analysis_Coins에 삽입 (커밋은 호출한 쪽에서 함)
+def insert_coin_links(cur, analysis_results):
+    # (reaction_id, timestamp, coin_id) 쌍을 컬럼별 배열로 펼쳐 한 번에 전송
+    reaction_ids, timestamps, coin_ids = [], [], []
+    for reaction_id, (timestamp, matched_coins) in analysis_results.items():
+        for coin_id in matched_coins:
+            reaction_ids.append(str(reaction_id))
+            timestamps.append(timestamp)
+            coin_ids.append(coin_id)
+
+    # analysis_id 조회와 Community_Analysis_Coins 삽입을 하나의 문장으로 처리 (배치당 1회 왕복)
+    cur.execute("""
+        INSERT INTO Community_Analysis_Coins (analysis_id, timestamp, coin_id)
+        SELECT a.analysis_id, a.timestamp, m.coin_id
+        FROM unnest(%s::uuid[], %s::timestamp[], %s::int[]) AS m(reaction_id, timestamp, coin_id)
+        JOIN Community_Analysis a
+            ON a.reaction_id = m.reaction_id AND a.timestamp = m.timestamp
+        ON CONFLICT DO NOTHING;
+    """, (reaction_ids, timestamps, coin_ids))
 
 # 분석 결과 저장
 def save_analysis_results(conn, analysis_results):
     with conn.cursor() as cur:
-        # INSERT를 위한 데이터 형식 준비
-        data_to_insert = []
-        for reaction_id, (timestamp, coin_ids) in analysis_results.items():
-            # 1. Community_Analysis 테이블에서 해당 reaction_id와 timestamp로 analysis_id 조회
-            cur.execute("""
-                SELECT analysis_id FROM Community_Analysis
-                WHERE reaction_id = %s AND timestamp = %s;
-            """, (reaction_id, timestamp))
-            
-            # 2. 해당 analysis_id를 가져옴
-            result = cur.fetchone()
-            if result:
-                analysis_id = result[0]
-                
-                # 3. Community_Analysis_Coins에 연결된 데이터 삽입
-                for coin_id in coin_ids:
-                    data_to_insert.append((analysis_id, timestamp, coin_id))
-        if data_to_insert:
-            execute_values(
-                cur,
-                """
-                INSERT INTO Community_Analysis_Coins (analysis_id, timestamp, coin_id)
-                VALUES %s
-                ON CONFLICT DO NOTHING;
-                """,
-                data_to_insert
-            )
+        insert_coin_links(cur, analysis_results)
     conn.commit()
 
+    timestamps = [timestamp for timestamp, _ in analysis_results.values()]
+    refresh_community_stats(conn, min(timestamps), max(timestamps))
+
+# 시간대별 커뮤니티 통계 갱신 (배치가 걸친 시간대만 다시 집계)
+def refresh_community_stats(conn, start_time, end_time):
+    time_range = {"start_time": start_time, "end_time": end_time}
+    with conn.cursor() as cur:
+        cur.execute("""
+            INSERT INTO public.Community_Stats_Hourly (bucket, reaction_count, positive_count, neutral_count, negative_count)
+            SELECT
+                date_trunc('hour', r.timestamp) AS bucket,
+                COUNT(*),
+                COUNT(*) FILTER (WHERE a.sentiment = 'positive'),
+                COUNT(*) FILTER (WHERE a.sentiment = 'neutral'),
+                COUNT(*) FILTER (WHERE a.sentiment = 'negative')
+            FROM public.Community_Reactions r
+            LEFT JOIN public.Community_Analysis a
+                ON a.reaction_id = r.reaction_id AND a.timestamp = r.timestamp
+            WHERE r.timestamp >= date_trunc('hour', %(start_time)s::timestamp)
+              AND r.timestamp < date_trunc('hour', %(end_time)s::timestamp) + INTERVAL '1 hour'
+            GROUP BY bucket
+            ON CONFLICT (bucket) DO UPDATE
+            SET
+                reaction_count = EXCLUDED.reaction_count,
+                positive_count = EXCLUDED.positive_count,
+                neutral_count = EXCLUDED.neutral_count,
+                negative_count = EXCLUDED.negative_count;
+        """, time_range)
+        cur.execute("""
+            INSERT INTO public.Community_Coin_Mentions_Hourly (bucket, coin_id, mention_count)
+            SELECT date_trunc('hour', timestamp) AS bucket, coin_id, COUNT(*)
+            FROM public.Community_Analysis_Coins
+            WHERE timestamp >= date_trunc('hour', %(start_time)s::timestamp)
+              AND timestamp < date_trunc('hour', %(end_time)s::timestamp) + INTERVAL '1 hour'
+            GROUP BY bucket, coin_id
+            ON CONFLICT (bucket, coin_id) DO UPDATE
+            SET mention_count = EXCLUDED.mention_count;
+        """, time_range)
+        # API 서버의 /moment 응답 캐시 무효화
+        cur.execute("SELECT pg_notify('community_stats_updated', '');")
+    conn.commit()
+
+# 반응 묶음이 걸친 시간대(가장 이른 시각부터 가장 늦은 시각까지)의 통계 갱신 (행의 두 번째 값이 timestamp)
+def refresh_reaction_stats(conn, reactions):
+    timestamps = [reaction[1] for reaction in reactions]
+    refresh_community_stats(conn, min(timestamps), max(timestamps))
+
+# 코인 매칭 진행 위치의 상한 (분석 행을 만드는 작업의 진행 위치 중 앞선 쪽)
+def coin_matching_limit(conn):
+    """
+    코인 매칭은 분석 행이 있는 반응만 읽으므로, 형태소 분석이 밀려 분석 행이 아직 없는 반응을 건너뛴 채 진행 위치가 앞서 나가면
+    나중에 분석 행이 생겨도 그 반응은 매칭되지 않습니다. 진행 위치는 형태소 분석과 파이프라인 중 앞선 쪽을 넘지 않게 합니다.
+
+    Returns:
+        tuple[datetime, str] | None: (last_timestamp, last_reaction_id), 두 작업 모두 진행 위치가 없으면 None
+    """
+    watermarks = [load_watermark(conn, job_name) for job_name in ("morphology", "pipeline")]
+    watermarks = [(timestamp, str(reaction_id)) for timestamp, reaction_id in filter(None, watermarks)]
+    return max(watermarks, default=None)
+
 # 배치 처리 메인 함수
 def process_reactions(batch_size=1000):
     try:
@@ -238,28 +409,29 @@ def process_reactions(batch_size=1000):
         # 1. 코인 이름과 별칭 가져오기
         coin_aliases = fetch_coin_aliases(conn)
         logging.info(f"Fetched {len(coin_aliases)} coin aliases.")
+        coin_matcher = get_coin_matcher(coin_aliases)  # 별칭이 바뀐 경우에만 다시 생성
         
-        # 2. 분석되지 않은 커뮤니티 반응 가져오기
-        reactions = fetch_unprocessed_reactions(conn)
-        logging.info(f"Fetched {len(reactions)} unprocessed reactions.")
-        
-        # 3. 매칭 로직 실행
-        analysis_results = {}
-        for reaction_id, timestamp, reaction_text in reactions:
-            matched_coins = match_coins_in_text(reaction_text, coin_aliases)
-            if matched_coins:
-                analysis_results[reaction_id] = (timestamp, matched_coins)
-            
-            # 일정량의 데이터를 처리할 때마다 중간 저장
-            if len(analysis_results) >= batch_size:
+        # 2. 분석되지 않은 커뮤니티 반응을 묶음 단위로 읽어 매칭
+        limit = coin_matching_limit(conn)
+        processed = 0
+        for reactions in stream_pending_reactions("coin_matching", batch_size):
+            analysis_results = {}
+            for reaction_id, timestamp, reaction_text in reactions:
+                matched_coins = match_coins_in_text(reaction_text, coin_matcher)
+                if matched_coins:
+                    analysis_results[reaction_id] = (timestamp, matched_coins)
+            processed += len(reactions)
+
+            # 3. 매칭 결과와 진행 위치 저장 (코인이 없는 반응도 다시 읽지 않도록 전진하되, 분석 행이 모두 만들어진 위치까지만)
+            position = (reactions[-1][1], str(reactions[-1][0]))
+            if limit is not None:
+                last_timestamp, last_reaction_id = min(position, limit)
+                save_watermark(conn, "coin_matching", last_timestamp, last_reaction_id)
+            if analysis_results:
                 save_analysis_results(conn, analysis_results)
-                logging.info(f"Processed {len(analysis_results)} reactions and saved results.")
-                analysis_results.clear()  # 저장 후 리스트 초기화
-        
-        # 남은 데이터 저장
-        if analysis_results:
-            save_analysis_results(conn, analysis_results)
-            logging.info(f"Processed remaining {len(analysis_results)} reactions and saved results.")
+            else:
+                conn.commit()
+            logging.info(f"Processed {processed} reactions, saved {len(analysis_results)} matches.")
         
     except Exception as e:
         logging.error(f"Error during processing: {e}")
@@ -268,12 +440,79 @@ def process_reactions(batch_size=1000):
             conn.close()
 
 
+# 파이프라인 단계별 워커 수
+PIPELINE_MORPHOLOGY_WORKERS = int(os.getenv("PIPELINE_MORPHOLOGY_WORKERS", 1))  # 형태소 분석 자체는 프로세스 풀에서 병렬 처리
+PIPELINE_SENTIMENT_WORKERS = int(os.getenv("PIPELINE_SENTIMENT_WORKERS", 1))
+PIPELINE_MATCHING_WORKERS = int(os.getenv("PIPELINE_MATCHING_WORKERS", 1))
+
+# 분석 행 전체(형태소 + 감정)와 코인 연결을 한 트랜잭션으로 기록
+def write_analysis_batch(conn, batch):
+    with analysis_writer(conn) as writer:
+        for (reaction_id, timestamp, _, _), (nouns, adjectives, verbs, interjections), sentiment in zip(
+            batch.reactions, batch.morphology, batch.sentiments
+        ):
+            writer.add((timestamp, reaction_id, nouns, adjectives, verbs, interjections, sentiment))
+
+    # 분석 행이 병합된 뒤에 analysis_id를 조인해 코인 연결 적재
+    with coin_link_writer(conn) as writer:
+        for reaction_id, (timestamp, matched_coins) in batch.coin_matches.items():
+            writer.add_many((reaction_id, timestamp, coin_id) for coin_id in matched_coins)
+
+    # 결과와 진행 위치를 같은 트랜잭션으로 커밋
+    last_reaction_id, last_timestamp = batch.reactions[-1][0], batch.reactions[-1][1]
+    save_watermark(conn, "pipeline", last_timestamp, last_reaction_id)
+    conn.commit()
+    refresh_reaction_stats(conn, batch.reactions)
+
+# 파이프라인 진행 위치 이후의 반응을 모두 분석하고 읽은 반응 수를 반환 (형태소 분석 풀은 호출한 쪽에서 관리)
+def analyze_pending_reactions(pool, coin_matcher, lookback_hours=ANALYZER_WATERMARK_LOOKBACK_HOURS):
+    def morphology_stage(conn, batch):
+        batch.morphology = analyze_with_cache(conn, morphology_cache, batch.texts(), lambda pending: analyze_texts_in_pool(pool, pending))
+
+    def sentiment_stage(conn, batch):
+        batch.sentiments = analyze_with_cache(conn, sentiment_cache, batch.texts(), analyze_sentiment)
+
+    def matching_stage(conn, batch):
+        batch.coin_matches = {}
+        for reaction_id, timestamp, reaction_text, _ in batch.reactions:
+            matched_coins = match_coins_in_text(reaction_text, coin_matcher)
+            if matched_coins:
+                batch.coin_matches[reaction_id] = (timestamp, matched_coins)
+
+    pipeline = ReactionPipeline([
+        PipelineStage("morphology", morphology_stage, PIPELINE_MORPHOLOGY_WORKERS),
+        PipelineStage("sentiment", sentiment_stage, PIPELINE_SENTIMENT_WORKERS),
+        PipelineStage("coin_matching", matching_stage, PIPELINE_MATCHING_WORKERS),
+    ], write_analysis_batch)
+    return pipeline.run(stream_pending_reactions("pipeline", lookback_hours=lookback_hours))
+
+# 새 반응을 한 번만 읽어 형태소 분석, 감정 분석, 코인 매칭을 동시에 진행하는 통합 분석 작업
+def run_analysis_pipeline():
+    logging.info("Starting analysis pipeline...")
+
+    conn = get_db_connection("data_scheduler")
+    coin_aliases = fetch_coin_aliases(conn)
+    conn.close()
+    coin_matcher = get_coin_matcher(coin_aliases)  # 별칭이 바뀐 경우에만 다시 생성
+
+    with Pool(MORPHOLOGY_WORKERS, initializer=init_morphology_worker) as pool:
+        try:
+            analyze_pending_reactions(pool, coin_matcher)
+        finally:
+            morphology_cache.log_stats("pipeline")
+            sentiment_cache.log_stats("pipeline")
+            morphology_cache.reset_stats()
+            sentiment_cache.reset_stats()
+
+    logging.info("Analysis pipeline complete.")
+
+
 #주기적으로 실행되는 스케줄러
 def start_scheduler():
     scheduler = BackgroundScheduler()
-    scheduler.add_job(analyze_and_store_morphological_data, 'interval', hours=1)  # 1시간마다 실행
-    scheduler.add_job(analyze_and_store_sentiments, 'interval', hours=12)  # 12시간마다 실행
-    scheduler.add_job(process_reactions, 'interval', hours=1)  # 1시간마다 실행
+    # 형태소 분석, 감정 분석, 코인 매칭을 하나의 파이프라인으로 1시간마다 실행
+    # (개별 작업 함수는 기존 데이터의 빈 항목을 채우는 수동 실행용으로 유지)
+    scheduler.add_job(run_analysis_pipeline, 'interval', hours=1)
     scheduler.start()
 
     # 계속 실행
@@ -284,8 +523,30 @@ def start_scheduler():
         scheduler.shutdown()
 
 
+# 실행할 작업 (--job)
+JOBS = {
+    "morphology": analyze_and_store_morphological_data,
+    "sentiment": analyze_and_store_sentiments,
+    "coin_matching": process_reactions,
+    "pipeline": run_analysis_pipeline,
+    "scheduler": start_scheduler,
+}
+
+
 if __name__ == '__main__':
-    #analyze_and_store_morphological_data()
-    #analyze_and_store_sentiments()
-    #process_reactions()
-    start_scheduler()
+    parser = argparse.ArgumentParser(description="Community reaction analyzer")
+    parser.add_argument("--job", choices=list(JOBS) + ["realtime"], default="scheduler",
+                        help="run a single stage once, the unified pipeline, the hourly scheduler or the realtime listener")
+    parser.add_argument("--warm-up", action="store_true",
+                        help="load the sentiment model before starting the job (morphology workers warm up on their own)")
+    args = parser.parse_args()
+
+    # 감정 분석 모델을 쓰는 작업만 미리 로드 (형태소 분석과 코인 매칭은 쓰지 않음)
+    if args.warm_up and args.job not in ("morphology", "coin_matching"):
+        warm_up()
+
+    if args.job == "realtime":
+        from realtime_analyzer import run_realtime_analyzer
+        run_realtime_analyzer()
+    else:
+        JOBS[args.job]()
@@ -0,0 +1,20 @@
+import os
+import json
+import glob
+
+
+# 텔레그램 내보내기(result.json)에서 텍스트 메시지만 추출
+def load_chat_messages(data_dir):
+    messages = []
+    for result_file_path in sorted(glob.glob(os.path.join(data_dir, "ChatExport_*", "result.json"))):
+        with open(result_file_path, "r", encoding="utf-8") as file:
+            json_data = json.load(file)
+
+        for message in json_data.get("messages", []):
+            text = message.get("text")
+            # 텍스트가 여러 조각으로 나뉘어 있는 경우 처리
+            if isinstance(text, list):
+                text = "".join(item["text"] if isinstance(item, dict) else item for item in text)
+            if isinstance(text, str) and text.strip():
+                messages.append(text.replace("\n", " "))
+    return messages
@@ -0,0 +1,170 @@
+import hashlib
+import logging
+from collections import deque
+
+# 코인별 별칭 목록: 심볼, 한글 이름(Coins), 영문 이름과 사용자 관리 은어(Coin_Aliases)
+COIN_ALIAS_QUERY = """
+    SELECT coin_id, symbol, 'symbol' FROM public.Coins
+    UNION
+    SELECT coin_id, coin_name, 'name' FROM public.Coins
+    UNION
+    SELECT coin_id, alias, alias_type FROM public.Coin_Aliases;
+"""
+
+# 심볼은 ONE, GAS, SUN, MED처럼 일반 단어와 겹치므로 대문자로 쓴 경우나 $를 붙인 경우($one)만 언급으로 봄
+# 이보다 짧은 심볼(OP, ID 등)은 대문자로 써도 흔하므로 $를 붙인 경우만 인정
+SYMBOL_MIN_LENGTH = 3
+SYMBOL_PREFIX = "$"
+
+
+def _case_rule(alias, alias_type):
+    """
+    별칭의 대소문자 규칙 (허용하는 원문 표기 집합, $ 접두사 허용 여부)을 반환합니다. 표기 집합이 None이면 대소문자를 구분하지 않습니다.
+
+    - 심볼: 대문자 표기(SYMBOL_MIN_LENGTH자 이상)나 $ 접두사만 인정
+    - 한 단어 영문 이름: Flow, Sand, Status, Core처럼 일반 단어와 겹치므로 저장된 표기 그대로나 대문자 표기만 인정
+    - 그 밖의 별칭(한글 이름, 여러 단어 영문 이름, 은어): 대소문자 구분 없음
+    """
+    if alias_type == "symbol":
+        return (frozenset([alias.upper()]) if len(alias) >= SYMBOL_MIN_LENGTH else frozenset()), True
+    if alias_type == "english" and alias.isascii() and not any(char.isspace() for char in alias):
+        return frozenset([alias, alias.upper()]), False
+    return None, False
+
+
+def _is_ascii_word_char(char):
+    return char.isascii() and char.isalnum()
+
+
+def _is_hangul(char):
+    # 한글 음절 및 자모
+    return "가" <= char <= "힣" or "ㄱ" <= char <= "ㆎ"
+
+
+def _is_boundary(text, start, end, alias):
+    """
+    별칭 앞뒤 문자로 단어 경계를 판단합니다.
+
+    - 영문/숫자 별칭(BTC, eth, bitcoin): 앞뒤가 영문/숫자가 아니어야 함 (method 안의 eth 제외).
+      뒤에 한글 조사가 붙는 것은 허용 (btc가, eth는).
+    - 한글 별칭(비트코인, 리플): 앞이 한글이 아니어야 함 (트리플 안의 리플 제외).
+      뒤에는 조사가 붙으므로 제한하지 않음 (비트코인이, 리플을).
+    """
+    before = text[start - 1] if start > 0 else ""
+    after = text[end] if end < len(text) else ""
+    if _is_ascii_word_char(alias[0]) and before and _is_ascii_word_char(before):
+        return False
+    if _is_ascii_word_char(alias[-1]) and after and _is_ascii_word_char(after):
+        return False
+    if _is_hangul(alias[0]) and before and _is_hangul(before):
+        return False
+    return True
+
+
+def _is_cased_mention(text, original, start, end, spellings, allow_prefix):
+    """별칭이 $를 붙였거나 원문(original)에서 허용된 표기로 쓰였는지 확인합니다."""
+    if allow_prefix and start > 0 and text[start - 1] == SYMBOL_PREFIX:
+        return True
+    return original is not None and original[start:end] in spellings
+
+
+def alias_set_hash(aliases):
+    """별칭 집합이 바뀌었는지 비교하기 위한 해시"""
+    normalized = sorted({
+        (coin_id, alias.strip(), alias_type) for coin_id, alias, alias_type in aliases if alias and alias.strip()
+    })
+    return hashlib.sha1(repr(normalized).encode("utf-8")).hexdigest()
+
+
+class CoinMatcher:
+    """
+    코인 별칭 전체로 만든 Aho-Corasick 오토마톤.
+    메시지를 한 번만 훑으면서 모든 별칭의 등장 위치를 찾으므로 비용이 코인 수와 무관합니다.
+    """
+
+    def __init__(self, aliases):
+        """
+        Args:
+            aliases (list[tuple[int, str, str]]): (coin_id, 별칭, 별칭 종류) 목록.
+                대소문자는 구분하지 않되, 심볼과 한 단어 영문 이름은 _case_rule의 표기만 인정
+        """
+        self.alias_hash = alias_set_hash(aliases)
+        self._goto = [{}]  # 상태별 다음 문자 -> 상태
+        self._fail = [0]
+        self._outputs = [[]]  # 상태별로 끝나는 (coin_id, 별칭, 허용 표기, $ 접두사 허용) 목록
+
+        count = 0
+        for coin_id, alias, alias_type in aliases:
+            if not alias or not alias.strip():
+                continue
+            alias = alias.strip()
+            self._add(alias.lower(), coin_id, *_case_rule(alias, alias_type))
+            count += 1
+        self._build_failure_links()
+        logging.info(f"Built coin matcher with {count} aliases ({len(self._goto)} states).")
+
+    def _add(self, alias, coin_id, spellings, allow_prefix):
+        state = 0
+        for char in alias:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._outputs.append([])
+            state = next_state
+        output = (coin_id, alias, spellings, allow_prefix)
+        if output not in self._outputs[state]:
+            self._outputs[state].append(output)
+
+    def _build_failure_links(self):
+        # 너비 우선으로 실패 링크를 만들고, 접미사 상태의 출력을 합쳐 둠
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._outputs[next_state] = self._outputs[next_state] + self._outputs[self._fail[next_state]]
+
+    def find(self, text):
+        """메시지에 언급된 coin_id 목록을 반환합니다 (중복 제거)."""
+        # 심볼과 영문 이름의 표기는 원문에서 확인 (소문자화로 길이가 바뀌는 드문 문자가 있으면 $를 붙인 심볼만 인정)
+        lowered = text.lower()
+        original = text if len(lowered) == len(text) else None
+        text = lowered
+        goto = self._goto
+        fail = self._fail
+        outputs = self._outputs
+
+        detected_coins = set()
+        state = 0
+        for end, char in enumerate(text, start=1):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for coin_id, alias, spellings, allow_prefix in outputs[state]:
+                if coin_id in detected_coins:
+                    continue
+                start = end - len(alias)
+                if not _is_boundary(text, start, end, alias):
+                    continue
+                if spellings is not None and not _is_cased_mention(text, original, start, end, spellings, allow_prefix):
+                    continue
+                detected_coins.add(coin_id)
+        return list(detected_coins)
+
+
+# 마지막으로 만든 오토마톤 (별칭 집합이 바뀔 때만 다시 생성)
+_matcher = None
+
+
+def get_coin_matcher(aliases):
+    global _matcher
+    if _matcher is None or _matcher.alias_hash != alias_set_hash(aliases):
+        _matcher = CoinMatcher(aliases)
+    return _matcher
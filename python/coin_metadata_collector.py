@@ -4,6 +4,7 @@ import time
 import os
 from dotenv import load_dotenv
 from db_connector import get_db_connection
+from coin_registry import coin_registry
 from util import translate_text
 import logging
 from logging.handlers import RotatingFileHandler
@@ -41,11 +42,10 @@ def get_all_coins_from_paprika():
     data = response.json()
     return data
 
-# PostgreSQL에서 코인 정보 확인 (이미 DB에 존재하는지 확인)
+# 코인 레지스트리에서 코인 정보 확인 (이미 DB에 존재하는지 확인)
 def check_coin_in_db(cursor, coin_symbol):
-    query = "SELECT 1 FROM Coins WHERE symbol = %s LIMIT 1;"
-    cursor.execute(query, (coin_symbol,))
-    return cursor.fetchone() is not None
+    coin_registry.refresh(cursor.connection)
+    return coin_symbol in coin_registry
 
 # CoinMarketCap API에서 코인 정보 조회
 def get_coin_info(coin_symbol, api_key):
@@ -88,6 +88,13 @@ def insert_or_update_coin_info(cursor, coin_info, korean_name):
             korean_name, coin_info['symbol'], coin_info['market_cap'],
             coin_info['launch_date'], translate_text(coin_info['description'])
         ))
+        # 커뮤니티 반응의 코인 매칭에 쓰이도록 영문 이름을 별칭으로 등록
+        if coin_info['name']:
+            cursor.execute("""
+            INSERT INTO Coin_Aliases (coin_id, alias, alias_type)
+            SELECT coin_id, %s, 'english' FROM Coins WHERE symbol = %s
+            ON CONFLICT DO NOTHING;
+            """, (coin_info['name'], coin_info['symbol']))
         logging.info(f"Inserted or updated {coin_info['name']} ({coin_info['symbol']})")
     except Exception as e:
         logging.error(f"Error inserting/updating coin: {e}")
@@ -173,6 +180,7 @@ def init_coin():
                 insert_or_update_coin_info(cursor, coin_info, pair[1])
         time.sleep(2)  # 딜레이 추가
     conn.commit()
+    coin_registry.invalidate()  # 새로 추가된 코인을 다음 조회 때 반영
     cursor.close()
     conn.close()
 
@@ -1,10 +1,12 @@
-import requests
 import asyncio
-import aiohttp
-from db_connector import asycn_get_db_connection
-from psycopg2.extras import execute_batch
+import argparse
+import json
+from db_connector import close_db_pools, get_db_pool
+from coin_registry import coin_registry
+from upbit_client import UPBIT_CONCURRENCY, UPBIT_RATE_LIMIT, UpbitClient, gather_bounded
+from ohlcv_gap_planner import HOUR, clear_open_bars, find_gaps, last_completed_hour, plan_requests, record_empty_hours
+from candle_decoder import decode_candles
 import time
-from datetime import datetime
 
 import logging
 from logging.handlers import RotatingFileHandler
@@ -30,137 +32,226 @@ logging.basicConfig(
 scheduler = AsyncIOScheduler()
 
 
-# Upbit API에서 KRW 마켓만 필터링
-def get_krw_pairs():
-    url = "https://api.upbit.com/v1/market/all"
-    response = requests.get(url)
-    data = response.json()
-
-    krw_pairs = [(coin['market'], coin['korean_name']) for coin in data if coin['market'].startswith('KRW-')]
-    return krw_pairs
-
-async def get_candles(market, count=200, to=None):
-    url = "https://api.upbit.com/v1/candles/minutes/60"
-    params = {
-        'market': market,
-        'count': count
-    }
-    if to:
-        params['to'] = to
-    headers = {"accept": "application/json"}
-
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url, params=params, headers=headers) as response:
-            return await response.json()
-
-async def get_data_from_range(market, start_date, end_date):
-    all_data = []
-    current_to = start_date
-    while True:
-        # 200개의 캔들을 가져옴
-        candles = await get_candles(market, count=200, to=current_to)
-        
-        if not candles:
-            break  # 더 이상 데이터가 없으면 종료
-
-        # 최신 데이터의 timestamp (다음 요청에 사용될 'to')
-        current_to = candles[-1]['candle_date_time_kst']
-        all_data.extend(candles)
-
-        start_date = candles[0]['candle_date_time_kst']
-        logging.info(f"Fetching data from {current_to} to {start_date}")
-                
-        if current_to <= end_date or len(candles) < 200:
-            logging.info("Reached the end of available data or end date.")
-            break
-
-        await asyncio.sleep(0.5)
-    return all_data
+async def get_candles(client, market, count=200, to=None):
+    return await client.get_candles(market, count=count, to=to)
+
+# 캔들은 임시 스테이징 테이블에 COPY로 적재한 뒤 한 문장으로 병합
+# 임시 테이블은 풀이 연결을 만들 때 한 번만 만들고(init_ohlcv_connection), 행은 커밋할 때 비워짐
+OHLCV_STAGING_TABLE_SQL = """
+    CREATE TEMP TABLE staging_coin_ohlcv (
+        coin_id INT,
+        timestamp TIMESTAMP,
+        open NUMERIC(20, 8),
+        high NUMERIC(20, 8),
+        low NUMERIC(20, 8),
+        close NUMERIC(20, 8),
+        volume NUMERIC(20, 8)
+    ) ON COMMIT DELETE ROWS;
+"""
+
+OHLCV_COLUMNS = ["coin_id", "timestamp", "open", "high", "low", "close", "volume"]
+
+OHLCV_INSERT_QUERY = """
+    INSERT INTO public.Coin_OHLCV (coin_id, timestamp, open, high, low, close, volume)
+    SELECT coin_id, timestamp, open, high, low, close, volume
+    FROM staging_coin_ohlcv
+    ON CONFLICT (coin_id, timestamp) DO NOTHING;
+"""
+
+# 스트리밍 수집기의 진행 중인 시간봉 스냅샷과, 그 스냅샷을 REST 캔들로 바로잡을 때 사용
+# (data_collector의 Coin_OHLCV UPDATE 권한은 sql/14-ohlcv_stream.sql에서 부여)
+OHLCV_UPSERT_QUERY = """
+    INSERT INTO public.Coin_OHLCV (coin_id, timestamp, open, high, low, close, volume)
+    SELECT coin_id, timestamp, open, high, low, close, volume
+    FROM staging_coin_ohlcv
+    ON CONFLICT (coin_id, timestamp) DO UPDATE
+    SET
+        open = EXCLUDED.open,
+        high = EXCLUDED.high,
+        low = EXCLUDED.low,
+        close = EXCLUDED.close,
+        volume = EXCLUDED.volume;
+"""
+
+def ohlcv_row(coin_id, timestamp, open_price, high, low, close, volume):
+    volume = round(volume, 8)
+
+    # 크기 조정 (필요 시)
+    if volume > 1e12:  # 10^12 이상인 경우
+        volume /= 1_000_000
+
+    return (
+        coin_id,
+        timestamp,
+        round(open_price, 8),
+        round(high, 8),
+        round(low, 8),
+        round(close, 8),
+        volume
+    )
+
+# 수집기 연결 풀의 연결 초기화 (get_db_pool의 init으로 전달)
+async def init_ohlcv_connection(conn):
+    await conn.execute(OHLCV_STAGING_TABLE_SQL)
 
 # Asynchronous Database Insert Function (with asyncpg)
-async def insert_ohlcv_data(conn, coin_id, candles):
-    query = """
-        INSERT INTO public.Coin_OHLCV (coin_id, timestamp, open, high, low, close, volume)
-        VALUES ($1, $2, $3, $4, $5, $6, $7)
-        ON CONFLICT (coin_id, timestamp) DO NOTHING;
-    """
-    ohlcv_data = []
-    for candle in candles:
-        try:
-            volume = round(candle['candle_acc_trade_volume'], 8)
-            
-            # 크기 조정 (필요 시)
-            if volume > 1e12:  # 10^12 이상인 경우
-                volume /= 1_000_000
-            
-            rounded_data = (
-                coin_id,
-                datetime.strptime(candle['candle_date_time_kst'].replace("T", " "), "%Y-%m-%d %H:%M:%S"),
-                round(candle['opening_price'], 8),
-                round(candle['high_price'], 8),
-                round(candle['low_price'], 8),
-                round(candle['trade_price'], 8),
-                volume
+# 저장한 캔들의 컬럼을 반환하여 호출한 쪽이 응답을 다시 파싱하지 않게 함
+async def insert_ohlcv_data(conn, coin_id, candles, query=OHLCV_INSERT_QUERY):
+    columns = decode_candles(candles)
+    await store_ohlcv_rows(conn, columns.records(coin_id), query)
+    return columns
+
+# Bulk load in asyncpg: COPY 후 병합 (롤업 갱신과 같은 트랜잭션으로 처리)
+# ohlcv_data에는 여러 코인의 행이 섞여 있어도 되며, 롤업과 알림은 코인별로 처리
+# 스테이징 행은 가장 바깥 트랜잭션이 커밋될 때 비워지므로 한 트랜잭션에서 한 번만 호출
+async def store_ohlcv_rows(conn, ohlcv_data, query=OHLCV_INSERT_QUERY):
+    if not ohlcv_data:
+        return
+    ranges = {}
+    for row in ohlcv_data:
+        coin_id, timestamp = row[0], row[1]
+        start_time, end_time = ranges.get(coin_id, (timestamp, timestamp))
+        ranges[coin_id] = (min(start_time, timestamp), max(end_time, timestamp))
+
+    async with conn.transaction():
+        await conn.copy_records_to_table("staging_coin_ohlcv", records=ohlcv_data, columns=OHLCV_COLUMNS)
+        await conn.execute(query)
+        for coin_id, (start_time, end_time) in ranges.items():
+            await refresh_ohlcv_rollups(conn, coin_id, start_time, end_time)
+            # 커밋 시점에 API 서버의 핫 캐시로 갱신 구간 전달
+            await conn.execute(
+                "SELECT pg_notify($1, $2);",
+                OHLCV_NOTIFY_CHANNEL,
+                json.dumps({"coin_id": coin_id, "from": start_time.isoformat()})
             )
-            ohlcv_data.append(rounded_data)
-        except Exception as e:
-            logging.error(f"Error processing candle: {candle}, Error: {e}")
-    # Batch insert in asyncpg
-    await conn.executemany(query, ohlcv_data)
+
+# API 서버의 OHLCV 핫 캐시가 LISTEN하는 채널
+OHLCV_NOTIFY_CHANNEL = "coin_ohlcv_updated"
+
+# 롤업 테이블과 버킷 크기
+ROLLUP_TABLES = {
+    "Coin_OHLCV_4h": "4 hours",
+    "Coin_OHLCV_1d": "1 day",
+}
+
+# 새 캔들이 속한 버킷만 1시간봉에서 다시 집계하여 롤업 테이블에 upsert
+async def refresh_ohlcv_rollups(conn, coin_id, start_time, end_time):
+    for table, bucket in ROLLUP_TABLES.items():
+        await conn.execute(f"""
+            INSERT INTO public.{table} (coin_id, timestamp, open, high, low, close, volume)
+            SELECT
+                coin_id,
+                date_bin('{bucket}', timestamp, TIMESTAMP '1970-01-01') AS bucket,
+                (array_agg(open ORDER BY timestamp))[1],
+                MAX(high),
+                MIN(low),
+                (array_agg(close ORDER BY timestamp DESC))[1],
+                SUM(volume)
+            FROM public.Coin_OHLCV
+            WHERE coin_id = $1
+              AND timestamp >= date_bin('{bucket}', $2::timestamp, TIMESTAMP '1970-01-01')
+              AND timestamp < date_bin('{bucket}', $3::timestamp, TIMESTAMP '1970-01-01') + INTERVAL '{bucket}'
+            GROUP BY coin_id, bucket
+            ON CONFLICT (coin_id, timestamp) DO UPDATE
+            SET
+                open = EXCLUDED.open,
+                high = EXCLUDED.high,
+                low = EXCLUDED.low,
+                close = EXCLUDED.close,
+                volume = EXCLUDED.volume;
+        """, coin_id, start_time, end_time)
+
+# 빈 구간만 계획하여 채우기 (정기 갱신과 초기 적재 공통)
+async def fill_ohlcv_gaps(full=False):
+    pool = await get_db_pool("data_collector", init=init_ohlcv_connection)
+    start_time = time.perf_counter()
+
+    async with UpbitClient() as client:
+        krw_pairs = await client.get_krw_pairs()
+        await coin_registry.refresh_async(pool)
+
+        # 코인 레지스트리에서 coin_id 조회 (마켓별 DB 조회 없음)
+        markets = {}
+        for market, coin_name in krw_pairs:
+            coin_id = coin_registry.get(market.split('-')[1])
+            if coin_id:
+                markets[coin_id] = market
+            else:
+                logging.info(f"Skipping {coin_name} ({market})")
+
+        end = last_completed_hour()
+        gaps = await find_gaps(pool, list(markets), end, full=full)
+        plans = {coin_id: plan_requests(coin_gaps) for coin_id, coin_gaps in gaps.items()}
+        missing = sum((gap_end - gap_start) // HOUR + 1 for coin_gaps in gaps.values() for gap_start, gap_end in coin_gaps)
+        logging.info(
+            f"Planned {sum(len(requests) for requests in plans.values())} requests for {missing} missing hours "
+            f"across {len(plans)} of {len(markets)} markets (up to {end.isoformat()})"
+        )
+
+        async def fill_market(coin_id, requests):
+            market = markets[coin_id]
+            for request in requests:
+                candles = await get_candles(client, market, count=request.count, to=request.to_param())
+                # 마켓마다 풀에서 연결을 받아 여러 마켓을 동시에 기록
+                async with pool.acquire() as conn:
+                    # 마감된 시간의 REST 캔들이 기준이므로, 스트리밍 수집기가 남긴 진행 중 스냅샷은 덮어쓰고 표시를 지움
+                    columns = await insert_ohlcv_data(conn, coin_id, candles, OHLCV_UPSERT_QUERY)
+                    await clear_open_bars(conn, [(coin_id, timestamp) for timestamp in columns.timestamp])
+                    # 체결이 없었거나 상장 전이라 캔들이 없는 시간
+                    await record_empty_hours(conn, coin_id, request.missing_hours() - set(columns.timestamp))
+
+        # 마켓별 요청을 동시에 진행 (속도는 토큰 버킷, 동시성은 세마포어로 제한)
+        # 한 마켓의 요청은 오래된 순서로 차례대로 처리하여 중간에 멈춰도 남은 구간만 다시 계획되게 함
+        results = await gather_bounded(
+            (fill_market(coin_id, requests) for coin_id, requests in plans.items()), UPBIT_CONCURRENCY
+        )
+        for coin_id, result in zip(plans, results):
+            if isinstance(result, Exception):
+                logging.error(f"Error filling {markets[coin_id]}: {result}")
+
+        elapsed = time.perf_counter() - start_time
+        logging.info(
+            f"Filled {len(plans)} markets in {elapsed:.1f}s "
+            f"({client.requests} requests, {client.retries} retries, rate limit {UPBIT_RATE_LIMIT:g}/s)"
+        )
 
 # Asynchronous Function to Update Latest Data
+# 최근 구간(장애가 길었다면 마지막 캔들 이후)의 빈 시간만 요청
 async def update_latest_data():
-    conn = await asycn_get_db_connection("data_collector")
-    
-    krw_pairs = get_krw_pairs()
-
-    for market, coin_name in krw_pairs:
-        symbol = market.split('-')[1]
-        logging.info(f"Updating data for {coin_name} ({market})")
-        candles = await get_candles(market, count=10)
-    
-        # Get coin_id (adjust accordingly for asyncpg or other async query method)
-        coin_id = await conn.fetchval("SELECT coin_id FROM public.Coins WHERE symbol = $1", symbol)
-
-        if coin_id:
-            await insert_ohlcv_data(conn, coin_id, candles)
-        await asyncio.sleep(0.5)
-    await conn.close()
+    await fill_ohlcv_gaps(full=False)
 
+# OHLCV_BACKFILL_START 이후 전체에서 빈 시간만 요청 (이미 저장된 구간은 다시 받지 않음)
 async def init_ohlcv():
-    conn = await asycn_get_db_connection("data_collector")
-
-    krw_pairs = get_krw_pairs()
-
-    for market, coin_name in krw_pairs:
-        symbol = market.split('-')[1]
-        coin_id = await conn.fetchval("SELECT coin_id FROM public.Coins WHERE symbol = $1", symbol)
-        
-        if not coin_id:
-            logging.info(f"Skipping {coin_name} ({market})")
-            continue
-        
-        logging.info(f"Inserting data for {coin_name} ({market})")
-        
-        end_date = "2024-10-01T00:00:00"
-        start_date = "2024-12-08T00:00:00"
-        
-        candles = await get_data_from_range(market, start_date, end_date)
-        logging.info(len(candles))
-        await insert_ohlcv_data(conn, coin_id, candles)
-
-        # Optional sleep if necessary, but it's better to use a small delay for rate-limiting.
-        await asyncio.sleep(0.5)
-
-    await conn.close()
-    
+    await fill_ohlcv_gaps(full=True)
+
+# 한 번 실행하는 작업은 끝난 뒤 연결 풀을 닫음 (스케줄러에서는 실행 간에 풀을 재사용)
+async def run_once(job):
+    try:
+        await job()
+    finally:
+        await close_db_pools()
+
+def run_scheduler():
+    scheduler.add_job(update_latest_data, 'cron', minute='1')
+    scheduler.start()
+    try:
+        asyncio.get_event_loop().run_forever()
+    except (KeyboardInterrupt, SystemExit):
+        logging.info("Shutting down scheduler.")
+        scheduler.shutdown()
+
 if __name__ == "__main__":
-    #asyncio.run(init_ohlcv())
-    asyncio.run(update_latest_data())
-    # scheduler.add_job(update_latest_data, 'cron', minute='1')
-    # scheduler.start()
-    # try:
-    #     asyncio.get_event_loop().run_forever()
-    # except (KeyboardInterrupt, SystemExit):
-    #     logging.info("Shutting down scheduler.")
-    #     scheduler.shutdown()
+    parser = argparse.ArgumentParser(description="Upbit OHLCV collector")
+    parser.add_argument("--job", choices=["update", "init", "scheduler", "stream"], default="update",
+                        help="fill recent gaps once, backfill the full history, poll hourly, or stream live trades")
+    args = parser.parse_args()
+
+    if args.job == "update":
+        asyncio.run(run_once(update_latest_data))
+    elif args.job == "init":
+        asyncio.run(run_once(init_ohlcv))
+    elif args.job == "scheduler":
+        run_scheduler()
+    else:
+        from ohlcv_stream import run_ohlcv_stream
+        asyncio.run(run_once(run_ohlcv_stream))
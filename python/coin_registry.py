@@ -0,0 +1,57 @@
+import os
+import time
+import logging
+
+COIN_REGISTRY_TTL = int(os.getenv("COIN_REGISTRY_TTL", 3600))  # 다시 읽기 전까지 보관 시간(초)
+
+COIN_REGISTRY_QUERY = "SELECT coin_id, symbol, coin_name FROM public.Coins;"
+
+
+# Coins 테이블을 한 번 읽어 symbol -> coin_id 조회를 메모리에서 처리하는 레지스트리
+class CoinRegistry:
+    def __init__(self, ttl=COIN_REGISTRY_TTL):
+        self.ttl = ttl
+        self._coin_ids = {}  # symbol -> coin_id
+        self._names = {}  # coin_id -> coin_name
+        self._loaded_at = None
+
+    def is_stale(self):
+        return self._loaded_at is None or time.monotonic() - self._loaded_at > self.ttl
+
+    def load(self, rows):
+        # rows: [(coin_id, symbol, coin_name), ...]
+        self._coin_ids = {symbol: coin_id for coin_id, symbol, _ in rows}
+        self._names = {coin_id: coin_name for coin_id, _, coin_name in rows}
+        self._loaded_at = time.monotonic()
+        logging.info(f"Loaded {len(self._coin_ids)} coins into registry.")
+
+    # psycopg2 연결에서 갱신 (오래된 경우에만)
+    def refresh(self, conn, force=False):
+        if not (force or self.is_stale()):
+            return
+        with conn.cursor() as cur:
+            cur.execute(COIN_REGISTRY_QUERY)
+            self.load(cur.fetchall())
+
+    # asyncpg 연결에서 갱신 (오래된 경우에만)
+    async def refresh_async(self, conn, force=False):
+        if not (force or self.is_stale()):
+            return
+        rows = await conn.fetch(COIN_REGISTRY_QUERY)
+        self.load([tuple(row) for row in rows])
+
+    def invalidate(self):
+        self._loaded_at = None
+
+    def get(self, symbol):
+        return self._coin_ids.get(symbol.upper())
+
+    def __contains__(self, symbol):
+        return symbol.upper() in self._coin_ids
+
+    # 코인 이름 목록 [(coin_id, coin_name), ...]
+    def names(self):
+        return list(self._names.items())
+
+
+coin_registry = CoinRegistry()
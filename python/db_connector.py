@@ -65,4 +65,42 @@ async def asycn_get_db_connection(role):
             password=DB_PASSWORD_SCHEDULER
         )
     else:
-        raise ValueError("Invalid role specified")
\ No newline at end of file
+        raise ValueError("Invalid role specified")
+
+# 비동기 연결 풀 설정
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", 2))
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", 10))  # 수집기의 동시 마켓 수(UPBIT_CONCURRENCY)와 맞춤
+
+# 역할별로 하나씩 공유하는 연결 풀
+_db_pools = {}
+
+# 비동기 연결 풀 (역할별로 한 번만 생성하여 재사용)
+# init은 풀이 새 연결을 만들 때마다 한 번 실행됨 (풀을 처음 만드는 호출의 init만 적용)
+async def get_db_pool(role, init=None):
+    if role in _db_pools:
+        return _db_pools[role]
+
+    if role == "data_collector":
+        user, password = DB_USER_COLLECTOR, DB_PASSWORD_COLLECTOR
+    elif role == "data_scheduler":
+        user, password = DB_USER_SCHEDULER, DB_PASSWORD_SCHEDULER
+    else:
+        raise ValueError("Invalid role specified")
+
+    _db_pools[role] = await asyncpg.create_pool(
+        host=DB_HOST,
+        port=DB_PORT,
+        database=DB_NAME,
+        user=user,
+        password=password,
+        min_size=DB_POOL_MIN_SIZE,
+        max_size=DB_POOL_MAX_SIZE,
+        init=init
+    )
+    return _db_pools[role]
+
+# 모든 연결 풀 종료 (이벤트 루프를 닫기 전에 호출)
+async def close_db_pools():
+    for pool in _db_pools.values():
+        await pool.close()
+    _db_pools.clear()
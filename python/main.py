@@ -1,11 +1,43 @@
 from fastapi import FastAPI
 from cors import app
-from src.router import coin, coin_ohlcv, community
+from src.router import coin, coin_ohlcv, community, moment, metrics
+from src.middleware.metrics import MetricsMiddleware, instrument_engine
+from src.database.connection import engine
+from src.database.listener import register_handler, start_listener, stop_listener
+from src.service.ohlcv_cache import ohlcv_cache, OHLCV_NOTIFY_CHANNEL
+from src.service.coin_registry import coin_registry, COINS_NOTIFY_CHANNEL
+from src.router.coin_ohlcv import invalidate_ohlcv_responses
+from src.router.coin import invalidate_coin_responses
+from src.router.moment import invalidate_moment_responses, COMMUNITY_STATS_NOTIFY_CHANNEL
 import uvicorn
 
 app.include_router(coin.router)
 app.include_router(coin_ohlcv.router)
 app.include_router(community.router)
+app.include_router(moment.router)
+app.include_router(metrics.router)
+
+# 요청별 지연 시간, SQL 실행 수, 응답 크기 계측 (/metrics)
+instrument_engine(engine)
+app.add_middleware(MetricsMiddleware)
+
+# 수집기의 NOTIFY로 OHLCV 핫 캐시 갱신
+register_handler(OHLCV_NOTIFY_CHANNEL, ohlcv_cache.handle_notification)
+register_handler(OHLCV_NOTIFY_CHANNEL, invalidate_ohlcv_responses)
+# Coins 테이블 변경 시 코인 레지스트리와 캐시된 응답 갱신
+register_handler(COINS_NOTIFY_CHANNEL, coin_registry.invalidate)
+register_handler(COINS_NOTIFY_CHANNEL, invalidate_coin_responses)
+# 분석기의 시간대별 통계 갱신 시 /moment 응답 무효화
+register_handler(COMMUNITY_STATS_NOTIFY_CHANNEL, invalidate_moment_responses)
+
+@app.on_event("startup")
+async def start_notification_listener():
+    start_listener()
+
+@app.on_event("shutdown")
+async def stop_notification_listener():
+    await stop_listener()
+
 # print(coin.get_all_coins())
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=5455)
@@ -0,0 +1,117 @@
+import time
+import random
+import asyncio
+import argparse
+from datetime import datetime, timedelta, timezone
+
+from aiohttp import web
+
+# 수집기 검증용 로컬 Upbit 시세 API 목 서버
+# UPBIT_API_URL=http://127.0.0.1:8765 로 수집기를 이 서버에 연결할 수 있습니다.
+
+KST_FORMAT = "%Y-%m-%dT%H:%M:%S"
+KST = timezone(timedelta(hours=9))
+
+
+class MockUpbit:
+    """
+    /v1/market/all, /v1/candles/minutes/{unit}을 흉내 내며, 1초 구간마다 rate_limit개를 넘는 요청에 429를 반환합니다.
+    """
+
+    def __init__(self, markets=150, rate_limit=10, latency_ms=30, history_days=70):
+        self.markets = [(f"KRW-C{i:03d}", f"코인{i:03d}") for i in range(markets)]
+        self.rate_limit = rate_limit
+        self.latency = latency_ms / 1000
+        self.now = datetime.now(KST).replace(minute=0, second=0, microsecond=0, tzinfo=None)  # 캔들 시각은 KST
+        self.history_start = self.now - timedelta(days=history_days)
+        self.window = None  # 현재 1초 구간
+        self.window_count = 0
+        self.requests = 0
+        self.rejected = 0
+
+    def _take_quota(self):
+        # Upbit처럼 초 단위 구간별로 요청 수를 셈
+        window = int(time.monotonic())
+        if window != self.window:
+            self.window = window
+            self.window_count = 0
+        self.window_count += 1
+        return self.rate_limit - self.window_count
+
+    async def _respond(self, body):
+        self.requests += 1
+        remaining = self._take_quota()
+        await asyncio.sleep(self.latency)
+        headers = {"Remaining-Req": f"group=candles; min=600; sec={max(remaining, 0)}"}
+        if remaining < 0:
+            self.rejected += 1
+            return web.json_response(
+                {"error": {"name": "too_many_requests", "message": "Too many API requests."}}, status=429, headers=headers
+            )
+        return web.json_response(body, headers=headers)
+
+    async def market_all(self, request):
+        return await self._respond([
+            {"market": market, "korean_name": korean_name, "english_name": market.split("-")[1]}
+            for market, korean_name in self.markets
+        ])
+
+    async def candles(self, request):
+        unit = int(request.match_info["unit"])
+        market = request.query["market"]
+        count = min(int(request.query.get("count", 1)), 200)
+        to = request.query.get("to")
+        end = datetime.strptime(to[:19], KST_FORMAT) if to else self.now + timedelta(minutes=unit)
+
+        # to 이전의 캔들을 최신순으로 반환
+        candles = []
+        timestamp = end - timedelta(minutes=unit)
+        rng = random.Random(hash((market, timestamp)))
+        while len(candles) < count and timestamp >= self.history_start:
+            price = 1000 + rng.random() * 100
+            candles.append({
+                "market": market,
+                "candle_date_time_utc": (timestamp - timedelta(hours=9)).strftime(KST_FORMAT),
+                "candle_date_time_kst": timestamp.strftime(KST_FORMAT),
+                "opening_price": price,
+                "high_price": price * 1.01,
+                "low_price": price * 0.99,
+                "trade_price": price * (1 + (rng.random() - 0.5) / 50),
+                "timestamp": int(timestamp.timestamp() * 1000),
+                "candle_acc_trade_price": price * 1000,
+                "candle_acc_trade_volume": rng.random() * 1000,
+                "unit": unit,
+            })
+            timestamp -= timedelta(minutes=unit)
+        return await self._respond(candles)
+
+    async def stats(self, request):
+        return web.json_response({"requests": self.requests, "rejected": self.rejected})
+
+    def create_app(self):
+        app = web.Application()
+        app.router.add_get("/v1/market/all", self.market_all)
+        app.router.add_get("/v1/candles/minutes/{unit}", self.candles)
+        app.router.add_get("/stats", self.stats)
+        return app
+
+
+async def start_mock_server(mock, host="127.0.0.1", port=0):
+    """목 서버를 현재 이벤트 루프에서 띄우고 (runner, base_url)을 반환합니다."""
+    runner = web.AppRunner(mock.create_app())
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    bound_port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://{host}:{bound_port}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local mock of the Upbit quotation API")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--markets", type=int, default=150)
+    parser.add_argument("--rate-limit", type=int, default=10)
+    parser.add_argument("--latency-ms", type=int, default=30)
+    args = parser.parse_args()
+
+    web.run_app(MockUpbit(args.markets, args.rate_limit, args.latency_ms).create_app(), host="127.0.0.1", port=args.port)
@@ -0,0 +1,243 @@
+import json
+import time
+import uuid
+import random
+import asyncio
+import bisect
+import argparse
+from datetime import datetime, timedelta
+
+import aiohttp
+from aiohttp import web
+
+# 스트리밍 수집기 검증용 로컬 Upbit 체결 WebSocket 목 서버
+# 기록해 둔 체결(JSON Lines)이나 합성 체결을 재생하며, 재생한 체결로 집계한 1시간봉 REST API도 함께 제공합니다.
+# UPBIT_WEBSOCKET_URL=ws://127.0.0.1:8766/websocket/v1 UPBIT_API_URL=http://127.0.0.1:8766 로 수집기를 연결할 수 있습니다.
+
+HOUR_MS = 3_600_000
+KST_FORMAT = "%Y-%m-%dT%H:%M:%S"
+
+
+def generate_ticks(markets=5, minutes=120, trades_per_second=5, start_ms=None, seed=0):
+    """마켓별로 무작위 보행하는 합성 체결 목록 (Upbit trade 메시지 형식)"""
+    rng = random.Random(seed)
+    start_ms = start_ms if start_ms is not None else int(time.time() * 1000)
+    codes = [f"KRW-C{i:03d}" for i in range(markets)]
+    prices = {code: 1000 + rng.random() * 1000 for code in codes}
+    ticks = []
+    timestamp = start_ms
+    end_ms = start_ms + minutes * 60_000
+    sequential_id = 0
+    while timestamp < end_ms:
+        timestamp += int(rng.expovariate(trades_per_second) * 1000) + 1
+        code = rng.choice(codes)
+        prices[code] *= 1 + rng.gauss(0, 0.001)
+        sequential_id += 1
+        ticks.append({
+            "type": "trade",
+            "code": code,
+            "trade_price": round(prices[code], 2),
+            "trade_volume": round(rng.random() * 10, 8),
+            "trade_timestamp": timestamp,
+            "sequential_id": sequential_id,
+            "stream_type": "REALTIME",
+        })
+    return ticks
+
+
+def load_ticks(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+async def record_ticks(path, seconds, url="wss://api.upbit.com/websocket/v1", api_url="https://api.upbit.com"):
+    """실제 Upbit 체결 스트림을 seconds초 동안 JSON Lines로 기록합니다."""
+    async with aiohttp.ClientSession() as session:
+        async with session.get(f"{api_url}/v1/market/all") as response:
+            markets = [coin['market'] for coin in await response.json() if coin['market'].startswith('KRW-')]
+        async with session.ws_connect(url, heartbeat=30) as ws:
+            await ws.send_json([{"ticket": str(uuid.uuid4())}, {"type": "trade", "codes": markets}])
+            recorded = 0
+            deadline = time.monotonic() + seconds
+            with open(path, "w", encoding="utf-8") as f:
+                while time.monotonic() < deadline:
+                    try:
+                        message = await ws.receive(timeout=deadline - time.monotonic())
+                    except asyncio.TimeoutError:
+                        break
+                    if message.type not in (aiohttp.WSMsgType.BINARY, aiohttp.WSMsgType.TEXT):
+                        break
+                    data = message.data.decode() if isinstance(message.data, bytes) else message.data
+                    f.write(data + "\n")
+                    recorded += 1
+    return recorded
+
+
+class MockUpbitStream:
+    """
+    체결을 재생 시계에 맞춰 /websocket/v1 구독자에게 보냅니다.
+    체결 시각은 서버 시작 시각으로 옮겨지며, speed배 빠르게 재생할 수 있습니다.
+    drop_every개를 보낼 때마다 연결을 끊고, duplicate_every개마다 같은 체결을 한 번 더 보내 재연결과 중복 제거를 검증합니다.
+    """
+
+    def __init__(self, ticks, speed=1.0, drop_every=None, duplicate_every=None):
+        ticks = sorted(ticks, key=lambda tick: tick['trade_timestamp'])
+        self.speed = speed
+        self.drop_every = drop_every
+        self.duplicate_every = duplicate_every
+        self.markets = sorted({tick['code'] for tick in ticks})
+        self.started_at = time.monotonic()
+        # 첫 체결이 지금 일어난 것처럼 시각을 옮김
+        offset = int(time.time() * 1000) - ticks[0]['trade_timestamp']
+        self.start_ms = ticks[0]['trade_timestamp'] + offset
+        self.ticks = [dict(tick, trade_timestamp=tick['trade_timestamp'] + offset) for tick in ticks]
+        self.timestamps = [tick['trade_timestamp'] for tick in self.ticks]
+        self._by_market = {}
+        for tick in self.ticks:
+            self._by_market.setdefault(tick['code'], []).append(tick)
+        self.connections = 0
+        self.sent = 0
+        self.dropped = 0
+
+    def start(self):
+        self.started_at = time.monotonic()
+
+    def clock_ms(self):
+        """재생 시계 (epoch ms)"""
+        return int(self.start_ms + (time.monotonic() - self.started_at) * 1000 * self.speed)
+
+    def finished(self):
+        return self.clock_ms() > self.timestamps[-1]
+
+    async def websocket(self, request):
+        ws = web.WebSocketResponse(heartbeat=30)
+        await ws.prepare(request)
+        self.connections += 1
+
+        subscription = json.loads((await ws.receive()).data)
+        codes = set()
+        for field in subscription:
+            if field.get("type") == "trade":
+                codes.update(field.get("codes", []))
+
+        # 연결한 시점 이후의 체결만 전달 (실제 스트림처럼 지난 체결은 다시 보내지 않음)
+        index = bisect.bisect_right(self.timestamps, self.clock_ms())
+        sent = 0
+        while index < len(self.ticks) and not ws.closed:
+            tick = self.ticks[index]
+            index += 1
+            if tick['code'] not in codes:
+                continue
+            wait_ms = tick['trade_timestamp'] - self.clock_ms()
+            if wait_ms > 0:
+                await asyncio.sleep(wait_ms / 1000 / self.speed)
+            payload = json.dumps(tick).encode()
+            await ws.send_bytes(payload)
+            sent += 1
+            self.sent += 1
+            if self.duplicate_every and sent % self.duplicate_every == 0:
+                await ws.send_bytes(payload)
+            if self.drop_every and sent % self.drop_every == 0:
+                self.dropped += 1
+                break
+        await ws.close()
+        return ws
+
+    async def market_all(self, request):
+        return web.json_response([
+            {"market": market, "korean_name": market.split("-")[1], "english_name": market.split("-")[1]}
+            for market in self.markets
+        ])
+
+    def candles_for(self, market, count, to_ms=None):
+        """재생 시계까지 일어난 체결로 집계한 1시간봉 (최신순)"""
+        ticks = self._by_market.get(market, [])
+        end_ms = min(self.clock_ms() + 1, to_ms) if to_ms else self.clock_ms() + 1
+        end = bisect.bisect_left([tick['trade_timestamp'] for tick in ticks], end_ms)
+        buckets = {}
+        for tick in ticks[:end]:
+            bucket = tick['trade_timestamp'] // HOUR_MS
+            candle = buckets.get(bucket)
+            price, volume = tick['trade_price'], tick['trade_volume']
+            if candle is None:
+                kst = datetime(1970, 1, 1) + timedelta(hours=bucket + 9)
+                candle = buckets[bucket] = {
+                    "market": market,
+                    "candle_date_time_utc": (kst - timedelta(hours=9)).strftime(KST_FORMAT),
+                    "candle_date_time_kst": kst.strftime(KST_FORMAT),
+                    "opening_price": price,
+                    "high_price": price,
+                    "low_price": price,
+                    "trade_price": price,
+                    "timestamp": tick['trade_timestamp'],
+                    "candle_acc_trade_price": 0,
+                    "candle_acc_trade_volume": 0,
+                    "unit": 60,
+                }
+            candle["high_price"] = max(candle["high_price"], price)
+            candle["low_price"] = min(candle["low_price"], price)
+            candle["trade_price"] = price
+            candle["timestamp"] = tick['trade_timestamp']
+            candle["candle_acc_trade_price"] += price * volume
+            candle["candle_acc_trade_volume"] += volume
+        return [buckets[bucket] for bucket in sorted(buckets, reverse=True)[:count]]
+
+    async def candles(self, request):
+        to = request.query.get("to")
+        to_ms = None
+        if to:
+            # 오프셋이 있으면 KST(+09:00)로 보고 epoch ms로 변환
+            to_ms = int((datetime.strptime(to[:19], KST_FORMAT) - timedelta(hours=9) - datetime(1970, 1, 1)).total_seconds() * 1000)
+        count = min(int(request.query.get("count", 1)), 200)
+        return web.json_response(self.candles_for(request.query["market"], count, to_ms))
+
+    def create_app(self):
+        app = web.Application()
+        app.router.add_get("/websocket/v1", self.websocket)
+        app.router.add_get("/v1/market/all", self.market_all)
+        app.router.add_get("/v1/candles/minutes/60", self.candles)
+        return app
+
+
+async def start_mock_stream(mock, host="127.0.0.1", port=0):
+    """목 서버를 현재 이벤트 루프에서 띄우고 (runner, base_url)을 반환합니다. 재생 시계는 이때부터 흐릅니다."""
+    runner = web.AppRunner(mock.create_app())
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    bound_port = site._server.sockets[0].getsockname()[1]
+    mock.start()
+    return runner, f"http://{host}:{bound_port}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local replay of the Upbit trade WebSocket")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    serve = subparsers.add_parser("serve", help="replay recorded or synthetic trades")
+    serve.add_argument("--port", type=int, default=8766)
+    serve.add_argument("--ticks", help="JSON Lines file written by the record command (synthetic trades if omitted)")
+    serve.add_argument("--markets", type=int, default=5)
+    serve.add_argument("--minutes", type=int, default=120)
+    serve.add_argument("--speed", type=float, default=1.0)
+    serve.add_argument("--drop-every", type=int)
+    serve.add_argument("--duplicate-every", type=int)
+
+    record = subparsers.add_parser("record", help="record live Upbit trades to a JSON Lines file")
+    record.add_argument("--out", required=True)
+    record.add_argument("--seconds", type=int, default=600)
+
+    args = parser.parse_args()
+    if args.command == "record":
+        recorded = asyncio.run(record_ticks(args.out, args.seconds))
+        print(f"Recorded {recorded} trades to {args.out}")
+    else:
+        ticks = load_ticks(args.ticks) if args.ticks else generate_ticks(args.markets, args.minutes)
+        mock = MockUpbitStream(ticks, args.speed, args.drop_every, args.duplicate_every)
+
+        async def on_startup(app):
+            mock.start()
+
+        app = mock.create_app()
+        app.on_startup.append(on_startup)
+        web.run_app(app, host="127.0.0.1", port=args.port)
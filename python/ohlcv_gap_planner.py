@@ -0,0 +1,192 @@
+import os
+import logging
+from datetime import datetime, timedelta, timezone
+
+# 빈 구간 계획 설정
+HOUR = timedelta(hours=1)
+KST = timezone(timedelta(hours=9))  # Coin_OHLCV timestamp는 KST 기준 (tz 정보 없음)
+UPBIT_MAX_CANDLES = 200  # 캔들 조회 한 번에 받을 수 있는 최대 개수
+OHLCV_BACKFILL_START = datetime.fromisoformat(os.getenv("OHLCV_BACKFILL_START", "2024-10-01T00:00:00"))  # 수집할 가장 오래된 시각
+OHLCV_GAP_LOOKBACK_HOURS = int(os.getenv("OHLCV_GAP_LOOKBACK_HOURS", 48))  # 정기 갱신에서 빈 시간을 다시 확인할 최근 구간
+
+# 코인별로 기대하는 1시간 버킷을 generate_series로 만들고, 저장된 캔들과 캔들이 없다고 확인된 시간을 제외한 뒤
+# (스트리밍 수집기가 진행 중인 스냅샷만 남기고 멈춘 시간은 저장된 캔들로 보지 않음)
+# 연속된 빈 시간을 하나의 구간으로 묶는다 (시각 - 순번이 같으면 같은 구간).
+# 정기 갱신($4 = false)은 최근 lookback 구간만 보되, 마지막 캔들이 그보다 오래됐으면(장애 후 재시작) 거기서부터 본다.
+GAP_QUERY = """
+    WITH bounds AS (
+        SELECT
+            c.coin_id,
+            CASE
+                WHEN $4::boolean THEN $2::timestamp
+                ELSE GREATEST($2::timestamp, LEAST(
+                    COALESCE((SELECT MAX(o.timestamp) FROM public.Coin_OHLCV o WHERE o.coin_id = c.coin_id), $2::timestamp),
+                    $3::timestamp - $5::interval
+                ))
+            END AS range_start
+        FROM unnest($1::int[]) AS c(coin_id)
+    ),
+    missing AS (
+        SELECT b.coin_id, h.hour
+        FROM bounds b
+        CROSS JOIN LATERAL generate_series(date_trunc('hour', b.range_start), $3::timestamp, INTERVAL '1 hour') AS h(hour)
+        WHERE (
+            NOT EXISTS (
+                SELECT 1 FROM public.Coin_OHLCV o WHERE o.coin_id = b.coin_id AND o.timestamp = h.hour
+            )
+            OR EXISTS (
+                SELECT 1 FROM public.Coin_OHLCV_Open_Bars ob WHERE ob.coin_id = b.coin_id AND ob.timestamp = h.hour
+            )
+        )
+        AND NOT EXISTS (
+            SELECT 1 FROM public.Coin_OHLCV_Empty_Hours e WHERE e.coin_id = b.coin_id AND e.timestamp = h.hour
+        )
+    )
+    SELECT coin_id, MIN(hour) AS gap_start, MAX(hour) AS gap_end
+    FROM (
+        SELECT
+            coin_id,
+            hour,
+            hour - ROW_NUMBER() OVER (PARTITION BY coin_id ORDER BY hour) * INTERVAL '1 hour' AS island
+        FROM missing
+    ) m
+    GROUP BY coin_id, island
+    ORDER BY coin_id, gap_start;
+"""
+
+EMPTY_HOURS_QUERY = """
+    INSERT INTO public.Coin_OHLCV_Empty_Hours (coin_id, timestamp)
+    SELECT $1, hour FROM unnest($2::timestamp[]) AS h(hour)
+    ON CONFLICT DO NOTHING;
+"""
+
+
+# 스트리밍 수집기가 진행 중인 봉의 스냅샷만 저장한 시간
+OPEN_BARS_MARK_QUERY = """
+    INSERT INTO public.Coin_OHLCV_Open_Bars (coin_id, timestamp)
+    SELECT coin_id, timestamp FROM unnest($1::int[], $2::timestamp[]) AS b(coin_id, timestamp)
+    ON CONFLICT DO NOTHING;
+"""
+
+OPEN_BARS_CLEAR_QUERY = """
+    DELETE FROM public.Coin_OHLCV_Open_Bars ob
+    USING unnest($1::int[], $2::timestamp[]) AS b(coin_id, timestamp)
+    WHERE ob.coin_id = b.coin_id AND ob.timestamp = b.timestamp;
+"""
+
+
+class CandleRequest:
+    """캔들 조회 한 번: to 이전 count개의 1시간봉으로 gaps의 빈 시간을 채웁니다."""
+
+    def __init__(self, to, count, gaps):
+        self.to = to  # 마지막 캔들 다음 시각 (exclusive)
+        self.count = count
+        self.gaps = gaps  # 이 요청이 채우는 빈 구간 [(시작, 끝), ...] (양 끝 포함)
+
+    def to_param(self):
+        # to에 오프셋이 없으면 UTC로 해석되므로 KST임을 명시
+        return f"{self.to.isoformat(timespec='seconds')}+09:00"
+
+    def missing_hours(self):
+        hours = set()
+        for gap_start, gap_end in self.gaps:
+            hour = gap_start
+            while hour <= gap_end:
+                hours.add(hour)
+                hour += HOUR
+        return hours
+
+    def __repr__(self):
+        return f"CandleRequest(to={self.to.isoformat()}, count={self.count}, gaps={len(self.gaps)})"
+
+
+def last_completed_hour(now=None):
+    """진행 중인 현재 시간봉은 아직 바뀌므로 직전에 끝난 시간봉까지만 계획합니다. 서버 시간대와 관계없이 KST로 계산합니다."""
+    now = now or datetime.now(KST).replace(tzinfo=None)
+    return now.replace(minute=0, second=0, microsecond=0) - HOUR
+
+
+def plan_requests(gaps, max_count=UPBIT_MAX_CANDLES):
+    """
+    한 코인의 빈 구간을 최소 개수의 캔들 요청으로 묶습니다.
+    가장 오래된 빈 시간부터 max_count시간 창을 채워 나가는 탐욕 방식이며, 고정 길이 창으로 점을 덮는 문제에서 최적입니다.
+    오래된 쪽부터 요청하므로 중간에 멈춰도 다음 실행에서 남은 구간만 다시 계획됩니다.
+
+    Args:
+        gaps (list[tuple[datetime, datetime]]): 시간 순서의 빈 구간 (양 끝 포함)
+        max_count (int): 요청 한 번의 최대 캔들 수
+
+    Returns:
+        list[CandleRequest]: 오래된 순서의 요청 목록
+    """
+    requests = []
+    window_start = None
+    window_gaps = []
+
+    def close_window():
+        last = window_gaps[-1][1]
+        count = (last - window_start) // HOUR + 1
+        requests.append(CandleRequest(last + HOUR, count, list(window_gaps)))
+        window_gaps.clear()
+
+    for gap_start, gap_end in sorted(gaps):
+        while True:
+            if window_start is not None and gap_start > window_start + (max_count - 1) * HOUR:
+                close_window()
+                window_start = None
+            if window_start is None:
+                window_start = gap_start
+            window_end = window_start + (max_count - 1) * HOUR
+            piece_end = min(gap_end, window_end)
+            window_gaps.append((gap_start, piece_end))
+            if piece_end == gap_end:
+                break
+            # 창을 넘는 나머지는 다음 창에서 이어서 채움
+            close_window()
+            window_start = None
+            gap_start = piece_end + HOUR
+
+    if window_gaps:
+        close_window()
+    return requests
+
+
+async def find_gaps(conn, coin_ids, end, full=False, start=OHLCV_BACKFILL_START, lookback_hours=OHLCV_GAP_LOOKBACK_HOURS):
+    """
+    Coin_OHLCV에서 빠진 1시간봉 구간을 코인별로 조회합니다.
+
+    Args:
+        conn: asyncpg 연결 또는 연결 풀
+        coin_ids (list[int]): 확인할 코인
+        end (datetime): 확인할 마지막 시간봉 (포함)
+        full (bool): True면 start부터 전체 구간을 확인 (초기 적재), False면 최근 구간만 확인
+
+    Returns:
+        dict[int, list[tuple[datetime, datetime]]]: coin_id -> 빈 구간 목록
+    """
+    rows = await conn.fetch(GAP_QUERY, coin_ids, start, end, full, timedelta(hours=lookback_hours))
+    gaps = {}
+    for row in rows:
+        gaps.setdefault(row['coin_id'], []).append((row['gap_start'], row['gap_end']))
+    return gaps
+
+
+async def record_empty_hours(conn, coin_id, hours):
+    """조회했는데도 캔들이 없는 시간을 기록하여 다시 요청하지 않도록 합니다."""
+    if hours:
+        await conn.execute(EMPTY_HOURS_QUERY, coin_id, sorted(hours))
+        logging.info(f"Recorded {len(hours)} empty hours for coin {coin_id}.")
+
+
+async def mark_open_bars(conn, keys):
+    """진행 중인 봉의 스냅샷으로 저장한 (coin_id, timestamp)를 기록합니다."""
+    if keys:
+        coin_ids, timestamps = zip(*keys)
+        await conn.execute(OPEN_BARS_MARK_QUERY, list(coin_ids), list(timestamps))
+
+
+async def clear_open_bars(conn, keys):
+    """마감된 값으로 저장한 (coin_id, timestamp)의 진행 중 표시를 지웁니다."""
+    if keys:
+        coin_ids, timestamps = zip(*keys)
+        await conn.execute(OPEN_BARS_CLEAR_QUERY, list(coin_ids), list(timestamps))
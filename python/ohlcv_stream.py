@@ -0,0 +1,437 @@
+import os
+import json
+import time
+import uuid
+import asyncio
+import logging
+from collections import deque
+from datetime import datetime, timedelta
+
+import aiohttp
+
+from db_connector import get_db_pool
+from coin_registry import coin_registry
+from upbit_client import UpbitClient, gather_bounded, UPBIT_CONCURRENCY
+from ohlcv_gap_planner import UPBIT_MAX_CANDLES, clear_open_bars, mark_open_bars
+from coin_ohlcv_collector import OHLCV_UPSERT_QUERY, init_ohlcv_connection, ohlcv_row, store_ohlcv_rows
+
+# 스트리밍 수집 설정
+UPBIT_WEBSOCKET_URL = os.getenv("UPBIT_WEBSOCKET_URL", "wss://api.upbit.com/websocket/v1")  # 목 서버로 바꿔 검증할 수 있도록 환경 변수로 둠
+STREAM_FLUSH_SECONDS = float(os.getenv("STREAM_FLUSH_SECONDS", 10))  # 마감된 봉과 진행 중인 봉 스냅샷을 저장하는 간격
+STREAM_HEARTBEAT_SECONDS = 30  # 유휴 연결이 끊기지 않도록 보내는 ping 간격
+STREAM_RECONNECT_DELAY = 1  # 재연결 대기 시간(초), 실패할 때마다 두 배
+STREAM_RECONNECT_MAX_DELAY = 30
+STREAM_DEDUP_SIZE = 1000  # 마켓별로 기억할 최근 체결 번호 수 (중복 수신 제거)
+STREAM_RESUME_RETRIES = 5  # REST 캔들로 봉을 채우지 못한 마켓을 다시 시도할 횟수 (실패할 때마다 대기 시간을 두 배로)
+
+HOUR_MS = 3_600_000
+KST_EPOCH = datetime(1970, 1, 1) + timedelta(hours=9)
+
+
+def now_ms():
+    return int(time.time() * 1000)
+
+
+def hour_bucket(timestamp_ms):
+    """체결 시각(epoch ms)의 1시간 버킷 번호. KST는 정시 단위 오프셋이므로 UTC 버킷과 경계가 같습니다."""
+    return timestamp_ms // HOUR_MS
+
+
+def bucket_to_kst(bucket):
+    return KST_EPOCH + timedelta(hours=bucket)
+
+
+def kst_to_bucket(timestamp):
+    return (timestamp - KST_EPOCH) // timedelta(hours=1)
+
+
+class Bar:
+    """진행 중이거나 마감된 1시간봉. 체결 한 건마다 O(1)로 갱신합니다."""
+
+    __slots__ = ("bucket", "open", "high", "low", "close", "volume", "first_ts", "last_ts", "cutoff_ts", "complete", "dirty")
+
+    def __init__(self, bucket, price, volume, timestamp_ms, cutoff_ts=-1, complete=False):
+        self.bucket = bucket
+        self.open = self.high = self.low = self.close = price
+        self.volume = volume
+        self.first_ts = self.last_ts = timestamp_ms
+        self.cutoff_ts = cutoff_ts  # 이 시각 이전의 체결은 이미 반영됨 (REST 캔들로 시작한 경우)
+        # 시간봉의 모든 체결을 반영했는지 (REST 캔들로 시작했거나, 연결이 이어진 상태에서 첫 체결로 시작한 경우)
+        # 아니면 마감된 뒤에도 진행 중 표시를 남겨 빈 구간 계획기가 REST 캔들로 다시 채우게 함
+        self.complete = complete
+        self.dirty = True  # 마지막 저장 이후 바뀌었는지
+
+    @classmethod
+    def from_candle(cls, candle):
+        """REST 캔들로 봉을 시작합니다. 캔들의 timestamp(마지막 체결 시각)까지의 체결은 건너뜁니다."""
+        bucket = kst_to_bucket(datetime.fromisoformat(candle['candle_date_time_kst']))
+        bar = cls(bucket, candle['opening_price'], candle['candle_acc_trade_volume'], candle['timestamp'], candle['timestamp'], True)
+        bar.high = candle['high_price']
+        bar.low = candle['low_price']
+        bar.close = candle['trade_price']
+        return bar
+
+    def update(self, price, volume, timestamp_ms):
+        if timestamp_ms <= self.cutoff_ts:
+            return False
+        if price > self.high:
+            self.high = price
+        if price < self.low:
+            self.low = price
+        # 체결 순서가 보장되지 않으므로 시가와 종가는 체결 시각으로 판단
+        if timestamp_ms < self.first_ts:
+            self.open = price
+            self.first_ts = timestamp_ms
+        if timestamp_ms >= self.last_ts:
+            self.close = price
+            self.last_ts = timestamp_ms
+        self.volume += volume
+        self.dirty = True
+        return True
+
+
+class BarBuilder:
+    """
+    마켓별 체결을 1시간봉으로 모읍니다.
+    진행 중인 봉은 bars에, 다음 시간의 체결이 오거나 시계가 정시를 넘겨 마감된 봉은 저장될 때까지 closed에 둡니다.
+    REST 캔들로 봉을 채우지 못한 마켓의 체결은 다시 채울 때까지 모아 두었다가 캔들 이후분만 반영합니다.
+    """
+
+    def __init__(self, dedup_size=STREAM_DEDUP_SIZE):
+        self.bars = {}  # market -> 진행 중인 Bar
+        self.closed = {}  # (market, bucket) -> 저장 대기 중인 마감된 Bar
+        self.last_closed = {}  # market -> 마지막으로 저장한 마감된 Bar (늦게 도착한 체결 반영용)
+        self.live = set()  # 연결 이후 REST 캔들로 봉을 채워 체결이 빠짐없이 이어지는 마켓
+        self.pending = {}  # market -> REST 캔들을 기다리는 동안 모아 둔 체결 목록
+        self.dedup_size = dedup_size
+        self._recent = {}  # market -> (체결 번호 deque, set)
+        self.trades = 0
+        self.duplicates = 0
+        self.late = 0
+        self.malformed = 0
+
+    def _is_duplicate(self, market, sequential_id):
+        recent = self._recent.get(market)
+        if recent is None:
+            recent = self._recent[market] = (deque(), set())
+        order, seen = recent
+        if sequential_id in seen:
+            return True
+        order.append(sequential_id)
+        seen.add(sequential_id)
+        if len(order) > self.dedup_size:
+            seen.discard(order.popleft())
+        return False
+
+    def add_trade(self, market, price, volume, timestamp_ms, sequential_id):
+        pending = self.pending.get(market)
+        if pending is not None:
+            pending.append((price, volume, timestamp_ms, sequential_id))
+            return
+        if self._is_duplicate(market, sequential_id):
+            self.duplicates += 1
+            return
+        self.trades += 1
+        bucket = hour_bucket(timestamp_ms)
+        bar = self.bars.get(market)
+
+        if bar is None or bucket > bar.bucket:
+            if bar is not None:
+                self.closed[(market, bar.bucket)] = bar
+            # 연결이 이어진 마켓에서 새 시간의 첫 체결로 시작한 봉은 시가와 거래량이 온전함
+            self.bars[market] = Bar(bucket, price, volume, timestamp_ms, complete=market in self.live)
+        elif bucket == bar.bucket:
+            bar.update(price, volume, timestamp_ms)
+        else:
+            # 정시 직후에 늦게 도착한 이전 시간의 체결은 마감된 봉에 반영하고, 이미 저장했다면 다시 저장
+            closed = self.closed.get((market, bucket))
+            if closed is None:
+                closed = self.last_closed.get(market)
+                if closed is None or closed.bucket != bucket:
+                    self.late += 1
+                    return
+                self.closed[(market, bucket)] = closed
+            closed.update(price, volume, timestamp_ms)
+
+    def seed(self, market, bar, current_bucket):
+        """재연결 후 REST 캔들로 봉을 채웁니다. 진행 중인 시간의 캔들은 이어서 체결을 반영합니다."""
+        if bar.bucket >= current_bucket:
+            open_bar = self.bars.get(market)
+            # 스트림이 이미 더 나중 시간으로 넘어갔다면 유지
+            if open_bar is None or open_bar.bucket <= bar.bucket:
+                self.bars[market] = bar
+        else:
+            self.closed[(market, bar.bucket)] = bar
+
+    def disconnect(self):
+        """연결이 끊기면 진행 중인 봉은 그 사이의 체결이 빠지므로, REST 캔들로 다시 채우기 전까지 불완전한 봉으로 봅니다."""
+        self.live.clear()
+        for bar in self.bars.values():
+            bar.complete = False
+
+    def resumed(self, market):
+        """REST 캔들로 봉을 채운 마켓은 모아 둔 체결을 반영하고 (캔들 이후분만 반영됨) 다시 이어진 것으로 봅니다."""
+        self.live.add(market)
+        for trade in self.pending.pop(market, ()):
+            self.add_trade(market, *trade)
+
+    def resume_failed(self, market):
+        """REST 캔들을 받지 못한 마켓은 다시 시도할 때까지 체결을 모아 둡니다."""
+        self.pending.setdefault(market, [])
+
+    def give_up_resume(self, market):
+        """
+        다시 시도해도 실패한 마켓은 모아 둔 체결을 불완전한 봉에 반영하고, 빈 구간 계획기가 다시 채우게 둡니다.
+        체결은 연결 이후 빠짐없이 받고 있으므로 다음 시간의 봉부터는 온전한 봉으로 봅니다.
+        """
+        for trade in self.pending.pop(market, ()):
+            self.add_trade(market, *trade)
+        self.live.add(market)
+
+    def close_expired(self, current_bucket):
+        """체결이 없어도 정시가 지난 봉은 마감합니다."""
+        for market, bar in list(self.bars.items()):
+            if bar.bucket < current_bucket:
+                self.closed[(market, bar.bucket)] = bar
+                del self.bars[market]
+
+    def drain(self):
+        """저장할 봉 [(market, Bar), ...]을 꺼냅니다. 마감된 봉 전부와 바뀐 진행 중인 봉이 포함됩니다."""
+        items = list((market, bar) for (market, _), bar in self.closed.items())
+        self.closed.clear()
+        for market, bar in items:
+            last = self.last_closed.get(market)
+            if last is None or last.bucket <= bar.bucket:
+                self.last_closed[market] = bar
+        for market, bar in self.bars.items():
+            if bar.dirty:
+                items.append((market, bar))
+        for _, bar in items:
+            bar.dirty = False
+        return items
+
+    def restore(self, items):
+        """저장에 실패한 봉을 다음 저장에 다시 포함시킵니다."""
+        for market, bar in items:
+            if self.bars.get(market) is bar:
+                bar.dirty = True
+            else:
+                self.closed.setdefault((market, bar.bucket), bar)
+
+
+async def flush_bars(pool, builder, coin_ids, clock=now_ms):
+    """
+    마감된 봉과 진행 중인 봉 스냅샷을 한 트랜잭션으로 Coin_OHLCV에 upsert합니다.
+    스냅샷으로 저장한 시간은 Coin_OHLCV_Open_Bars에 표시해 두어, 수집기가 멈추면 빈 구간 계획기가 다시 채우게 합니다.
+    연결이 끊겨 체결이 빠진 봉은 마감된 뒤에도 표시를 남겨 REST 캔들로 다시 채우게 합니다.
+    """
+    builder.close_expired(hour_bucket(clock()))
+    items = builder.drain()
+    if not items:
+        return 0
+
+    rows = []
+    open_keys = []
+    closed_keys = []
+    for market, bar in items:
+        key = (coin_ids[market], bucket_to_kst(bar.bucket))
+        rows.append(ohlcv_row(*key, bar.open, bar.high, bar.low, bar.close, bar.volume))
+        (open_keys if builder.bars.get(market) is bar or not bar.complete else closed_keys).append(key)
+    try:
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                await store_ohlcv_rows(conn, rows, OHLCV_UPSERT_QUERY)
+                await mark_open_bars(conn, open_keys)
+                await clear_open_bars(conn, closed_keys)
+    except Exception:
+        builder.restore(items)
+        raise
+    return len(items)
+
+
+async def resume_bars(client, builder, markets, since_bucket, clock=now_ms):
+    """
+    연결 직후 끊겨 있던 시간(since_bucket부터 현재 시간까지)의 캔들을 REST로 받아 봉을 채웁니다.
+    구독을 먼저 한 뒤 호출하므로, 그 사이 도착한 체결은 캔들의 마지막 체결 시각 이후분만 반영됩니다.
+
+    Returns:
+        list[str]: 캔들을 받지 못한 마켓 (체결은 다시 시도할 때까지 builder에 모아 둠)
+    """
+    current_bucket = hour_bucket(clock())
+    count = min(current_bucket - since_bucket + 1, UPBIT_MAX_CANDLES)
+    if current_bucket - since_bucket + 1 > UPBIT_MAX_CANDLES:
+        logging.warning(f"Stream was down for {current_bucket - since_bucket} hours; older hours are left to the gap planner.")
+
+    async def resume_market(market):
+        candles = await client.get_candles(market, count=count)
+        for candle in candles:
+            builder.seed(market, Bar.from_candle(candle), current_bucket)
+        builder.resumed(market)
+
+    results = await gather_bounded((resume_market(market) for market in markets), UPBIT_CONCURRENCY)
+    failed = []
+    for market, result in zip(markets, results):
+        if isinstance(result, Exception):
+            logging.warning(f"Failed to resume {market} from REST candles: {result}")
+            builder.resume_failed(market)
+            failed.append(market)
+    logging.info(f"Resumed {len(markets) - len(failed)} of {len(markets)} markets from {count} REST candles each.")
+    return failed
+
+
+async def retry_resume(client, builder, markets, since_bucket, clock=now_ms, retries=STREAM_RESUME_RETRIES):
+    """캔들을 받지 못한 마켓을 백오프하며 다시 채웁니다. 끝까지 실패한 마켓은 빈 구간 계획기에 맡깁니다."""
+    delay = STREAM_RECONNECT_DELAY
+    for _ in range(retries):
+        if not markets:
+            return
+        await asyncio.sleep(delay)
+        markets = await resume_bars(client, builder, markets, since_bucket, clock)
+        delay = min(delay * 2, STREAM_RECONNECT_MAX_DELAY)
+    for market in markets:
+        builder.give_up_resume(market)
+    if markets:
+        logging.error(f"Gave up resuming {len(markets)} markets; their bars stay marked open for the gap planner.")
+
+
+def parse_trade(data):
+    """
+    체결 메시지에서 (market, price, volume, timestamp_ms, sequential_id)를 꺼냅니다.
+    체결이 아닌 메시지는 None, 형식이 어긋난 메시지는 ValueError를 냅니다.
+    """
+    trade = json.loads(data)
+    if not isinstance(trade, dict):
+        raise ValueError("trade message is not an object")
+    if trade.get('type') != 'trade':
+        return None
+    try:
+        market = trade['code']
+        price = float(trade['trade_price'])
+        volume = float(trade['trade_volume'])
+        timestamp_ms = int(trade['trade_timestamp'])
+        sequential_id = int(trade['sequential_id'])
+    except (KeyError, TypeError) as e:
+        raise ValueError(f"missing or invalid field {e}") from e
+    if not isinstance(market, str):
+        raise ValueError(f"invalid market {market!r}")
+    return market, price, volume, timestamp_ms, sequential_id
+
+
+async def consume_trades(ws, builder):
+    async for message in ws:
+        if message.type in (aiohttp.WSMsgType.BINARY, aiohttp.WSMsgType.TEXT):
+            # 형식이 어긋난 메시지는 건너뛰고 연결은 유지
+            try:
+                trade = parse_trade(message.data)
+            except ValueError as e:
+                builder.malformed += 1
+                logging.warning(f"Skipping malformed trade message {message.data[:200]!r}: {e}")
+                continue
+            if trade is not None:
+                builder.add_trade(*trade)
+        elif message.type == aiohttp.WSMsgType.ERROR:
+            # 예외 정보가 없는 ERROR 프레임도 연결이 끊긴 것으로 보고 재연결
+            raise ws.exception() or ConnectionError("WebSocket error frame")
+
+
+async def stream_trades(builder, markets, client, url=UPBIT_WEBSOCKET_URL, stop=None, clock=now_ms):
+    """
+    체결 스트림을 구독하여 builder에 반영합니다. 연결이 끊기면 지수 백오프로 재연결하고,
+    끊겨 있던 시간의 봉은 REST 캔들로 다시 채운 뒤 이어서 갱신합니다.
+    """
+    stop = stop or asyncio.Event()
+    # 연결이 끊긴 시간봉. 처음 연결할 때는 재시작 전에 스냅샷만 저장됐을 수 있는 직전 시간봉부터 채움
+    disconnected_bucket = hour_bucket(clock()) - 1
+    delay = STREAM_RECONNECT_DELAY
+    connections = 0
+
+    async with aiohttp.ClientSession() as session:
+        while not stop.is_set():
+            try:
+                async with session.ws_connect(url, heartbeat=STREAM_HEARTBEAT_SECONDS) as ws:
+                    await ws.send_json([
+                        {"ticket": str(uuid.uuid4())},
+                        {"type": "trade", "codes": markets},
+                    ])
+                    connections += 1
+                    logging.info(f"Subscribed to trades for {len(markets)} markets (connection {connections}).")
+
+                    failed = await resume_bars(client, builder, markets, disconnected_bucket, clock)
+                    # 캔들을 받지 못한 마켓은 체결을 받으면서 다시 시도
+                    retrier = asyncio.create_task(retry_resume(client, builder, failed, disconnected_bucket, clock))
+                    disconnected_bucket = None
+                    delay = STREAM_RECONNECT_DELAY
+
+                    consumer = asyncio.create_task(consume_trades(ws, builder))
+                    stopper = asyncio.create_task(stop.wait())
+                    try:
+                        done, _ = await asyncio.wait({consumer, stopper}, return_when=asyncio.FIRST_COMPLETED)
+                    finally:
+                        stopper.cancel()
+                        retrier.cancel()
+                    if consumer in done:
+                        consumer.result()
+                    else:
+                        consumer.cancel()
+                        break
+                logging.warning("Trade stream closed by server.")
+            except (aiohttp.ClientError, asyncio.TimeoutError, ConnectionError) as e:
+                logging.error(f"Trade stream error: {e}")
+            except Exception:
+                # 예상하지 못한 오류로 수집 작업 전체가 끝나지 않도록 재연결
+                logging.exception("Unexpected trade stream error")
+
+            # 재연결이 계속 실패해도 처음 끊긴 시간부터 다시 채움
+            if disconnected_bucket is None:
+                disconnected_bucket = hour_bucket(clock())
+                builder.disconnect()
+            logging.info(f"Reconnecting to trade stream in {delay}s.")
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+            delay = min(delay * 2, STREAM_RECONNECT_MAX_DELAY)
+    return connections
+
+
+async def flush_periodically(pool, builder, coin_ids, stop, interval=STREAM_FLUSH_SECONDS):
+    while True:
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=interval)
+        except asyncio.TimeoutError:
+            pass
+        start_time = time.perf_counter()
+        try:
+            flushed = await flush_bars(pool, builder, coin_ids)
+            if flushed:
+                logging.info(
+                    f"Flushed {flushed} bars in {time.perf_counter() - start_time:.2f}s "
+                    f"({builder.trades} trades, {builder.duplicates} duplicates, {builder.late} late, {builder.malformed} malformed so far)"
+                )
+        except Exception as e:
+            logging.error(f"Error flushing bars: {e}")
+        if stop.is_set():
+            break
+
+
+async def run_ohlcv_stream(stop=None):
+    """모든 KRW 마켓의 체결을 구독하여 1시간봉을 실시간으로 Coin_OHLCV에 반영합니다."""
+    stop = stop or asyncio.Event()
+    pool = await get_db_pool("data_collector", init=init_ohlcv_connection)
+    builder = BarBuilder()
+
+    async with UpbitClient() as client:
+        krw_pairs = await client.get_krw_pairs()
+        await coin_registry.refresh_async(pool)
+        coin_ids = {}
+        for market, _ in krw_pairs:
+            coin_id = coin_registry.get(market.split('-')[1])
+            if coin_id:
+                coin_ids[market] = coin_id
+
+        flusher = asyncio.create_task(flush_periodically(pool, builder, coin_ids, stop))
+        try:
+            await stream_trades(builder, list(coin_ids), client, stop=stop)
+        finally:
+            stop.set()
+            await flusher
@@ -0,0 +1,166 @@
+import os
+import json
+import time
+import select
+import logging
+from multiprocessing import Pool
+
+import psycopg2
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+
+from db_connector import get_db_connection
+from coin_matcher import get_coin_matcher
+from chat_analyzer import (
+    ANALYZER_WATERMARK_LOOKBACK_HOURS,
+    MORPHOLOGY_WORKERS,
+    analyze_pending_reactions,
+    fetch_coin_aliases,
+    init_morphology_worker,
+    morphology_cache,
+    sentiment_cache,
+)
+
+# 실시간 분석 설정
+REALTIME_BATCH_SIZE = int(os.getenv("REALTIME_BATCH_SIZE", 200))  # 이만큼 새 반응이 쌓이면 바로 분석
+REALTIME_FLUSH_MS = int(os.getenv("REALTIME_FLUSH_MS", 1000))  # 첫 알림 이후 최대 대기 시간(ms)
+REALTIME_SWEEP_SECONDS = int(os.getenv("REALTIME_SWEEP_SECONDS", 300))  # 알림 누락 대비 주기적 분석 및 별칭 갱신 간격
+REALTIME_RECONNECT_DELAY = 5  # 연결이 끊겼을 때 재연결까지 대기 시간(초)
+
+# Community_Reactions 삽입 트리거가 알림을 보내는 채널
+REACTIONS_NOTIFY_CHANNEL = "community_reactions_inserted"
+
+
+class MicroBatcher:
+    """
+    삽입 알림을 모아 두었다가 batch_size개가 쌓이거나 첫 알림 후 flush_ms가 지나면 분석하도록 알려줍니다.
+    분석 중에 도착한 알림은 다음 묶음으로 합쳐지므로, 분석이 밀려도 메모리에는 알림 정보만 쌓입니다.
+    """
+
+    def __init__(self, batch_size=REALTIME_BATCH_SIZE, flush_ms=REALTIME_FLUSH_MS):
+        self.batch_size = batch_size
+        self.flush_seconds = flush_ms / 1000
+        self.pending_count = 0
+        self.first_pending_at = None  # 첫 알림을 받은 시각 (monotonic)
+        self.inserted_at = []  # 알림별 (삽입 시각(epoch 초), 행 수)
+
+    def add(self, payload):
+        try:
+            message = json.loads(payload)
+            count = int(message["count"])
+            inserted_at = float(message["inserted_at"])
+        except (ValueError, KeyError, TypeError) as e:
+            logging.warning(f"Invalid {REACTIONS_NOTIFY_CHANNEL} payload {payload!r}: {e}")
+            return
+        if self.first_pending_at is None:
+            self.first_pending_at = time.monotonic()
+        self.pending_count += count
+        self.inserted_at.append((inserted_at, count))
+
+    def seconds_until_flush(self):
+        if self.first_pending_at is None:
+            return None
+        return max(self.first_pending_at + self.flush_seconds - time.monotonic(), 0.0)
+
+    def should_flush(self):
+        if self.first_pending_at is None:
+            return False
+        return self.pending_count >= self.batch_size or self.seconds_until_flush() == 0.0
+
+    def take(self):
+        inserted_at = self.inserted_at
+        self.pending_count = 0
+        self.first_pending_at = None
+        self.inserted_at = []
+        return inserted_at
+
+
+def log_latency(inserted_at, analyzed, elapsed):
+    """삽입부터 분석 결과 커밋까지의 지연 시간을 행 수로 가중해 기록합니다."""
+    finished_at = time.time()
+    latencies = [(finished_at - timestamp, count) for timestamp, count in inserted_at]
+    notified = sum(count for _, count in latencies)
+    if notified:
+        average = sum(latency * count for latency, count in latencies) / notified
+        worst = max(latency for latency, _ in latencies)
+        logging.info(
+            f"Realtime flush: {analyzed} reactions analyzed in {elapsed * 1000:.0f} ms, "
+            f"{notified} notified, end-to-end latency avg {average * 1000:.0f} ms / max {worst * 1000:.0f} ms"
+        )
+    else:
+        logging.info(f"Realtime sweep: {analyzed} reactions analyzed in {elapsed * 1000:.0f} ms")
+
+
+def listen(conn):
+    conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+    with conn.cursor() as cur:
+        cur.execute(f"LISTEN {REACTIONS_NOTIFY_CHANNEL};")
+    logging.info(f"Listening on {REACTIONS_NOTIFY_CHANNEL}.")
+
+
+def run_realtime_analyzer():
+    """
+    새 반응 삽입 알림을 받아 짧은 묶음 단위로 통합 분석 파이프라인을 실행하는 상주 프로세스.
+    분석 대상은 항상 파이프라인 진행 위치 이후를 DB에서 다시 읽으므로, 알림은 언제 분석할지만 결정합니다.
+    """
+    batcher = MicroBatcher()
+
+    with Pool(MORPHOLOGY_WORKERS, initializer=init_morphology_worker) as pool:
+        coin_matcher = None
+        next_sweep = 0.0  # 시작하자마자 밀린 반응부터 처리
+
+        while True:
+            conn = None
+            try:
+                conn = get_db_connection("data_scheduler")
+                listen(conn)
+
+                while True:
+                    now = time.monotonic()
+                    if now >= next_sweep:
+                        # 알림 없이도 주기적으로 분석하고, 별칭 사전도 이때 갱신
+                        coin_matcher = get_coin_matcher(fetch_coin_aliases(conn))
+                        morphology_cache.log_stats("realtime")
+                        sentiment_cache.log_stats("realtime")
+                    elif not batcher.should_flush():
+                        timeout = batcher.seconds_until_flush()
+                        timeout = next_sweep - now if timeout is None else min(timeout, next_sweep - now)
+                        if select.select([conn], [], [], timeout) != ([], [], []):
+                            conn.poll()
+                            while conn.notifies:
+                                batcher.add(conn.notifies.pop(0).payload)
+                        continue
+
+                    inserted_at = batcher.take()
+                    start_time = time.perf_counter()
+                    # 알림으로 시작한 묶음은 진행 위치 바로 다음부터 읽고, 늦게 적재된 반응은 주기적 분석에서 되돌아보며 확인
+                    lookback_hours = ANALYZER_WATERMARK_LOOKBACK_HOURS if now >= next_sweep else 0
+                    try:
+                        analyzed = analyze_pending_reactions(pool, coin_matcher, lookback_hours)
+                    except RuntimeError as e:
+                        # 단계 실패 시 진행 위치가 그대로이므로 다음 묶음에서 다시 시도
+                        logging.error(f"Realtime flush failed: {e}")
+                        time.sleep(REALTIME_RECONNECT_DELAY)
+                        continue
+                    elapsed = time.perf_counter() - start_time
+                    log_latency(inserted_at, analyzed, elapsed)
+
+                    # 분석 시간이 대기 시간보다 길면 그동안 온 알림은 다음 묶음으로 합쳐짐
+                    conn.poll()
+                    while conn.notifies:
+                        batcher.add(conn.notifies.pop(0).payload)
+                    if elapsed > batcher.flush_seconds and batcher.pending_count:
+                        logging.warning(
+                            f"Realtime analysis is falling behind: {batcher.pending_count} reactions arrived during a {elapsed:.1f}s flush."
+                        )
+                    if now >= next_sweep:
+                        next_sweep = time.monotonic() + REALTIME_SWEEP_SECONDS
+            except psycopg2.OperationalError as e:
+                logging.error(f"Realtime analyzer connection lost: {e}")
+                time.sleep(REALTIME_RECONNECT_DELAY)
+            finally:
+                if conn:
+                    conn.close()
+
+
+if __name__ == '__main__':
+    run_realtime_analyzer()
@@ -0,0 +1,179 @@
+import os
+import time
+import logging
+import threading
+
+import numpy as np
+
+# 감정 분석 엔진 설정
+SENTIMENT_MODEL = os.getenv("SENTIMENT_MODEL", "snunlp/KR-FinBert-SC")
+SENTIMENT_BACKEND = os.getenv("SENTIMENT_BACKEND", "fp32")  # fp32, int8, onnx
+SENTIMENT_TOKEN_BUDGET = int(os.getenv("SENTIMENT_TOKEN_BUDGET", 4096))  # 배치 하나의 (행 수 x 패딩 길이) 상한
+SENTIMENT_MAX_LENGTH = int(os.getenv("SENTIMENT_MAX_LENGTH", 512))  # 메시지당 최대 토큰 수
+SENTIMENT_ONNX_PATH = os.getenv("SENTIMENT_ONNX_PATH", "models/kr-finbert-sc.onnx")
+TORCH_NUM_THREADS = int(os.getenv("TORCH_NUM_THREADS", 0))  # 0이면 torch 기본값 사용
+MODEL_CACHE_DIR = os.getenv("MODEL_CACHE_DIR", "models/hf")  # 내려받은 모델을 보관할 로컬 디렉터리
+MODEL_OFFLINE = os.getenv("MODEL_OFFLINE", "false").lower() == "true"  # true면 로컬 캐시만 사용 (네트워크 접근 없음)
+
+BACKENDS = ("fp32", "int8", "onnx")
+LABELS = ['positive', 'neutral', 'negative']
+
+
+def length_bucketed_batches(lengths, token_budget=SENTIMENT_TOKEN_BUDGET):
+    """
+    토큰 길이가 비슷한 메시지끼리 묶어 패딩을 최소화한 배치를 만듭니다.
+    길이 순으로 정렬한 뒤, (배치 행 수 x 배치 내 최대 길이)가 token_budget을 넘지 않도록 자릅니다.
+
+    Args:
+        lengths (list[int]): 메시지별 토큰 수
+        token_budget (int): 배치 하나에 허용할 패딩 포함 토큰 수
+
+    Returns:
+        list[list[int]]: 원래 인덱스 목록의 배치 목록
+    """
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+    batches = []
+    batch = []
+    for i in order:
+        # 오름차순이므로 현재 메시지 길이가 곧 배치의 패딩 길이
+        if batch and (len(batch) + 1) * lengths[i] > token_budget:
+            batches.append(batch)
+            batch = []
+        batch.append(i)
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def _from_pretrained(loader, model_name):
+    """
+    MODEL_CACHE_DIR에서 먼저 찾고, 없으면 (오프라인 모드가 아닐 때만) 내려받아 같은 디렉터리에 저장합니다.
+    """
+    try:
+        return loader.from_pretrained(model_name, cache_dir=MODEL_CACHE_DIR, local_files_only=True)
+    except OSError:
+        if MODEL_OFFLINE:
+            raise RuntimeError(f"{model_name} is not in {MODEL_CACHE_DIR} and MODEL_OFFLINE is set")
+        logging.info(f"Downloading {model_name} into {MODEL_CACHE_DIR}...")
+        return loader.from_pretrained(model_name, cache_dir=MODEL_CACHE_DIR)
+
+
+class SentimentEngine:
+    """
+    KR-FinBert-SC 감정 분류기를 선택한 백엔드로 CPU에서 실행합니다.
+
+    - fp32: PyTorch 기본 정밀도 (CPU에서는 half보다 빠름)
+    - int8: Linear 층을 동적 양자화한 PyTorch 모델
+    - onnx: ONNX로 내보낸 모델을 ONNX Runtime 세션으로 실행 (파일이 없으면 최초 1회 내보냄)
+    """
+
+    def __init__(self, backend=SENTIMENT_BACKEND, model_name=SENTIMENT_MODEL, token_budget=SENTIMENT_TOKEN_BUDGET,
+                 max_length=SENTIMENT_MAX_LENGTH, num_threads=TORCH_NUM_THREADS, onnx_path=SENTIMENT_ONNX_PATH):
+        if backend not in BACKENDS:
+            raise ValueError(f"Invalid sentiment backend: {backend}")
+        # torch, transformers, onnxruntime은 임포트만으로 수 초가 걸리므로 엔진을 만들 때 불러옴
+        # (형태소 분석이나 코인 매칭만 하는 실행은 이 비용을 치르지 않음)
+        if backend == "onnx":
+            try:
+                import onnxruntime
+            except ImportError:
+                raise RuntimeError("onnxruntime is required for the onnx sentiment backend")
+            self._onnxruntime = onnxruntime
+
+        import torch
+        from transformers import AutoTokenizer, AutoModelForSequenceClassification
+        self._torch = torch
+
+        self.backend = backend
+        self.token_budget = token_budget
+        self.max_length = max_length
+        self.num_threads = num_threads
+        if num_threads > 0:
+            torch.set_num_threads(num_threads)
+
+        logging.info(f"Loading sentiment model {model_name} ({backend} backend)...")
+        self.tokenizer = _from_pretrained(AutoTokenizer, model_name)
+        model = _from_pretrained(AutoModelForSequenceClassification, model_name).eval()
+
+        if backend == "int8":
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        if backend == "onnx":
+            self.session = self._load_onnx_session(model, onnx_path)
+            self.model = None
+        else:
+            self.model = model
+        logging.info("Sentiment model loaded.")
+
+    def _load_onnx_session(self, model, onnx_path):
+        torch = self._torch
+        onnxruntime = self._onnxruntime
+        if not os.path.exists(onnx_path):
+            logging.info(f"Exporting sentiment model to {onnx_path}...")
+            os.makedirs(os.path.dirname(onnx_path) or ".", exist_ok=True)
+            dummy = self.tokenizer(["비트코인"], return_tensors='pt')
+            dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in ("input_ids", "attention_mask", "token_type_ids")}
+            dynamic_axes["logits"] = {0: "batch"}
+            torch.onnx.export(
+                model,
+                (dummy["input_ids"], dummy["attention_mask"], dummy["token_type_ids"]),
+                onnx_path,
+                input_names=["input_ids", "attention_mask", "token_type_ids"],
+                output_names=["logits"],
+                dynamic_axes=dynamic_axes,
+                opset_version=14,
+            )
+
+        options = onnxruntime.SessionOptions()
+        if self.num_threads > 0:
+            options.intra_op_num_threads = self.num_threads
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        return onnxruntime.InferenceSession(onnx_path, options, providers=["CPUExecutionProvider"])
+
+    def _logits(self, encoded):
+        if self.backend == "onnx":
+            inputs = {node.name: encoded[node.name].numpy() for node in self.session.get_inputs()}
+            return self.session.run(["logits"], inputs)[0]
+        with self._torch.no_grad():
+            return self.model(**encoded).logits.numpy()
+
+    def predict(self, texts):
+        """
+        메시지 목록의 감정 라벨을 입력 순서대로 반환합니다.
+        토큰 길이별로 묶은 배치 단위로 추론하므로 짧은 메시지가 긴 메시지 길이만큼 패딩되지 않습니다.
+        """
+        if not texts:
+            return []
+
+        encodings = self.tokenizer(list(texts), truncation=True, max_length=self.max_length)
+        input_features = [
+            {name: encodings[name][i] for name in encodings.keys()}
+            for i in range(len(texts))
+        ]
+        lengths = [len(ids) for ids in encodings["input_ids"]]
+
+        predicted_classes = np.empty(len(texts), dtype=np.int64)
+        for batch in length_bucketed_batches(lengths, self.token_budget):
+            encoded = self.tokenizer.pad([input_features[i] for i in batch], return_tensors='pt')
+            predicted_classes[batch] = np.argmax(self._logits(encoded), axis=-1)
+        return [LABELS[predicted_class] for predicted_class in predicted_classes]
+
+    def throughput(self, texts):
+        """predict를 한 번 실행하고 (라벨 목록, 초당 메시지 수)를 반환합니다."""
+        start_time = time.perf_counter()
+        sentiments = self.predict(texts)
+        elapsed = time.perf_counter() - start_time
+        return sentiments, len(texts) / elapsed if elapsed > 0 else float("inf")
+
+
+# 프로세스 전체에서 공유하는 엔진 (처음 사용할 때 로드)
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_sentiment_engine():
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = SentimentEngine()
+    return _engine
@@ -0,0 +1,136 @@
+import os
+import time
+import random
+import asyncio
+import logging
+
+import aiohttp
+
+from candle_decoder import json_loads
+
+# Upbit 시세 조회 API 설정
+UPBIT_API_URL = os.getenv("UPBIT_API_URL", "https://api.upbit.com")  # 목 서버로 바꿔 검증할 수 있도록 환경 변수로 둠
+UPBIT_RATE_LIMIT = float(os.getenv("UPBIT_RATE_LIMIT", 10))  # 시세 조회 REST API 초당 요청 수 제한
+UPBIT_CONCURRENCY = int(os.getenv("UPBIT_CONCURRENCY", 10))  # 동시에 진행할 요청 수
+UPBIT_MAX_RETRIES = int(os.getenv("UPBIT_MAX_RETRIES", 5))  # 429/5xx 응답 재시도 횟수
+UPBIT_BACKOFF_BASE = 0.5  # 재시도 대기 시간 기준(초), 시도마다 두 배
+UPBIT_TIMEOUT = 10  # 요청 타임아웃(초)
+
+
+class TokenBucket:
+    """
+    초당 rate개의 토큰이 채워지고 최대 capacity개까지 모이는 토큰 버킷.
+    요청 전에 acquire()로 토큰을 하나 받으며, 토큰이 없으면 다음 토큰이 찰 때까지 기다립니다.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self):
+        # 대기 순서를 지키기 위해 토큰을 받을 때까지 잠금을 유지
+        async with self._lock:
+            self._refill()
+            if self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+
+    def drain(self):
+        """서버가 한도를 알려 오면(429) 모아 둔 토큰을 비워 곧바로 몰리지 않게 합니다."""
+        self.tokens = min(self.tokens, 0)
+        self.updated_at = time.monotonic()
+
+
+class UpbitClient:
+    """
+    하나의 aiohttp 세션(keep-alive)을 재사용하며, 토큰 버킷과 세마포어로 요청 속도와 동시성을 제한하는 Upbit 클라이언트.
+
+    사용 예:
+        async with UpbitClient() as client:
+            candles = await client.get_candles("KRW-BTC", count=10)
+    """
+
+    def __init__(self, base_url=UPBIT_API_URL, rate_limit=UPBIT_RATE_LIMIT, concurrency=UPBIT_CONCURRENCY,
+                 max_retries=UPBIT_MAX_RETRIES):
+        self.base_url = base_url.rstrip("/")
+        # 버킷 크기를 1로 두어 요청을 1/rate 간격으로 고르게 보냄 (몰아서 보내면 1초 구간 한도를 넘길 수 있음)
+        self.bucket = TokenBucket(rate_limit, capacity=1)
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.session = None
+        self.requests = 0
+        self.retries = 0
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit=self.concurrency, keepalive_timeout=60)
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=UPBIT_TIMEOUT),
+            headers={"accept": "application/json"},
+        )
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.session.close()
+
+    async def get_json(self, path, params=None):
+        """
+        GET 요청을 보내고 JSON을 반환합니다. 429와 5xx 응답은 지수 백오프로 재시도합니다.
+
+        Raises:
+            aiohttp.ClientResponseError: 재시도 후에도 실패하거나 그 밖의 오류 응답인 경우
+        """
+        url = f"{self.base_url}{path}"
+        attempt = 0
+        while True:
+            async with self.semaphore:
+                await self.bucket.acquire()
+                self.requests += 1
+                async with self.session.get(url, params=params) as response:
+                    retryable = response.status == 429 or response.status >= 500
+                    if not retryable or attempt >= self.max_retries:
+                        response.raise_for_status()
+                        return json_loads(await response.read())
+                    retry_after = response.headers.get("Retry-After")
+
+            attempt += 1
+            self.retries += 1
+            if response.status == 429:
+                self.bucket.drain()
+            delay = float(retry_after) if retry_after else UPBIT_BACKOFF_BASE * 2 ** (attempt - 1)
+            delay += random.uniform(0, UPBIT_BACKOFF_BASE)  # 동시에 재시도가 몰리지 않도록 지터 추가
+            logging.warning(f"Upbit {path} returned {response.status}, retrying in {delay:.2f}s ({attempt}/{self.max_retries})")
+            await asyncio.sleep(delay)
+
+    async def get_krw_pairs(self):
+        """KRW 마켓 목록 [(market, korean_name), ...]"""
+        markets = await self.get_json("/v1/market/all")
+        return [(coin['market'], coin['korean_name']) for coin in markets if coin['market'].startswith('KRW-')]
+
+    async def get_candles(self, market, count=200, to=None, unit=60):
+        """분봉 캔들 목록 (최신순). to는 이 시각 이전의 캔들만 조회"""
+        params = {'market': market, 'count': count}
+        if to:
+            params['to'] = to
+        return await self.get_json(f"/v1/candles/minutes/{unit}", params)
+
+
+async def gather_bounded(coroutines, limit):
+    """코루틴을 최대 limit개씩 동시에 실행하고 입력 순서대로 결과(또는 예외)를 반환합니다."""
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(coroutine):
+        async with semaphore:
+            return await coroutine
+
+    return await asyncio.gather(*(run(coroutine) for coroutine in coroutines), return_exceptions=True)
@@ -0,0 +1,16 @@
+-- 11. 텍스트 해시별 분석 결과 캐시
+-- 텔레그램 채팅에는 같은 문장(ㅋㅋㅋ, 가즈아, 복사된 홍보 글, 봇 공지 등)이 반복되므로
+-- 정규화한 텍스트의 md5 해시마다 형태소/감정 분석 결과를 한 번만 계산해 저장하고 재사용한다.
+CREATE TABLE public.Analysis_Text_Cache (
+    text_hash CHAR(32) PRIMARY KEY, -- 정규화한 reaction_text의 md5
+    nouns TEXT[],
+    adjectives TEXT[],
+    verbs TEXT[],
+    interjections TEXT[],
+    sentiment VARCHAR(10) CHECK (sentiment IN ('positive', 'negative', 'neutral')),
+    created_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+-- 권한: 스케줄러만 조회 및 갱신 가능
+REVOKE ALL ON TABLE Analysis_Text_Cache FROM PUBLIC;
+GRANT SELECT, INSERT, UPDATE, DELETE ON TABLE Analysis_Text_Cache TO data_scheduler;
@@ -0,0 +1,29 @@
+-- 12. 코인 별칭 사전
+-- 커뮤니티 반응에서 코인 언급을 찾을 때 심볼, 한글 이름(Coins) 외에 영문 이름과 은어를 함께 사용한다.
+-- 영문 이름은 메타데이터 수집기가 채우고, 은어(slang)는 운영자가 직접 관리한다.
+CREATE TABLE public.Coin_Aliases (
+    coin_id INT REFERENCES Coins(coin_id) ON DELETE CASCADE,
+    alias VARCHAR(100) NOT NULL,
+    alias_type VARCHAR(10) NOT NULL CHECK (alias_type IN ('english', 'slang')),
+    PRIMARY KEY (coin_id, alias)
+);
+
+-- 권한: 모든 사용자가 조회 가능, 수집기는 영문 이름 삽입 및 갱신 가능
+REVOKE ALL ON TABLE Coin_Aliases FROM PUBLIC;
+GRANT SELECT ON TABLE Coin_Aliases TO PUBLIC;
+GRANT SELECT, INSERT, UPDATE ON TABLE Coin_Aliases TO data_collector;
+
+-- 자주 쓰이는 은어 초기 데이터
+INSERT INTO public.Coin_Aliases (coin_id, alias, alias_type)
+SELECT c.coin_id, a.alias, 'slang'
+FROM public.Coins c
+JOIN (VALUES
+    ('BTC', '비코'),
+    ('BTC', '빗코'),
+    ('ETH', '이더'),
+    ('XRP', '리플'),
+    ('DOGE', '도지'),
+    ('SOL', '솔라나'),
+    ('SHIB', '시바')
+) AS a(symbol, alias) ON a.symbol = c.symbol
+ON CONFLICT DO NOTHING;
@@ -0,0 +1,27 @@
+-- 13. 커뮤니티 반응 삽입 알림
+-- 실시간 분석기(python/realtime_analyzer.py)가 LISTEN하여 새 반응을 짧은 주기로 분석한다.
+-- 문장 단위 트리거이므로 수집기가 배치로 삽입하면 알림도 배치당 한 번만 발생한다.
+-- payload: {"count": 삽입된 행 수, "inserted_at": 삽입 시각(epoch 초)}
+CREATE OR REPLACE FUNCTION public.notify_community_reactions_inserted()
+RETURNS TRIGGER AS $$
+DECLARE
+    inserted_count BIGINT;
+BEGIN
+    SELECT COUNT(*) INTO inserted_count FROM new_rows;
+    -- ON CONFLICT DO NOTHING으로 모두 건너뛴 경우에는 알리지 않음
+    IF inserted_count > 0 THEN
+        PERFORM pg_notify(
+            'community_reactions_inserted',
+            json_build_object('count', inserted_count, 'inserted_at', extract(epoch FROM clock_timestamp()))::text
+        );
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS community_reactions_inserted_notify ON public.Community_Reactions;
+CREATE TRIGGER community_reactions_inserted_notify
+AFTER INSERT ON public.Community_Reactions
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION public.notify_community_reactions_inserted();
@@ -0,0 +1,13 @@
+-- 14. 거래가 없어 캔들이 없는 시간 기록
+-- Upbit는 체결이 없는 시간의 캔들을 만들지 않으므로, 수집기의 빈 구간 계획기(python/ohlcv_gap_planner.py)가
+-- 조회한 뒤에도 비어 있는 시간을 여기에 기록하여 다음 계획에서 다시 요청하지 않는다.
+-- 상장 전 구간도 한 번 조회한 뒤 여기에 기록된다.
+CREATE TABLE public.Coin_OHLCV_Empty_Hours (
+    coin_id INT REFERENCES Coins(coin_id) ON DELETE CASCADE,
+    timestamp TIMESTAMP NOT NULL, -- 캔들이 없는 1시간 버킷 시작 시각
+    PRIMARY KEY (coin_id, timestamp)
+);
+
+-- 권한: 수집기만 조회 및 삽입 가능
+REVOKE ALL ON TABLE Coin_OHLCV_Empty_Hours FROM PUBLIC;
+GRANT SELECT, INSERT ON TABLE Coin_OHLCV_Empty_Hours TO data_collector;
@@ -0,0 +1,15 @@
+-- 15. 스트리밍 수집기의 진행 중인 시간봉
+-- 스트리밍 수집기(python/ohlcv_stream.py)는 진행 중인 시간봉의 스냅샷을 주기적으로 덮어쓰므로 수집기에 UPDATE 권한이 필요하다.
+-- 스냅샷으로만 저장된 시간을 여기에 기록하고, 마감된 봉을 저장하면 지운다.
+-- 수집기가 중간에 멈춰 남은 행은 빈 구간 계획기(python/ohlcv_gap_planner.py)가 빈 시간으로 보고 REST 캔들로 다시 채운다.
+GRANT UPDATE ON TABLE Coin_OHLCV TO data_collector;
+
+CREATE TABLE public.Coin_OHLCV_Open_Bars (
+    coin_id INT REFERENCES Coins(coin_id) ON DELETE CASCADE,
+    timestamp TIMESTAMP NOT NULL, -- 아직 마감되지 않은 1시간 버킷 시작 시각
+    PRIMARY KEY (coin_id, timestamp)
+);
+
+-- 권한: 수집기만 조회, 삽입, 삭제 가능
+REVOKE ALL ON TABLE Coin_OHLCV_Open_Bars FROM PUBLIC;
+GRANT SELECT, INSERT, DELETE ON TABLE Coin_OHLCV_Open_Bars TO data_collector;
@@ -0,0 +1,56 @@
+-- 7. OHLCV 롤업 테이블 (4시간봉, 일봉)
+-- 수집기가 1시간봉을 저장할 때 영향을 받은 버킷만 다시 집계하여 갱신한다.
+-- 버킷은 1970-01-01 00:00 기준 시계 경계(date_bin)에 맞춘다.
+CREATE TABLE public.Coin_OHLCV_4h (
+    coin_id INT REFERENCES Coins(coin_id) ON DELETE CASCADE,
+    timestamp TIMESTAMP NOT NULL, -- 버킷 시작 시각
+    open NUMERIC(20, 8) NOT NULL,
+    high NUMERIC(20, 8) NOT NULL,
+    low NUMERIC(20, 8) NOT NULL,
+    close NUMERIC(20, 8) NOT NULL,
+    volume NUMERIC(20, 8) NOT NULL,
+    PRIMARY KEY (coin_id, timestamp)
+);
+
+CREATE TABLE public.Coin_OHLCV_1d (
+    coin_id INT REFERENCES Coins(coin_id) ON DELETE CASCADE,
+    timestamp TIMESTAMP NOT NULL, -- 버킷 시작 시각
+    open NUMERIC(20, 8) NOT NULL,
+    high NUMERIC(20, 8) NOT NULL,
+    low NUMERIC(20, 8) NOT NULL,
+    close NUMERIC(20, 8) NOT NULL,
+    volume NUMERIC(20, 8) NOT NULL,
+    PRIMARY KEY (coin_id, timestamp)
+);
+
+-- 권한: 모든 사용자가 조회 가능, 수집기는 삽입 및 갱신 가능
+REVOKE ALL ON TABLE Coin_OHLCV_4h, Coin_OHLCV_1d FROM PUBLIC;
+GRANT SELECT ON TABLE Coin_OHLCV_4h, Coin_OHLCV_1d TO PUBLIC;
+GRANT SELECT, INSERT, UPDATE ON TABLE Coin_OHLCV_4h, Coin_OHLCV_1d TO data_collector;
+
+-- 기존 1시간봉 데이터로 롤업 초기 적재
+INSERT INTO public.Coin_OHLCV_4h (coin_id, timestamp, open, high, low, close, volume)
+SELECT
+    coin_id,
+    date_bin('4 hours', timestamp, TIMESTAMP '1970-01-01') AS bucket,
+    (array_agg(open ORDER BY timestamp))[1],
+    MAX(high),
+    MIN(low),
+    (array_agg(close ORDER BY timestamp DESC))[1],
+    SUM(volume)
+FROM public.Coin_OHLCV
+GROUP BY coin_id, bucket
+ON CONFLICT (coin_id, timestamp) DO NOTHING;
+
+INSERT INTO public.Coin_OHLCV_1d (coin_id, timestamp, open, high, low, close, volume)
+SELECT
+    coin_id,
+    date_bin('1 day', timestamp, TIMESTAMP '1970-01-01') AS bucket,
+    (array_agg(open ORDER BY timestamp))[1],
+    MAX(high),
+    MIN(low),
+    (array_agg(close ORDER BY timestamp DESC))[1],
+    SUM(volume)
+FROM public.Coin_OHLCV
+GROUP BY coin_id, bucket
+ON CONFLICT (coin_id, timestamp) DO NOTHING;
@@ -0,0 +1,15 @@
+-- 8. Coins 변경 알림
+-- API 서버의 코인 레지스트리(symbol -> coin_id 캐시)가 LISTEN하여 다시 읽는다.
+CREATE OR REPLACE FUNCTION public.notify_coins_updated()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM pg_notify('coins_updated', TG_OP);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS coins_updated_notify ON public.Coins;
+CREATE TRIGGER coins_updated_notify
+AFTER INSERT OR UPDATE OR DELETE ON public.Coins
+FOR EACH STATEMENT
+EXECUTE FUNCTION public.notify_coins_updated();
@@ -0,0 +1,47 @@
+-- 9. 시간대별 커뮤니티 통계 테이블
+-- 분석기가 배치를 저장할 때 영향을 받은 시간대만 다시 집계하여 갱신한다.
+-- 차트의 한 지점(시간대)을 선택했을 때 반응 수, 감정 분포, 코인 언급량을 한 번의 범위 조회로 제공한다.
+CREATE TABLE public.Community_Stats_Hourly (
+    bucket TIMESTAMP PRIMARY KEY, -- 시간대 시작 시각
+    reaction_count INT NOT NULL DEFAULT 0,
+    positive_count INT NOT NULL DEFAULT 0,
+    neutral_count INT NOT NULL DEFAULT 0,
+    negative_count INT NOT NULL DEFAULT 0
+);
+
+CREATE TABLE public.Community_Coin_Mentions_Hourly (
+    bucket TIMESTAMP NOT NULL, -- 시간대 시작 시각
+    coin_id INT REFERENCES Coins(coin_id) ON DELETE CASCADE,
+    mention_count INT NOT NULL,
+    PRIMARY KEY (bucket, coin_id)
+);
+
+CREATE INDEX idx_community_coin_mentions_hourly_coin_id_bucket ON public.Community_Coin_Mentions_Hourly (coin_id, bucket);
+
+-- 권한: 모든 사용자가 조회 가능, 스케줄러는 삽입 및 갱신 가능
+REVOKE ALL ON TABLE Community_Stats_Hourly, Community_Coin_Mentions_Hourly FROM PUBLIC;
+GRANT SELECT ON TABLE Community_Stats_Hourly, Community_Coin_Mentions_Hourly TO PUBLIC;
+GRANT SELECT, INSERT, UPDATE, DELETE ON TABLE Community_Stats_Hourly, Community_Coin_Mentions_Hourly TO data_scheduler;
+
+-- 기존 데이터로 초기 적재
+INSERT INTO public.Community_Stats_Hourly (bucket, reaction_count, positive_count, neutral_count, negative_count)
+SELECT
+    date_trunc('hour', r.timestamp) AS bucket,
+    COUNT(*),
+    COUNT(*) FILTER (WHERE a.sentiment = 'positive'),
+    COUNT(*) FILTER (WHERE a.sentiment = 'neutral'),
+    COUNT(*) FILTER (WHERE a.sentiment = 'negative')
+FROM public.Community_Reactions r
+LEFT JOIN public.Community_Analysis a
+    ON a.reaction_id = r.reaction_id AND a.timestamp = r.timestamp
+GROUP BY bucket
+ON CONFLICT (bucket) DO NOTHING;
+
+INSERT INTO public.Community_Coin_Mentions_Hourly (bucket, coin_id, mention_count)
+SELECT date_trunc('hour', timestamp) AS bucket, coin_id, COUNT(*)
+FROM public.Community_Analysis_Coins
+GROUP BY bucket, coin_id
+ON CONFLICT (bucket, coin_id) DO NOTHING;
+
+-- 시간대 범위로 언급량을 다시 집계할 때 사용
+CREATE INDEX idx_community_analysis_coins_timestamp ON public.Community_Analysis_Coins (timestamp);
@@ -0,0 +1,17 @@
+-- 10. 분석 작업별 진행 위치(high-water mark)
+-- 분석기의 각 작업(morphology, sentiment, coin_matching)이 마지막으로 처리한 (timestamp, reaction_id)를 저장한다.
+-- 다음 실행은 이 위치 이후(늦게 들어온 반응을 위한 여유 구간 포함)만 스캔하므로 전체 반응을 다시 읽지 않는다.
+-- 과거 채팅 내보내기를 한꺼번에 적재한 경우 해당 작업의 행을 삭제하면 처음부터 다시 스캔한다.
+CREATE TABLE public.Analyzer_Watermarks (
+    job_name VARCHAR(50) PRIMARY KEY,
+    last_timestamp TIMESTAMP NOT NULL,
+    last_reaction_id UUID NOT NULL,
+    updated_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+-- 진행 위치 이후를 (timestamp, reaction_id) 순서로 읽기 위한 인덱스
+CREATE INDEX idx_community_reactions_timestamp_reaction_id ON public.Community_Reactions (timestamp, reaction_id);
+
+-- 권한: 스케줄러만 조회 및 갱신 가능
+REVOKE ALL ON TABLE Analyzer_Watermarks FROM PUBLIC;
+GRANT SELECT, INSERT, UPDATE, DELETE ON TABLE Analyzer_Watermarks TO data_scheduler;
@@ -1,31 +1,62 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.engine import URL
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.orm import declarative_base
 from dotenv import load_dotenv
 import os
 
 load_dotenv()
 
 DB_HOST = os.getenv("DB_HOST")
-DB_PORT = os.getenv("DB_PORT", 5432)  # 기본 포트 5432
+DB_PORT = int(os.getenv("DB_PORT", 5432))  # 기본 포트 5432
 DB_NAME = os.getenv("DB_NAME")
 
 DB_USERNAME = os.getenv("DB_USERNAME")
 DB_PASSWORD = os.getenv("DB_PASSWORD")
-DATABASE_URL = f"postgresql://{DB_USERNAME}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
-# SQLAlchemy 엔진 생성
-engine = create_engine(DATABASE_URL)
+# 커넥션 풀 설정
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10))  # 상시 유지할 연결 수
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 20))  # 부하 시 추가로 허용할 연결 수
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))  # 연결 대기 최대 시간(초)
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))  # 연결 재생성 주기(초)
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", 100))  # pgbouncer 사용 시 0
+
+DATABASE_URL = URL.create(
+    "postgresql+asyncpg",
+    username=DB_USERNAME,
+    password=DB_PASSWORD,
+    host=DB_HOST,
+    port=DB_PORT,
+    database=DB_NAME,
+    query={"prepared_statement_cache_size": str(DB_STATEMENT_CACHE_SIZE)},
+)
+
+# LISTEN 전용 연결 등 asyncpg를 직접 사용할 때의 접속 정보
+ASYNCPG_CONNECT_ARGS = {
+    "host": DB_HOST,
+    "port": DB_PORT,
+    "database": DB_NAME,
+    "user": DB_USERNAME,
+    "password": DB_PASSWORD,
+}
+
+# SQLAlchemy 비동기 엔진 생성 (asyncpg 드라이버)
+engine = create_async_engine(
+    DATABASE_URL,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING,
+    connect_args={"statement_cache_size": DB_STATEMENT_CACHE_SIZE},
+)
 
 # 세션 로컬 생성
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = async_sessionmaker(bind=engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
 
 Base = declarative_base()
 
 # DB 세션 종속성
-def get_db():
-    print(f"{DATABASE_URL}")
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
\ No newline at end of file
@@ -0,0 +1,67 @@
+import asyncio
+import logging
+
+import asyncpg
+
+from src.database.connection import ASYNCPG_CONNECT_ARGS
+
+# 채널별 콜백 등록 (채널 이름 -> payload를 받는 함수 목록)
+_handlers = {}
+_listener_task = None
+
+
+def register_handler(channel: str, handler):
+    _handlers.setdefault(channel, []).append(handler)
+
+
+def _dispatch(connection, pid, channel, payload):
+    for handler in _handlers.get(channel, []):
+        try:
+            handler(payload)
+        except Exception as e:
+            logging.error(f"Error handling {channel} notification: {e}")
+
+
+async def _listen_forever(health_check_interval: float, reconnect_delay: float):
+    while True:
+        conn = None
+        try:
+            conn = await asyncpg.connect(**ASYNCPG_CONNECT_ARGS)
+            for channel in _handlers:
+                await conn.add_listener(channel, _dispatch)
+            logging.info(f"Listening on channels: {', '.join(_handlers)}")
+
+            # 알림은 콜백으로 전달되므로 연결 상태만 주기적으로 확인
+            while True:
+                await asyncio.sleep(health_check_interval)
+                await conn.execute("SELECT 1;")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logging.error(f"Notification listener error: {e}, reconnecting in {reconnect_delay}s")
+            await asyncio.sleep(reconnect_delay)
+        finally:
+            if conn:
+                await conn.close()
+
+
+def start_listener(health_check_interval: float = 30.0, reconnect_delay: float = 5.0):
+    """등록된 채널을 LISTEN하는 백그라운드 태스크를 시작합니다 (이벤트 루프 안에서 호출)."""
+    global _listener_task
+    if _listener_task is not None or not _handlers:
+        return
+    _listener_task = asyncio.get_running_loop().create_task(
+        _listen_forever(health_check_interval, reconnect_delay)
+    )
+
+
+async def stop_listener():
+    global _listener_task
+    if _listener_task is None:
+        return
+    _listener_task.cancel()
+    try:
+        await _listener_task
+    except asyncio.CancelledError:
+        pass
+    _listener_task = None
@@ -0,0 +1,205 @@
+import os
+import sys
+import time
+import threading
+import logging
+from bisect import bisect_left
+from collections import Counter
+from contextvars import ContextVar
+from datetime import datetime
+from sqlalchemy import event
+
+# 느린 요청 프로파일링 설정 (PROFILE_SLOW_REQUESTS_MS를 지정해야 활성화)
+PROFILE_SLOW_REQUESTS_MS = os.getenv("PROFILE_SLOW_REQUESTS_MS")
+PROFILE_SAMPLE_INTERVAL_MS = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", 5))
+PROFILE_OUTPUT_DIR = os.getenv("PROFILE_OUTPUT_DIR", "log/profiles")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 500)
+DB_TIME_BUCKETS = LATENCY_BUCKETS
+RESPONSE_SIZE_BUCKETS = (1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+# 요청 단위 SQL 통계 (엔진 이벤트에서 누적)
+_request_stats = ContextVar("request_stats", default=None)
+
+
+class RequestStats:
+    def __init__(self):
+        self.query_count = 0
+        self.db_time = 0.0
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = {}  # labels -> [버킷별 개수..., +Inf]
+        self.sums = {}
+
+    def observe(self, labels, value):
+        counts = self.counts.setdefault(labels, [0] * (len(self.buckets) + 1))
+        counts[bisect_left(self.buckets, value)] += 1
+        self.sums[labels] = self.sums.get(labels, 0.0) + value
+
+    def render(self, name, help_text, label_names):
+        lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+        for labels, counts in self.counts.items():
+            label_text = ",".join(f'{key}="{value}"' for key, value in zip(label_names, labels))
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{label_text},le="{bound}"}} {cumulative}')
+            cumulative += counts[-1]
+            lines.append(f'{name}_bucket{{{label_text},le="+Inf"}} {cumulative}')
+            lines.append(f"{name}_sum{{{label_text}}} {self.sums[labels]}")
+            lines.append(f"{name}_count{{{label_text}}} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """라우트별 지연 시간, SQL 실행 수, DB 시간, 응답 크기를 Prometheus 히스토그램으로 보관합니다."""
+
+    LABELS = ("method", "route", "status")
+
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.query_count = Histogram(QUERY_COUNT_BUCKETS)
+        self.db_time = Histogram(DB_TIME_BUCKETS)
+        self.response_size = Histogram(RESPONSE_SIZE_BUCKETS)
+        self._lock = threading.Lock()
+
+    def observe(self, labels, latency, stats: RequestStats, response_size):
+        with self._lock:
+            self.latency.observe(labels, latency)
+            self.query_count.observe(labels, stats.query_count)
+            self.db_time.observe(labels, stats.db_time)
+            self.response_size.observe(labels, response_size)
+
+    def render(self) -> str:
+        with self._lock:
+            lines = []
+            lines += self.latency.render("http_request_duration_seconds", "Request latency in seconds.", self.LABELS)
+            lines += self.query_count.render("http_request_db_statements", "SQL statements executed per request.", self.LABELS)
+            lines += self.db_time.render("http_request_db_seconds", "Time spent in SQL statements per request.", self.LABELS)
+            lines += self.response_size.render("http_response_size_bytes", "Response body size in bytes.", self.LABELS)
+        return "\n".join(lines) + "\n"
+
+
+metrics_registry = MetricsRegistry()
+
+
+def instrument_engine(engine):
+    """SQLAlchemy 엔진 이벤트로 요청별 SQL 실행 수와 실행 시간을 누적합니다."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.query_count += 1
+            stats.db_time += elapsed
+
+
+class StackSampler:
+    """
+    지정한 스레드의 호출 스택을 주기적으로 샘플링하여 flame graph용 folded stack 형식으로 모읍니다.
+    비동기 요청은 같은 이벤트 루프 스레드를 공유하므로 동시 요청의 스택이 함께 섞일 수 있습니다.
+    """
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def dump(self, path: str):
+        with open(path, "w") as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class MetricsMiddleware:
+    """
+    요청별 지연 시간, SQL 실행 수와 DB 시간, 응답 크기를 기록하는 ASGI 미들웨어.
+    PROFILE_SLOW_REQUESTS_MS가 지정되면 그보다 느린 요청의 스택 프로파일을 PROFILE_OUTPUT_DIR에 남깁니다.
+    """
+
+    def __init__(self, app, registry: MetricsRegistry = metrics_registry):
+        self.app = app
+        self.registry = registry
+        self.profile_threshold = float(PROFILE_SLOW_REQUESTS_MS) / 1000 if PROFILE_SLOW_REQUESTS_MS else None
+        if self.profile_threshold is not None:
+            os.makedirs(PROFILE_OUTPUT_DIR, exist_ok=True)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        status = {"code": 500}
+        response_size = 0
+
+        async def send_wrapper(message):
+            nonlocal response_size
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            elif message["type"] == "http.response.body":
+                response_size += len(message.get("body", b""))
+            await send(message)
+
+        sampler = None
+        if self.profile_threshold is not None:
+            sampler = StackSampler(threading.get_ident(), PROFILE_SAMPLE_INTERVAL_MS / 1000)
+            sampler.start()
+
+        start_time = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            latency = time.perf_counter() - start_time
+            _request_stats.reset(token)
+
+            # 라우팅 후 scope에 기록된 경로 템플릿 사용 (경로 파라미터로 라벨이 늘어나지 않도록)
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            labels = (scope["method"], route_path, str(status["code"]))
+            self.registry.observe(labels, latency, stats, response_size)
+
+            if sampler is not None:
+                sampler.stop()
+                if latency >= self.profile_threshold:
+                    self._dump_profile(sampler, route_path, latency, stats)
+
+    def _dump_profile(self, sampler: StackSampler, route_path: str, latency: float, stats: RequestStats):
+        name = route_path.strip("/").replace("/", "_").replace("{", "").replace("}", "") or "root"
+        path = os.path.join(PROFILE_OUTPUT_DIR, f"{datetime.now():%Y%m%d_%H%M%S_%f}_{name}.folded")
+        sampler.dump(path)
+        logging.warning(
+            f"Slow request {route_path}: {latency * 1000:.0f}ms, "
+            f"{stats.query_count} SQL statements ({stats.db_time * 1000:.0f}ms), profile saved to {path}"
+        )
@@ -35,6 +35,29 @@ class CoinOHLCV(Base):
     close = Column(Numeric(20, 8), nullable=False)
     volume = Column(Numeric(20, 8), nullable=False)
 
+# 2-1. OHLCV 롤업 테이블 (4시간봉, 일봉)
+class CoinOHLCV4h(Base):
+    __tablename__ = 'coin_ohlcv_4h'
+
+    coin_id = Column(Integer, ForeignKey('coins.coin_id', ondelete='CASCADE'), primary_key=True)
+    timestamp = Column(TIMESTAMP, primary_key=True)
+    open = Column(Numeric(20, 8), nullable=False)
+    high = Column(Numeric(20, 8), nullable=False)
+    low = Column(Numeric(20, 8), nullable=False)
+    close = Column(Numeric(20, 8), nullable=False)
+    volume = Column(Numeric(20, 8), nullable=False)
+
+class CoinOHLCV1d(Base):
+    __tablename__ = 'coin_ohlcv_1d'
+
+    coin_id = Column(Integer, ForeignKey('coins.coin_id', ondelete='CASCADE'), primary_key=True)
+    timestamp = Column(TIMESTAMP, primary_key=True)
+    open = Column(Numeric(20, 8), nullable=False)
+    high = Column(Numeric(20, 8), nullable=False)
+    low = Column(Numeric(20, 8), nullable=False)
+    close = Column(Numeric(20, 8), nullable=False)
+    volume = Column(Numeric(20, 8), nullable=False)
+
 # 3. 커뮤니티 반응 테이블
 class CommunityReaction(Base):
     __tablename__ = 'community_reactions'
@@ -67,6 +90,23 @@ class CommunityAnalysis(Base):
         ),
     )
 
+# 4-3. 시간대별 커뮤니티 통계 테이블
+class CommunityStatsHourly(Base):
+    __tablename__ = 'community_stats_hourly'
+
+    bucket = Column(TIMESTAMP, primary_key=True)
+    reaction_count = Column(Integer, nullable=False, default=0)
+    positive_count = Column(Integer, nullable=False, default=0)
+    neutral_count = Column(Integer, nullable=False, default=0)
+    negative_count = Column(Integer, nullable=False, default=0)
+
+class CommunityCoinMentionsHourly(Base):
+    __tablename__ = 'community_coin_mentions_hourly'
+
+    bucket = Column(TIMESTAMP, primary_key=True)
+    coin_id = Column(Integer, ForeignKey('coins.coin_id', ondelete='CASCADE'), primary_key=True)
+    mention_count = Column(Integer, nullable=False)
+
 # # 4-2. 커뮤니티 분석과 코인 관계를 연결하는 교차 테이블
 # class CommunityAnalysisCoins(Base):
 #     __tablename__ = 'Community_Analysis_Coins'
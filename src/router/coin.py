@@ -1,17 +1,36 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response
+import orjson
+from sqlalchemy.ext.asyncio import AsyncSession
 from src.service.coin import get_all_coins, get_coin_by_id
+from src.router.http_cache import response_cache
 from src.database.connection import get_db
 
 router = APIRouter(prefix="/coins", tags=["Coins"])
 
+# Coins 테이블 변경 알림을 받으면 캐시된 응답 무효화
+def invalidate_coin_responses(payload: str = None):
+    response_cache.invalidate_tag("coins")
+
+def to_json_response(content) -> Response:
+    return Response(content=orjson.dumps(jsonable_encoder(content)), media_type="application/json")
+
 @router.get("/")
-def list_coins(db: Session = Depends(get_db)):
-    return get_all_coins(db)
+async def list_coins(request: Request, db: AsyncSession = Depends(get_db)):
+    async def build():
+        return to_json_response(await get_all_coins(db))
+
+    return await response_cache.respond(request, key=("coins",), build=build, closed=False, tags=("coins",))
 
 @router.get("/{symbol}")
-def retrieve_coin(symbol: str, db: Session = Depends(get_db)):
-    coin = get_coin_by_id(db, symbol)
-    if not coin:
-        raise HTTPException(status_code=404, detail="Coin not found")
-    return coin
+async def retrieve_coin(symbol: str, request: Request, db: AsyncSession = Depends(get_db)):
+    async def build():
+        coin = await get_coin_by_id(db, symbol)
+        if not coin:
+            raise HTTPException(status_code=404, detail="Coin not found")
+        return to_json_response(coin)
+
+    return await response_cache.respond(
+        request, key=("coins", symbol.upper()), build=build, closed=False, tags=("coins",)
+    )
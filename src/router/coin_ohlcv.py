@@ -1,44 +1,116 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from datetime import datetime
-from sqlalchemy.orm import Session
-from src.service.coin_ohlcv import get_ohlcv_data_by_coin
-from src.service.coin_ohlcv import get_ohlcv_data_by_interval
+import json
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.service.coin_ohlcv import get_ohlcv_columns_by_coin
+from src.service.coin_ohlcv import get_ohlcv_columns_by_interval
+from src.service.coin_registry import coin_registry
+from src.service.ohlcv_resampler import parse_interval
+from src.router.ohlcv_format import negotiate_format, render_ohlcv
+from src.router.http_cache import response_cache, is_closed_window
 from src.database.connection import get_db
 
 router = APIRouter(prefix="/ohlcv", tags=["Coin OHLCV"])
 
+# 수집기 NOTIFY를 받으면 해당 코인의 캐시된 응답 무효화
+def invalidate_ohlcv_responses(payload: str):
+    try:
+        symbol = coin_registry.symbol_of(int(json.loads(payload)["coin_id"]))
+    except (ValueError, KeyError, TypeError):
+        symbol = None
+    if symbol:
+        response_cache.invalidate_tag(("ohlcv", symbol))
+    else:
+        response_cache.invalidate_tag("ohlcv")
+
+async def respond_ohlcv_by_interval(request: Request, db: AsyncSession, symbol: str, interval, start_date, end_date, format):
+    output_format = negotiate_format(request, format)
+    try:
+        interval_seconds = parse_interval(interval)
+    except ValueError:
+        interval_seconds = None  # 서비스에서 400 응답
+
+    async def build():
+        columns = await get_ohlcv_columns_by_interval(db, symbol, start_date, end_date, interval)
+        return render_ohlcv(columns, output_format)
+
+    symbol = symbol.upper()
+    return await response_cache.respond(
+        request,
+        key=("ohlcv", interval_seconds or interval, symbol, start_date, end_date, output_format),
+        build=build,
+        closed=interval_seconds is not None and is_closed_window(end_date, interval_seconds),
+        tags=("ohlcv", ("ohlcv", symbol)),
+    )
+
 @router.get("/{symbol}")
-def retrieve_ohlcv_data(symbol: str, db: Session = Depends(get_db)):
-    ohlcv_data = get_ohlcv_data_by_coin(db, symbol)
-    if not ohlcv_data:
-        raise HTTPException(status_code=404, detail="No OHLCV data found for this coin")
-    return ohlcv_data
+async def retrieve_ohlcv_data(
+    symbol: str,
+    request: Request,
+    format: str = Query(None),
+    db: AsyncSession = Depends(get_db)
+):
+    output_format = negotiate_format(request, format)
+
+    async def build():
+        ohlcv_data = await get_ohlcv_columns_by_coin(db, symbol)
+        if ohlcv_data["timestamp"].size == 0:
+            raise HTTPException(status_code=404, detail="No OHLCV data found for this coin")
+        return render_ohlcv(ohlcv_data, output_format)
+
+    symbol = symbol.upper()
+    return await response_cache.respond(
+        request,
+        key=("ohlcv", "all", symbol, output_format),
+        build=build,
+        closed=False,
+        tags=("ohlcv", ("ohlcv", symbol)),
+    )
 
 @router.get("/1h/{symbol}")
-def retrieve_1h_ohlcv_data(
+async def retrieve_1h_ohlcv_data(
     symbol: str,
+    request: Request,
     start_date: datetime = Query(None),
     end_date: datetime = Query(None),
-    db: Session = Depends(get_db)
+    format: str = Query(None),
+    db: AsyncSession = Depends(get_db)
 ):
-    return get_ohlcv_data_by_interval(db, symbol, start_date, end_date, 1)
+    return await respond_ohlcv_by_interval(request, db, symbol, 1, start_date, end_date, format)
 
 # 4시간 간격
 @router.get("/4h/{symbol}")
-def retrieve_4h_ohlcv_data(
+async def retrieve_4h_ohlcv_data(
     symbol: str,
+    request: Request,
     start_date: datetime = Query(None),
     end_date: datetime = Query(None),
-    db: Session = Depends(get_db)
+    format: str = Query(None),
+    db: AsyncSession = Depends(get_db)
 ):
-    return get_ohlcv_data_by_interval(db, symbol, start_date, end_date, 4)
+    return await respond_ohlcv_by_interval(request, db, symbol, 4, start_date, end_date, format)
 
 # 24시간 간격
 @router.get("/24h/{symbol}")
-def retrieve_24h_ohlcv_data(
+async def retrieve_24h_ohlcv_data(
+    symbol: str,
+    request: Request,
+    start_date: datetime = Query(None),
+    end_date: datetime = Query(None),
+    format: str = Query(None),
+    db: AsyncSession = Depends(get_db)
+):
+    return await respond_ohlcv_by_interval(request, db, symbol, 24, start_date, end_date, format)
+
+# 임의 간격 (예: 2h, 6h, 12h, 1d, 1w)
+@router.get("/{interval}/{symbol}")
+async def retrieve_ohlcv_data_by_interval(
+    interval: str,
     symbol: str,
+    request: Request,
     start_date: datetime = Query(None),
     end_date: datetime = Query(None),
-    db: Session = Depends(get_db)
+    format: str = Query(None),
+    db: AsyncSession = Depends(get_db)
 ):
-    return get_ohlcv_data_by_interval(db, symbol, start_date, end_date, 24)
\ No newline at end of file
+    return await respond_ohlcv_by_interval(request, db, symbol, interval, start_date, end_date, format)
@@ -1,16 +1,35 @@
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Query, Response
+from fastapi.responses import StreamingResponse
 from datetime import datetime
-from sqlalchemy.orm import Session
-from src.service.community import get_community_data_by_interval
+import orjson
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.service.community import (
+    DEFAULT_PAGE_SIZE, get_community_data_by_interval, stream_community_data_by_interval
+)
 from src.database.connection import get_db
 
 router = APIRouter(prefix="/community", tags=["community"])
 
 @router.get("/")
-def get_community_data(
+async def get_community_data(
     start_date: datetime = Query(None),
     end_date: datetime = Query(None),
-    db: Session = Depends(get_db)
+    cursor: str = Query(None),
+    limit: int = Query(None, ge=1, le=10000),
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+    db: AsyncSession = Depends(get_db)
 ):
-    return get_community_data_by_interval(db, start_date, end_date)
\ No newline at end of file
+    # NDJSON 스트리밍: 커서 이후 구간 전체를 행 단위로 바로 전송
+    if format == "ndjson":
+        return StreamingResponse(
+            stream_community_data_by_interval(start_date, end_date, cursor),
+            media_type="application/x-ndjson"
+        )
+
+    # 페이지 조회는 limit이나 cursor를 준 경우에만 (다음 페이지 커서는 X-Next-Cursor 헤더로 전달)
+    # 둘 다 없으면 기존처럼 범위 전체를 반환
+    if cursor is not None and limit is None:
+        limit = DEFAULT_PAGE_SIZE
+    data, next_cursor = await get_community_data_by_interval(db, start_date, end_date, cursor, limit)
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+    return Response(content=orjson.dumps(data), media_type="application/json", headers=headers)
@@ -0,0 +1,117 @@
+import os
+import time
+import hashlib
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from fastapi import Request
+from fastapi.responses import Response
+from src.service.ohlcv_resampler import now_kst
+
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", 1024))
+RESPONSE_CACHE_OPEN_TTL = int(os.getenv("RESPONSE_CACHE_OPEN_TTL", 60))  # 현재 시간대를 포함하는 응답 보관 시간(초)
+RESPONSE_CACHE_CLOSED_TTL = int(os.getenv("RESPONSE_CACHE_CLOSED_TTL", 86400))  # 마감된 구간 응답 보관 시간(초, 서버 캐시는 NOTIFY로 무효화됨)
+RESPONSE_CACHE_CLOSED_MAX_AGE = int(os.getenv("RESPONSE_CACHE_CLOSED_MAX_AGE", 600))  # 마감된 구간 응답을 클라이언트와 CDN이 다시 확인 없이 쓰는 시간(초)
+OHLCV_COLLECTION_CYCLE = int(os.getenv("OHLCV_COLLECTION_CYCLE", 3600))  # 수집기 실행 주기(초). 끝난 시간봉도 이만큼 지나야 적재됨
+
+# 빈 구간 계획기의 백필이나 스트림의 늦은 체결로 마감된 시간봉도 다시 쓰일 수 있으므로 immutable로 두지 않음
+# 클라이언트와 CDN에는 NOTIFY 무효화가 닿지 않으므로 보관 시간을 제한하고 만료 후에는 ETag로 다시 확인
+CLOSED_CACHE_CONTROL = f"public, max-age={RESPONSE_CACHE_CLOSED_MAX_AGE}, must-revalidate"
+# 아직 적재 중일 수 있는 응답은 짧게 보관
+OPEN_CACHE_CONTROL = f"public, max-age={RESPONSE_CACHE_OPEN_TTL}, must-revalidate"
+
+
+def is_closed_window(end_date: datetime, bucket_seconds: int = 3600) -> bool:
+    """
+    end_date가 속한 마지막 버킷이 끝나고 수집 주기 한 번이 지났으면 True (백필이 없으면 더 바뀌지 않음)
+    수집기는 끝난 시간봉을 다음 실행(매시 1분 이후)에 채우므로, 버킷이 끝난 직후의 응답은 아직 비어 있을 수 있습니다.
+    """
+    if end_date is None:
+        return False
+    bucket_end = end_date + timedelta(seconds=bucket_seconds)
+    return bucket_end + timedelta(seconds=OHLCV_COLLECTION_CYCLE) <= now_kst()
+
+
+class CachedResponse:
+    def __init__(self, body: bytes, media_type: str, closed: bool, tags):
+        self.body = body
+        self.media_type = media_type
+        self.closed = closed
+        self.tags = frozenset(tags)
+        self.etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+        self.last_modified = datetime.now(timezone.utc).replace(microsecond=0)
+        self.expires_at = time.monotonic() + (RESPONSE_CACHE_CLOSED_TTL if closed else RESPONSE_CACHE_OPEN_TTL)
+
+    def headers(self):
+        return {
+            "ETag": self.etag,
+            "Last-Modified": format_datetime(self.last_modified, usegmt=True),
+            "Cache-Control": CLOSED_CACHE_CONTROL if self.closed else OPEN_CACHE_CONTROL,
+        }
+
+    def is_not_modified(self, request: Request) -> bool:
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+            return "*" in tags or self.etag in tags
+
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since:
+            try:
+                return self.last_modified <= parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def to_response(self, request: Request) -> Response:
+        if self.is_not_modified(request):
+            return Response(status_code=304, headers=self.headers())
+        return Response(content=self.body, media_type=self.media_type, headers=self.headers())
+
+
+class ResponseCache:
+    """
+    (라우트, 심볼, 구간, 형식) 등을 키로 직렬화된 응답 본문을 보관하는 LRU 캐시.
+    적중하면 DB 조회와 JSON 인코딩을 모두 건너뜁니다. 태그 단위로 무효화할 수 있습니다.
+    """
+
+    def __init__(self, max_entries: int = RESPONSE_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() > entry.expires_at:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key, response: Response, closed: bool, tags=()):
+        entry = CachedResponse(response.body, response.media_type, closed, tags)
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+    def invalidate_tag(self, tag):
+        for key in [key for key, entry in self._entries.items() if tag in entry.tags]:
+            del self._entries[key]
+
+    async def respond(self, request: Request, key, build, closed: bool, tags=()):
+        """
+        캐시된 응답이 있으면 그대로(또는 304로) 반환하고, 없으면 build()로 만든 응답을 저장 후 반환합니다.
+
+        Args:
+            build: Response를 반환하는 async 함수 (예외는 캐시하지 않음)
+        """
+        entry = self.get(key)
+        if entry is None:
+            entry = self.put(key, await build(), closed, tags)
+        return entry.to_response(request)
+
+
+response_cache = ResponseCache()
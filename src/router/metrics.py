@@ -0,0 +1,10 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from src.middleware.metrics import metrics_registry
+
+router = APIRouter(tags=["Metrics"])
+
+# Prometheus 텍스트 형식
+@router.get("/metrics", response_class=PlainTextResponse)
+async def retrieve_metrics():
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
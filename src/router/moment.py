@@ -0,0 +1,39 @@
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import Response
+from datetime import datetime
+import orjson
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.service.moment import get_moment_data
+from src.router.http_cache import response_cache
+from src.database.connection import get_db
+
+router = APIRouter(prefix="/moment", tags=["Moment"])
+
+# 분석기가 통계를 갱신하면 알림을 보내는 채널
+COMMUNITY_STATS_NOTIFY_CHANNEL = "community_stats_updated"
+
+def invalidate_moment_responses(payload: str = None):
+    response_cache.invalidate_tag("moment")
+
+@router.get("/{symbol}")
+async def retrieve_moment_data(
+    symbol: str,
+    request: Request,
+    start_date: datetime = Query(None),
+    end_date: datetime = Query(None),
+    interval: str = Query("1h"),
+    db: AsyncSession = Depends(get_db)
+):
+    async def build():
+        moments = await get_moment_data(db, symbol, start_date, end_date, interval)
+        return Response(content=orjson.dumps(moments), media_type="application/json")
+
+    symbol = symbol.upper()
+    # 분석이 뒤늦게 반영될 수 있으므로 마감된 구간도 짧게만 캐시
+    return await response_cache.respond(
+        request,
+        key=("moment", interval, symbol, start_date, end_date),
+        build=build,
+        closed=False,
+        tags=("moment", "ohlcv", ("ohlcv", symbol)),
+    )
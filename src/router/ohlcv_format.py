@@ -0,0 +1,58 @@
+import orjson
+from fastapi import HTTPException, Request
+from fastapi.responses import Response
+from src.service.ohlcv_resampler import COLUMNS, columns_to_records
+
+# pyarrow는 선택 의존성 (Arrow IPC 응답에만 필요)
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+OHLCV_FORMATS = ("json", "columnar", "arrow")
+
+
+def negotiate_format(request: Request, format: str = None) -> str:
+    """
+    응답 형식을 결정합니다. format 쿼리 파라미터가 우선이며,
+    없으면 Accept 헤더에 Arrow 스트림이 있을 때 arrow, 그 외에는 json입니다.
+    """
+    if format:
+        format = format.lower()
+        if format not in OHLCV_FORMATS:
+            raise HTTPException(status_code=400, detail=f"Invalid format. Supported values: {', '.join(OHLCV_FORMATS)}")
+        return format
+    if ARROW_STREAM_MEDIA_TYPE in request.headers.get("accept", ""):
+        return "arrow"
+    return "json"
+
+
+def columns_to_arrow_ipc(columns) -> bytes:
+    if pa is None:
+        raise HTTPException(status_code=406, detail="Arrow output is not available on this server")
+    table = pa.table({
+        "timestamp": pa.array(columns["timestamp"], type=pa.timestamp("s")),
+        **{name: pa.array(columns[name], type=pa.float64()) for name in COLUMNS[1:]},
+    })
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def render_ohlcv(columns, output_format: str) -> Response:
+    """
+    OHLCV 컬럼 배열을 요청한 형식으로 직렬화합니다.
+
+    - json: 기존과 같은 캔들 객체 리스트 (FastAPI 기본 인코더 대신 orjson 사용)
+    - columnar: 컬럼별 병렬 배열 (timestamp는 epoch 초 정수, 가격은 float)
+    - arrow: Arrow IPC 스트림
+    """
+    if output_format == "arrow":
+        return Response(content=columns_to_arrow_ipc(columns), media_type=ARROW_STREAM_MEDIA_TYPE)
+    if output_format == "columnar":
+        content = orjson.dumps({name: columns[name] for name in COLUMNS}, option=orjson.OPT_SERIALIZE_NUMPY)
+    else:
+        content = orjson.dumps(columns_to_records(columns))
+    return Response(content=content, media_type="application/json")
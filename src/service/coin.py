@@ -1,9 +1,8 @@
-from sqlalchemy.orm import Session
-from src.model.models import Coin
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.service.coin_registry import coin_registry
 
-def get_all_coins(db: Session):
-    return db.query(Coin).all()
+async def get_all_coins(db: AsyncSession):
+    return await coin_registry.all(db)
 
-def get_coin_by_id(db: Session, symbol: str):
-    symbol = symbol.upper()
-    return db.query(Coin).filter(Coin.symbol == symbol).first()
+async def get_coin_by_id(db: AsyncSession, symbol: str):
+    return await coin_registry.get(db, symbol)
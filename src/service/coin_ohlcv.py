@@ -1,100 +1,115 @@
-from sqlalchemy.orm import Session
-from src.model.models import CoinOHLCV, Coin
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.model.models import CoinOHLCV, CoinOHLCV4h, CoinOHLCV1d
+from src.service.ohlcv_resampler import (
+    HOUR, DAY, parse_interval, floor_timestamp, rows_to_columns, resample, columns_to_records, now_kst
+)
+from src.service.ohlcv_cache import ohlcv_cache
+from src.service.coin_registry import coin_registry
 from fastapi import HTTPException
 from datetime import datetime, timedelta
 
-def get_ohlcv_data_by_coin(db: Session, symbol: str):
-    coin = db.query(Coin).filter(Coin.symbol == symbol.upper()).first()
-    return db.query(CoinOHLCV).filter(CoinOHLCV.coin_id == coin.coin_id).all()
+# 원천 테이블 목록 (큰 단위 우선). 요청 간격을 나누어떨어지게 하는 가장 큰 롤업을 사용
+OHLCV_SOURCES = [
+    (DAY, CoinOHLCV1d),
+    (4 * HOUR, CoinOHLCV4h),
+    (HOUR, CoinOHLCV),
+]
 
-def get_ohlcv_data_by_interval(db: Session, symbol: str, start_date: datetime, end_date: datetime, interval: int):
-    # 지원하는 간격 확인
-    if interval not in [1, 4, 24]:
-        raise HTTPException(status_code=400, detail="Invalid interval. Supported values: 1, 4, 24")
+def select_ohlcv_source(interval_seconds: int):
+    for source_seconds, model in OHLCV_SOURCES:
+        if interval_seconds % source_seconds == 0:
+            return model
+    return CoinOHLCV
 
-    # 심볼로 코인 정보 가져오기
-    coin = db.query(Coin).filter(Coin.symbol == symbol.upper()).first()
+# 1시간봉 원본 조회 (핫 캐시 적재용)
+async def load_hourly_rows(db: AsyncSession, coin_id: int, start_date: datetime, end_date: datetime = None):
+    query = select(
+        CoinOHLCV.timestamp,
+        CoinOHLCV.open,
+        CoinOHLCV.high,
+        CoinOHLCV.low,
+        CoinOHLCV.close,
+        CoinOHLCV.volume
+    ).where(
+        CoinOHLCV.coin_id == coin_id,
+        CoinOHLCV.timestamp >= start_date,
+    )
+    if end_date is not None:
+        query = query.where(CoinOHLCV.timestamp <= end_date)
+    result = await db.execute(query.order_by(CoinOHLCV.timestamp))
+    return result.all()
+
+async def get_coin_or_404(db: AsyncSession, symbol: str):
+    coin = await coin_registry.get(db, symbol)
     if not coin:
         raise HTTPException(status_code=404, detail="Coin not found")
+    return coin
+
+async def get_ohlcv_columns_by_coin(db: AsyncSession, symbol: str):
+    coin = await get_coin_or_404(db, symbol)
+    return rows_to_columns(await load_hourly_rows(db, coin.coin_id, datetime(1970, 1, 1)))
 
+async def get_ohlcv_data_by_interval(db: AsyncSession, symbol: str, start_date: datetime, end_date: datetime, interval):
+    return columns_to_records(await get_ohlcv_columns_by_interval(db, symbol, start_date, end_date, interval))
+
+def resolve_interval(interval) -> int:
+    # 지원하는 간격 확인 (1h, 4h, 24h, 1d, 1w 또는 시간 단위 정수)
+    try:
+        return parse_interval(interval)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid interval. Use an hour multiple such as 1h, 4h, 12h, 1d or 1w")
+
+def resolve_ohlcv_range(start_date: datetime, end_date: datetime, interval_seconds: int):
     # 시작일과 종료일 기본값 설정
     if not end_date:
-        end_date = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+        end_date = now_kst().replace(minute=0, second=0, microsecond=0)
     if not start_date:
         start_date = (end_date - timedelta(days=7)).replace(minute=0, second=0, microsecond=0)  # 기본적으로 최근 7일 데이터를 가져옴
 
-    # 기본 데이터 가져오기
-    raw_data = (
-        db.query(
-            CoinOHLCV.timestamp,
-            CoinOHLCV.open,
-            CoinOHLCV.high,
-            CoinOHLCV.low,
-            CoinOHLCV.close,
-            CoinOHLCV.volume
+    # 첫 버킷이 잘리지 않도록 시작 시각을 버킷 경계로 내림
+    return floor_timestamp(start_date, interval_seconds), end_date
+
+async def get_ohlcv_columns_by_interval(db: AsyncSession, symbol: str, start_date: datetime, end_date: datetime, interval, coin=None):
+    interval_seconds = resolve_interval(interval)
+
+    # 심볼로 코인 정보 가져오기 (호출한 쪽에서 이미 조회했으면 그대로 사용)
+    if coin is None:
+        coin = await get_coin_or_404(db, symbol)
+
+    start_date, end_date = resolve_ohlcv_range(start_date, end_date, interval_seconds)
+
+    # 기본 데이터 가져오기 (4h/1d 배수 간격은 롤업 테이블에서 바로 조회)
+    source = select_ohlcv_source(interval_seconds)
+
+    # 최근 구간의 1시간봉은 프로세스 내 핫 캐시에서 제공
+    if source is CoinOHLCV:
+        columns = await ohlcv_cache.get_columns(db, coin.coin_id, start_date, end_date, load_hourly_rows)
+        if columns is not None:
+            if columns["timestamp"].size == 0:
+                raise HTTPException(status_code=404, detail="No OHLCV data found for this coin")
+            return resample(columns, interval_seconds)
+
+    result = await db.execute(
+        select(
+            source.timestamp,
+            source.open,
+            source.high,
+            source.low,
+            source.close,
+            source.volume
         )
-        .filter(
-            CoinOHLCV.coin_id == coin.coin_id,
-            CoinOHLCV.timestamp >= start_date,
-            CoinOHLCV.timestamp <= end_date,
+        .where(
+            source.coin_id == coin.coin_id,
+            source.timestamp >= start_date,
+            source.timestamp <= end_date,
         )
-        .order_by(CoinOHLCV.timestamp)
-        .all()
+        .order_by(source.timestamp)
     )
+    raw_data = result.all()
 
     if not raw_data:
         raise HTTPException(status_code=404, detail="No OHLCV data found for this coin")
 
-    # 데이터를 간격별로 정제
-    grouped_data = []
-    interval_seconds = interval * 3600  # 간격(시간)을 초 단위로 변환
-    current_group = {
-        "open": None,
-        "high": float('-inf'),
-        "low": float('inf'),
-        "close": None,
-        "volume": 0,
-        "timestamp": None,
-    }
-
-    start_of_interval = None
-
-    for row in raw_data:
-        timestamp = row.timestamp 
-        print(timestamp)
-        
-        if not start_of_interval:
-            start_of_interval = timestamp
-
-        # 새 그룹을 시작해야 할 경우
-        if (timestamp - start_of_interval).total_seconds() >= interval_seconds:
-            # 이전 그룹 저장
-            if current_group["open"] is not None:  # 그룹 데이터가 유효할 경우만 추가
-                grouped_data.append(current_group)
-
-            # 새 그룹 초기화
-            start_of_interval = timestamp
-            current_group = {
-                "open": row.open,
-                "high": row.high,
-                "low": row.low,
-                "close": row.close,
-                "volume": row.volume,
-                "timestamp": start_of_interval,
-            }
-        else:
-            # 기존 그룹 데이터 업데이트
-            if current_group["open"] is None:
-                current_group["open"] = row.open
-            current_group["high"] = max(current_group["high"], row.high)
-            current_group["low"] = min(current_group["low"], row.low)
-            current_group["close"] = row.close
-            current_group["volume"] += row.volume
-
-    # 마지막 그룹 저장
-    if current_group["open"] is not None:
-        grouped_data.append(current_group)
-    
-    grouped_data = [group for group in grouped_data if group["timestamp"] is not None]
-    
-    return grouped_data
+    # 컬럼 배열로 변환 후 버킷 단위로 집계
+    return resample(rows_to_columns(raw_data), interval_seconds)
@@ -0,0 +1,65 @@
+import os
+import time
+import asyncio
+import logging
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.model.models import Coin
+
+COIN_REGISTRY_TTL = int(os.getenv("COIN_REGISTRY_TTL", 600))  # NOTIFY 누락 대비 최대 보관 시간(초)
+
+# Coins 테이블 변경 시 트리거가 알림을 보내는 채널
+COINS_NOTIFY_CHANNEL = "coins_updated"
+
+
+class CoinRegistry:
+    """
+    Coins 테이블을 한 번 읽어 symbol -> Coin 사전으로 보관합니다.
+    TTL이 지나거나 coins_updated 알림을 받으면 다음 조회 때 다시 읽습니다.
+    """
+
+    def __init__(self, ttl: int = COIN_REGISTRY_TTL):
+        self.ttl = ttl
+        self.version = 0  # 다시 읽을 때마다 증가 (응답 캐시 키 등에 사용)
+        self._coins = []
+        self._by_symbol = {}
+        self._by_id = {}
+        self._loaded_at = None
+        self._lock = asyncio.Lock()
+
+    def _is_stale(self):
+        return self._loaded_at is None or time.monotonic() - self._loaded_at > self.ttl
+
+    async def ensure_loaded(self, db: AsyncSession):
+        if not self._is_stale():
+            return
+        async with self._lock:
+            if not self._is_stale():
+                return
+            result = await db.execute(select(Coin))
+            coins = result.scalars().all()
+            self._coins = coins
+            self._by_symbol = {coin.symbol: coin for coin in coins}
+            self._by_id = {coin.coin_id: coin for coin in coins}
+            self._loaded_at = time.monotonic()
+            self.version += 1
+            logging.info(f"Loaded {len(coins)} coins into registry (version {self.version}).")
+
+    async def get(self, db: AsyncSession, symbol: str):
+        await self.ensure_loaded(db)
+        return self._by_symbol.get(symbol.upper())
+
+    async def all(self, db: AsyncSession):
+        await self.ensure_loaded(db)
+        return self._coins
+
+    def symbol_of(self, coin_id: int):
+        """이미 읽어 둔 데이터에서 coin_id의 심볼을 찾습니다 (DB 조회 없음)."""
+        coin = self._by_id.get(coin_id)
+        return coin.symbol if coin else None
+
+    def invalidate(self, payload: str = None):
+        self._loaded_at = None
+
+
+coin_registry = CoinRegistry()
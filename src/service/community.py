@@ -1,68 +1,142 @@
+import base64
+import uuid
 from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
+import orjson
+from sqlalchemy import and_, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException
 from src.model.models import CommunityReaction, CommunityAnalysis
+from src.database.connection import SessionLocal
 
-def get_community_data_by_interval(db: Session, start_date: datetime, end_date: datetime):
-    """
-    주어진 시간 범위에 따라 CommunityReaction 데이터를 조회하고
-    각 reaction에 맞는 CommunityAnalysis 데이터를 찾아서 응답합니다.
-    
-    Args:
-        db (Session): SQLAlchemy 세션
-        start_date (datetime): 조회 시작 시간
-        end_date (datetime): 조회 끝나는 시간
+DEFAULT_PAGE_SIZE = 1000
+STREAM_CHUNK_SIZE = 1000
 
-    Returns:
-        list[dict]: 조회된 데이터의 리스트
-    """
+def encode_cursor(timestamp: datetime, reaction_id: uuid.UUID) -> str:
+    """마지막으로 반환한 (timestamp, reaction_id)를 불투명한 커서 토큰으로 인코딩합니다."""
+    raw = orjson.dumps([timestamp.isoformat(), str(reaction_id)])
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+def decode_cursor(cursor: str):
+    try:
+        timestamp, reaction_id = orjson.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return datetime.fromisoformat(timestamp), uuid.UUID(reaction_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="잘못된 커서입니다.")
+
+def resolve_date_range(start_date: datetime, end_date: datetime):
     if end_date is None:
         end_date = datetime.now()
     if start_date is None:
         start_date = end_date - timedelta(days=7)
-    
+
     # 날짜 검증
     if start_date >= end_date:
         raise HTTPException(status_code=400, detail="시작 날짜는 끝나는 날짜보다 이전이어야 합니다.")
-    
-    # CommunityReaction 데이터 조회
-    reactions = (
-        db.query(CommunityReaction)
-        .filter(CommunityReaction.timestamp.between(start_date, end_date))
-        .all()
-    )
-    
-    if not reactions:
-        return []  # 조회된 데이터가 없을 경우 빈 리스트 반환
-    
-    response_data = []
-    for reaction in reactions:
-        # 해당 reaction_id 및 timestamp에 맞는 CommunityAnalysis 조회
-        analysis = (
-            db.query(CommunityAnalysis)
-            .filter(
-                CommunityAnalysis.reaction_id == reaction.reaction_id,
-                CommunityAnalysis.timestamp == reaction.timestamp
+    return start_date, end_date
+
+def build_community_query(start_date: datetime, end_date: datetime, cursor: str = None):
+    """
+    CommunityReaction과 CommunityAnalysis를 한 번의 LEFT OUTER JOIN으로 조회하는 쿼리를 만듭니다.
+    (timestamp, reaction_id) 순으로 정렬하며, 커서가 있으면 그 이후 행부터 조회합니다.
+    """
+    query = (
+        select(
+            CommunityReaction.reaction_id,
+            CommunityReaction.timestamp,
+            CommunityReaction.reaction_text,
+            CommunityReaction.chat_name,
+            CommunityReaction.sender,
+            CommunityReaction.source,
+            CommunityAnalysis.analysis_id,
+            CommunityAnalysis.nouns,
+            CommunityAnalysis.adjectives,
+            CommunityAnalysis.verbs,
+            CommunityAnalysis.interjections,
+            CommunityAnalysis.sentiment,
+        )
+        .outerjoin(
+            CommunityAnalysis,
+            and_(
+                CommunityAnalysis.reaction_id == CommunityReaction.reaction_id,
+                CommunityAnalysis.timestamp == CommunityReaction.timestamp,
             )
-            .first()
         )
-        
-        # 결과 데이터 구성
-        response_data.append({
-            "reaction_id": reaction.reaction_id,
-            "timestamp": reaction.timestamp,
-            "reaction_text": reaction.reaction_text,
-            "chat_name": reaction.chat_name,
-            "sender": reaction.sender,
-            "source": reaction.source,
-            "analysis": {
-                "nouns": analysis.nouns if analysis else None,
-                "adjectives": analysis.adjectives if analysis else None,
-                "verbs": analysis.verbs if analysis else None,
-                "interjections": analysis.interjections if analysis else None,
-                "sentiment": analysis.sentiment if analysis else None
-            } if analysis else None
-        })
-    
-    return response_data
+        .where(CommunityReaction.timestamp.between(start_date, end_date))
+    )
+    if cursor:
+        last_timestamp, last_reaction_id = decode_cursor(cursor)
+        query = query.where(
+            tuple_(CommunityReaction.timestamp, CommunityReaction.reaction_id) > tuple_(last_timestamp, last_reaction_id)
+        )
+    return query.order_by(CommunityReaction.timestamp, CommunityReaction.reaction_id)
+
+def to_response_row(row):
+    # 결과 데이터 구성
+    return {
+        "reaction_id": row.reaction_id,
+        "timestamp": row.timestamp,
+        "reaction_text": row.reaction_text,
+        "chat_name": row.chat_name,
+        "sender": row.sender,
+        "source": row.source,
+        "analysis": {
+            "nouns": row.nouns,
+            "adjectives": row.adjectives,
+            "verbs": row.verbs,
+            "interjections": row.interjections,
+            "sentiment": row.sentiment
+        } if row.analysis_id is not None else None
+    }
+
+async def get_community_data_by_interval(db: AsyncSession, start_date: datetime, end_date: datetime, cursor: str = None, limit: int = None):
+    """
+    주어진 시간 범위의 CommunityReaction과 CommunityAnalysis를 한 페이지 조회합니다.
+
+    Args:
+        db (AsyncSession): SQLAlchemy 비동기 세션
+        start_date (datetime): 조회 시작 시간
+        end_date (datetime): 조회 끝나는 시간
+        cursor (str): 이전 페이지의 next_cursor (첫 페이지는 None)
+        limit (int): 페이지 크기 (None이면 범위 전체를 한 번에 조회)
+
+    Returns:
+        tuple[list[dict], str | None]: 조회된 데이터의 리스트와 다음 페이지 커서
+    """
+    start_date, end_date = resolve_date_range(start_date, end_date)
+
+    query = build_community_query(start_date, end_date, cursor)
+    if limit is None:
+        result = await db.execute(query)
+        return [to_response_row(row) for row in result.all()], None
+
+    # 다음 페이지 존재 여부를 알기 위해 한 행 더 조회
+    result = await db.execute(query.limit(limit + 1))
+    rows = result.all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].timestamp, rows[-1].reaction_id)
+
+    return [to_response_row(row) for row in rows], next_cursor
+
+def stream_community_data_by_interval(start_date: datetime, end_date: datetime, cursor: str = None):
+    """
+    조회 결과를 NDJSON 한 줄씩 생성합니다. 전체 목록을 메모리에 만들지 않고
+    서버 측에서 STREAM_CHUNK_SIZE 단위로 받아 바로 내보냅니다.
+    응답을 보내는 동안 세션이 유지되어야 하므로 요청 세션과 별도로 세션을 엽니다.
+    """
+    start_date, end_date = resolve_date_range(start_date, end_date)
+    query_args = (start_date, end_date, cursor)
+    # 커서 형식 오류는 스트림 시작 전에 400으로 응답
+    if cursor:
+        decode_cursor(cursor)
+
+    async def generate():
+        async with SessionLocal() as db:
+            query = build_community_query(*query_args).execution_options(yield_per=STREAM_CHUNK_SIZE)
+            result = await db.stream(query)
+            async for row in result:
+                yield orjson.dumps(to_response_row(row)) + b"\n"
 
+    return generate()
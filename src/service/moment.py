@@ -0,0 +1,135 @@
+from datetime import datetime, timedelta
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.model.models import CommunityStatsHourly, CommunityCoinMentionsHourly
+from src.service.coin_ohlcv import (
+    get_coin_or_404, get_ohlcv_columns_by_interval, resolve_interval, resolve_ohlcv_range
+)
+from src.service.coin_registry import coin_registry
+from src.service.ohlcv_resampler import bucket_origin
+
+TOP_MENTIONS = 5  # 버킷별로 반환할 상위 언급 코인 수
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _to_epoch(timestamp: datetime) -> int:
+    return int((timestamp - _EPOCH).total_seconds())
+
+
+async def get_community_stats(db: AsyncSession, start_date: datetime, end_date: datetime, interval_seconds: int):
+    """시간대별 통계 테이블을 한 번 범위 조회하여 요청 간격의 버킷으로 합산합니다."""
+    bucket = func.date_bin(
+        timedelta(seconds=interval_seconds), CommunityStatsHourly.bucket, bucket_origin(interval_seconds)
+    ).label("bucket")
+    result = await db.execute(
+        select(
+            bucket,
+            func.sum(CommunityStatsHourly.reaction_count),
+            func.sum(CommunityStatsHourly.positive_count),
+            func.sum(CommunityStatsHourly.neutral_count),
+            func.sum(CommunityStatsHourly.negative_count),
+        )
+        .where(CommunityStatsHourly.bucket.between(start_date, end_date))
+        .group_by(bucket)
+    )
+    return {
+        _to_epoch(row[0]): {
+            "reaction_count": int(row[1]),
+            "sentiment": {"positive": int(row[2]), "neutral": int(row[3]), "negative": int(row[4])},
+        }
+        for row in result.all()
+    }
+
+
+async def get_coin_mentions(db: AsyncSession, start_date: datetime, end_date: datetime, interval_seconds: int):
+    """버킷별 코인 언급량 상위 TOP_MENTIONS개를 조회합니다."""
+    bucket = func.date_bin(
+        timedelta(seconds=interval_seconds), CommunityCoinMentionsHourly.bucket, bucket_origin(interval_seconds)
+    )
+    mentions = (
+        select(
+            bucket.label("bucket"),
+            CommunityCoinMentionsHourly.coin_id,
+            func.sum(CommunityCoinMentionsHourly.mention_count).label("mention_count"),
+        )
+        .where(CommunityCoinMentionsHourly.bucket.between(start_date, end_date))
+        .group_by(bucket, CommunityCoinMentionsHourly.coin_id)
+        .subquery()
+    )
+    rank = func.row_number().over(
+        partition_by=mentions.c.bucket, order_by=mentions.c.mention_count.desc()
+    ).label("rank")
+    ranked = select(mentions, rank).subquery()
+    result = await db.execute(
+        select(ranked.c.bucket, ranked.c.coin_id, ranked.c.mention_count)
+        .where(ranked.c.rank <= TOP_MENTIONS)
+        .order_by(ranked.c.bucket, ranked.c.rank)
+    )
+
+    top_mentions = {}
+    for bucket_start, coin_id, mention_count in result.all():
+        top_mentions.setdefault(_to_epoch(bucket_start), []).append({
+            "symbol": coin_registry.symbol_of(coin_id),
+            "mention_count": int(mention_count),
+        })
+    return top_mentions
+
+
+async def get_own_mentions(db: AsyncSession, coin_id: int, start_date: datetime, end_date: datetime, interval_seconds: int):
+    """요청한 코인의 버킷별 언급량을 조회합니다."""
+    bucket = func.date_bin(
+        timedelta(seconds=interval_seconds), CommunityCoinMentionsHourly.bucket, bucket_origin(interval_seconds)
+    ).label("bucket")
+    result = await db.execute(
+        select(bucket, func.sum(CommunityCoinMentionsHourly.mention_count))
+        .where(
+            CommunityCoinMentionsHourly.coin_id == coin_id,
+            CommunityCoinMentionsHourly.bucket.between(start_date, end_date),
+        )
+        .group_by(bucket)
+    )
+    return {_to_epoch(bucket_start): int(count) for bucket_start, count in result.all()}
+
+
+async def get_moment_data(db: AsyncSession, symbol: str, start_date: datetime, end_date: datetime, interval):
+    """
+    차트의 각 캔들과 같은 시간대의 커뮤니티 반응 통계를 함께 반환합니다.
+
+    Args:
+        db (AsyncSession): SQLAlchemy 비동기 세션
+        symbol (str): 코인 심볼
+        start_date (datetime): 조회 시작 시간
+        end_date (datetime): 조회 끝나는 시간
+        interval: 캔들 간격 (예: 1h, 4h, 1d)
+
+    Returns:
+        list[dict]: 캔들별 OHLCV, 반응 수, 감정 분포, 해당 코인 언급량, 상위 언급 코인
+    """
+    interval_seconds = resolve_interval(interval)
+    coin = await get_coin_or_404(db, symbol)
+    columns = await get_ohlcv_columns_by_interval(db, symbol, start_date, end_date, interval, coin)
+    start_date, end_date = resolve_ohlcv_range(start_date, end_date, interval_seconds)
+
+    stats = await get_community_stats(db, start_date, end_date, interval_seconds)
+    own_mentions = await get_own_mentions(db, coin.coin_id, start_date, end_date, interval_seconds)
+    top_mentions = await get_coin_mentions(db, start_date, end_date, interval_seconds)
+
+    empty_stats = {"reaction_count": 0, "sentiment": {"positive": 0, "neutral": 0, "negative": 0}}
+    timestamps = columns["timestamp"].tolist()
+    moments = []
+    for i, bucket_start in enumerate(timestamps):
+        bucket_stats = stats.get(bucket_start, empty_stats)
+        moments.append({
+            "timestamp": _EPOCH + timedelta(seconds=bucket_start),
+            "open": float(columns["open"][i]),
+            "high": float(columns["high"][i]),
+            "low": float(columns["low"][i]),
+            "close": float(columns["close"][i]),
+            "volume": float(columns["volume"][i]),
+            "reaction_count": bucket_stats["reaction_count"],
+            "sentiment": bucket_stats["sentiment"],
+            "mention_count": own_mentions.get(bucket_start, 0),
+            "top_mentions": top_mentions.get(bucket_start, []),
+        })
+    return moments
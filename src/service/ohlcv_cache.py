@@ -0,0 +1,210 @@
+import os
+import json
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from src.service.ohlcv_resampler import COLUMNS, empty_columns, rows_to_columns, now_kst
+
+# 캐시 설정
+OHLCV_CACHE_DAYS = int(os.getenv("OHLCV_CACHE_DAYS", 14))  # 코인별로 보관할 최근 일수
+OHLCV_CACHE_MAX_COINS = int(os.getenv("OHLCV_CACHE_MAX_COINS", 64))  # LRU로 유지할 최대 코인 수
+OHLCV_CACHE_TTL = int(os.getenv("OHLCV_CACHE_TTL", 900))  # NOTIFY 누락 대비 최대 보관 시간(초)
+
+# 수집기가 새 캔들을 커밋할 때 알림을 보내는 채널
+OHLCV_NOTIFY_CHANNEL = "coin_ohlcv_updated"
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _to_epoch(timestamp: datetime) -> int:
+    return int((timestamp - _EPOCH).total_seconds())
+
+
+class OHLCVRingBuffer:
+    """
+    코인 하나의 1시간봉을 고정 크기 배열에 timestamp 오름차순으로 보관하는 링 버퍼.
+    용량을 넘으면 가장 오래된 캔들부터 덮어씁니다.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.arrays = {name: np.empty(capacity, dtype=np.float64) for name in COLUMNS}
+        self.arrays["timestamp"] = np.empty(capacity, dtype=np.int64)
+        self.head = 0  # 가장 오래된 캔들의 물리적 위치
+        self.size = 0
+
+    def _segments(self):
+        # 논리적 순서대로 정렬된 물리 구간 목록 (최대 2개)
+        end = self.head + self.size
+        if end <= self.capacity:
+            return [(self.head, end)]
+        return [(self.head, self.capacity), (0, end - self.capacity)]
+
+    def first_timestamp(self):
+        return int(self.arrays["timestamp"][self.head]) if self.size else None
+
+    def last_timestamp(self):
+        if not self.size:
+            return None
+        return int(self.arrays["timestamp"][(self.head + self.size - 1) % self.capacity])
+
+    def append(self, columns):
+        """last_timestamp 이후의 캔들(오름차순)을 뒤에 추가합니다."""
+        count = columns["timestamp"].size
+        if count == 0:
+            return
+        if count > self.capacity:
+            columns = {name: values[-self.capacity:] for name, values in columns.items()}
+            count = self.capacity
+
+        positions = (self.head + self.size + np.arange(count)) % self.capacity
+        for name in COLUMNS:
+            self.arrays[name][positions] = columns[name]
+
+        overflow = max(self.size + count - self.capacity, 0)
+        self.head = (self.head + overflow) % self.capacity
+        self.size = min(self.size + count, self.capacity)
+
+    def truncate_from(self, timestamp: int):
+        """timestamp 이상인 캔들을 버립니다 (갱신된 구간을 다시 적재하기 위함)."""
+        kept = 0
+        for lo, hi in self._segments():
+            kept += int(np.searchsorted(self.arrays["timestamp"][lo:hi], timestamp, side="left"))
+        self.size = kept
+
+    def range(self, start: int, end: int):
+        """[start, end] 구간의 캔들을 이진 탐색으로 찾아 컬럼 배열로 반환합니다."""
+        slices = []
+        for lo, hi in self._segments():
+            timestamps = self.arrays["timestamp"][lo:hi]
+            i = lo + int(np.searchsorted(timestamps, start, side="left"))
+            j = lo + int(np.searchsorted(timestamps, end, side="right"))
+            if i < j:
+                slices.append((i, j))
+
+        if not slices:
+            return empty_columns()
+        return {
+            name: np.concatenate([self.arrays[name][i:j] for i, j in slices])
+            for name in COLUMNS
+        }
+
+
+class _CacheEntry:
+    def __init__(self, capacity: int, covered_from: int):
+        self.buffer = OHLCVRingBuffer(capacity)
+        self.covered_from = covered_from  # 이 시각 이후의 데이터는 빠짐없이 보관 중
+        self.loaded_at = time.monotonic()
+        self.pending_from = None  # NOTIFY로 갱신이 알려진 가장 이른 시각 (다시 읽어 반영할 때까지 유지)
+        self.version = 0  # NOTIFY를 받을 때마다 증가 (다시 읽는 동안 새 알림이 왔는지 확인)
+
+
+class OHLCVHotCache:
+    """
+    최근 N일 1시간봉을 코인별 링 버퍼로 보관하는 프로세스 내 캐시.
+    코인 수는 LRU로 제한하며, 수집기의 NOTIFY를 받으면 갱신된 구간만 다시 읽어 덧붙입니다.
+    요청과 NOTIFY 콜백은 모두 이벤트 루프에서 실행되며, 코인별 asyncio.Lock으로 적재를 하나씩 진행하므로
+    적재 중에 온 요청은 적재가 끝난 뒤의 버퍼를 읽습니다.
+    """
+
+    def __init__(self, days=OHLCV_CACHE_DAYS, max_coins=OHLCV_CACHE_MAX_COINS, ttl=OHLCV_CACHE_TTL):
+        self.days = days
+        self.max_coins = max_coins
+        self.ttl = ttl
+        # 새 캔들이 추가될 여유분으로 하루치를 더 잡음
+        self.capacity = (days + 1) * 24
+        self._entries = OrderedDict()
+        self._locks = {}  # coin_id -> 적재를 직렬화하는 asyncio.Lock
+
+    async def get_columns(self, db, coin_id: int, start_date: datetime, end_date: datetime, loader):
+        """
+        캐시가 [start_date, end_date]를 덮으면 컬럼 배열을 반환하고, 아니면 None을 반환합니다.
+
+        Args:
+            loader: async (db, coin_id, start_date) -> 오름차순 (timestamp, open, high, low, close, volume) 행 목록
+        """
+        window_start = (now_kst() - timedelta(days=self.days)).replace(minute=0, second=0, microsecond=0)
+        if start_date < window_start:
+            return None
+
+        lock = self._locks.get(coin_id)
+        if lock is None:
+            lock = self._locks[coin_id] = asyncio.Lock()
+
+        async with lock:
+            entry = self._entries.get(coin_id)
+            if entry is not None:
+                self._entries.move_to_end(coin_id)
+                if time.monotonic() - entry.loaded_at > self.ttl:
+                    entry = None
+                    del self._entries[coin_id]
+
+            if entry is None:
+                # 최근 N일을 통째로 적재 (적재 중 도착한 NOTIFY도 받도록 먼저 등록)
+                entry = _CacheEntry(self.capacity, _to_epoch(window_start))
+                self._store(coin_id, entry)
+                try:
+                    rows = await loader(db, coin_id, window_start)
+                except BaseException:
+                    if self._entries.get(coin_id) is entry:
+                        del self._entries[coin_id]
+                    raise
+                entry.buffer.append(rows_to_columns(rows))
+            elif entry.pending_from is not None:
+                # 갱신된 구간만 다시 읽어서 뒤에 덧붙임 (반영이 끝날 때까지 pending_from은 유지)
+                version = entry.version
+                reload_from = max(entry.pending_from, entry.covered_from)
+                rows = await loader(db, coin_id, _EPOCH + timedelta(seconds=reload_from))
+                entry.buffer.truncate_from(reload_from)
+                entry.buffer.append(rows_to_columns(rows))
+                # 다시 읽는 동안 새 알림이 왔다면 다음 요청에서 한 번 더 읽음
+                if entry.version == version:
+                    entry.pending_from = None
+
+            first = entry.buffer.first_timestamp()
+            # 용량 초과로 앞부분이 밀려났다면 보관 구간 시작도 앞당김
+            if first is not None and entry.buffer.size == entry.buffer.capacity:
+                entry.covered_from = max(entry.covered_from, first)
+            if _to_epoch(start_date) < entry.covered_from:
+                return None
+            return entry.buffer.range(_to_epoch(start_date), _to_epoch(end_date))
+
+    def _store(self, coin_id: int, entry: _CacheEntry):
+        self._entries[coin_id] = entry
+        self._entries.move_to_end(coin_id)
+        while len(self._entries) > self.max_coins:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, coin_id: int, from_timestamp: datetime = None):
+        """코인의 캐시를 무효화합니다. from_timestamp가 있으면 그 이후만 다시 읽도록 표시합니다."""
+        entry = self._entries.get(coin_id)
+        if entry is None:
+            return
+        if from_timestamp is None:
+            del self._entries[coin_id]
+            return
+        from_epoch = _to_epoch(from_timestamp)
+        entry.pending_from = from_epoch if entry.pending_from is None else min(entry.pending_from, from_epoch)
+        entry.version += 1
+
+    def handle_notification(self, payload: str):
+        """
+        수집기 NOTIFY 페이로드를 처리합니다.
+        페이로드 형식: {"coin_id": 1, "from": "2024-12-08T00:00:00"}
+        """
+        try:
+            message = json.loads(payload)
+            coin_id = int(message["coin_id"])
+            from_timestamp = datetime.fromisoformat(message["from"]) if message.get("from") else None
+        except (ValueError, KeyError, TypeError) as e:
+            logging.warning(f"Invalid {OHLCV_NOTIFY_CHANNEL} payload {payload!r}: {e}")
+            return
+        self.invalidate(coin_id, from_timestamp)
+
+
+ohlcv_cache = OHLCVHotCache()
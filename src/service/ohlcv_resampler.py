@@ -0,0 +1,142 @@
+import re
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+HOUR = 3600
+DAY = 24 * HOUR
+WEEK = 7 * DAY
+
+_UNIT_SECONDS = {"h": HOUR, "d": DAY, "w": WEEK}
+_INTERVAL_PATTERN = re.compile(r"^(\d+)\s*([hdw])$")
+
+# 1970-01-01은 목요일이므로 주 단위 버킷은 월요일(1970-01-05) 00:00 기준으로 정렬
+_WEEK_ORIGIN = 4 * DAY
+_EPOCH = datetime(1970, 1, 1)
+
+COLUMNS = ("timestamp", "open", "high", "low", "close", "volume")
+
+# 캔들 timestamp는 KST 기준으로 저장됨 (tz 정보 없음)
+KST = timezone(timedelta(hours=9))
+
+
+def now_kst():
+    """서버 시간대와 관계없이 캔들 timestamp와 같은 기준(KST, tz 정보 없음)의 현재 시각"""
+    return datetime.now(KST).replace(tzinfo=None)
+
+
+def parse_interval(interval):
+    """
+    간격 표기("1h", "4h", "1d", "1w" 또는 시간 단위 정수)를 초 단위로 변환합니다.
+
+    Raises:
+        ValueError: 지원하지 않는 표기이거나 1시간의 배수가 아닌 경우
+    """
+    if isinstance(interval, int):
+        seconds = interval * HOUR
+    else:
+        match = _INTERVAL_PATTERN.match(str(interval).strip().lower())
+        if not match:
+            raise ValueError(f"Invalid interval: {interval}")
+        seconds = int(match.group(1)) * _UNIT_SECONDS[match.group(2)]
+
+    # 원천 데이터가 1시간봉이므로 1시간의 배수만 허용
+    if seconds <= 0 or seconds % HOUR:
+        raise ValueError(f"Invalid interval: {interval}")
+    return seconds
+
+
+def _bucket_origin(interval_seconds):
+    return _WEEK_ORIGIN if interval_seconds % WEEK == 0 else 0
+
+
+def bucket_origin(interval_seconds: int) -> datetime:
+    """버킷 정렬 기준 시각 (SQL date_bin의 origin으로 사용)"""
+    return _EPOCH + timedelta(seconds=_bucket_origin(interval_seconds))
+
+
+def floor_timestamp(timestamp: datetime, interval_seconds: int) -> datetime:
+    """주어진 시각이 속한 버킷의 시작 시각(시계 경계 기준)을 반환합니다."""
+    origin = _bucket_origin(interval_seconds)
+    epoch = int((timestamp - _EPOCH).total_seconds())
+    bucket = (epoch - origin) // interval_seconds * interval_seconds + origin
+    return _EPOCH + timedelta(seconds=bucket)
+
+
+def empty_columns():
+    columns = {name: np.empty(0, dtype=np.float64) for name in COLUMNS}
+    columns["timestamp"] = np.empty(0, dtype=np.int64)
+    return columns
+
+
+def rows_to_columns(rows):
+    """
+    (timestamp, open, high, low, close, volume) 행 목록을 컬럼 배열로 변환합니다.
+    timestamp는 epoch 초(int64), 가격과 거래량은 float64 배열이 됩니다.
+    """
+    if not rows:
+        return empty_columns()
+
+    timestamps, opens, highs, lows, closes, volumes = zip(*rows)
+    return {
+        "timestamp": np.array(timestamps, dtype="datetime64[s]").astype(np.int64),
+        "open": np.array(opens, dtype=np.float64),
+        "high": np.array(highs, dtype=np.float64),
+        "low": np.array(lows, dtype=np.float64),
+        "close": np.array(closes, dtype=np.float64),
+        "volume": np.array(volumes, dtype=np.float64),
+    }
+
+
+def resample(columns, interval_seconds):
+    """
+    timestamp 오름차순으로 정렬된 컬럼 배열을 interval_seconds 간격의 캔들로 집계합니다.
+    버킷은 첫 행이 아닌 시계 경계(주 단위는 월요일 00:00)에 맞춰 정렬됩니다.
+
+    Args:
+        columns (dict[str, np.ndarray]): rows_to_columns 결과
+        interval_seconds (int): 집계 간격(초)
+
+    Returns:
+        dict[str, np.ndarray]: 버킷별 open/high/low/close/volume 컬럼
+    """
+    timestamps = columns["timestamp"]
+    if timestamps.size == 0:
+        return empty_columns()
+
+    origin = _bucket_origin(interval_seconds)
+    buckets = (timestamps - origin) // interval_seconds * interval_seconds + origin
+
+    # 정렬된 입력이므로 버킷 값이 바뀌는 위치가 곧 그룹의 시작점
+    starts = np.flatnonzero(np.concatenate(([True], buckets[1:] != buckets[:-1])))
+    ends = np.append(starts[1:], timestamps.size) - 1
+
+    return {
+        "timestamp": buckets[starts],
+        "open": columns["open"][starts],
+        "high": np.maximum.reduceat(columns["high"], starts),
+        "low": np.minimum.reduceat(columns["low"], starts),
+        "close": columns["close"][ends],
+        "volume": np.add.reduceat(columns["volume"], starts),
+    }
+
+
+def columns_to_records(columns):
+    """컬럼 배열을 기존 API 응답 형태(dict 리스트)로 변환합니다."""
+    timestamps = columns["timestamp"].astype("datetime64[s]").tolist()
+    opens = columns["open"].tolist()
+    highs = columns["high"].tolist()
+    lows = columns["low"].tolist()
+    closes = columns["close"].tolist()
+    volumes = columns["volume"].tolist()
+    return [
+        {
+            "open": opens[i],
+            "high": highs[i],
+            "low": lows[i],
+            "close": closes[i],
+            "volume": volumes[i],
+            "timestamp": timestamps[i],
+        }
+        for i in range(len(timestamps))
+    ]